@@ -3,6 +3,7 @@ from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from kosmos.prompts import load_prompt
 from kosmos.utils import fix_and_parse_json
+from kosmos.utils.telemetry_sampler import summarize_trajectory
 
 class AuditAgent:
     def __init__(
@@ -337,6 +338,14 @@ class AuditAgent:
                 observation += f"  Docking Autopilot: {docking.get('status', 'Unknown')}\n"
             observation += "\n"
         
+        # What happened while the code ran, from the background sampler
+        trajectory_lines = summarize_trajectory(event.get("trajectory"))
+        if trajectory_lines:
+            observation += f"=== TRAJECTORY DURING EXECUTION ===\n"
+            for line in trajectory_lines:
+                observation += f"{line}\n"
+            observation += "\n"
+        
         observation += f"Vessel Observation (from Flight Agent):\n{vessel_observation}\n\n"
         observation += f"Task: {task}\n\n"
         if context:
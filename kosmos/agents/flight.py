@@ -11,6 +11,7 @@ from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langsmith import traceable
 
 from kosmos.prompts import load_prompt
+from kosmos.utils.telemetry_sampler import summarize_trajectory
 
 class FlightAgent:
     def __init__(
@@ -349,6 +350,13 @@ class FlightAgent:
             if 'execution_time' in telemetry:
                 observation += f"  Execution Time: {telemetry.get('execution_time', 0):.3f}s\n"
             
+            # Trajectory sampled while the code ran
+            trajectory_lines = summarize_trajectory(telemetry.get('trajectory'))
+            if trajectory_lines:
+                observation += f"  Trajectory During Execution:\n"
+                for line in trajectory_lines:
+                    observation += f"    {line}\n"
+            
             observation += "\n"
         else:
             # No telemetry available (shouldn't happen normally, but handle gracefully)
@@ -114,19 +114,23 @@ class ManeuverAgent:
         '''
 
     @property
-    def programs(self):
-        programs = ""
+    def program_sources(self):
+        """Source of every learned maneuver followed by the control primitives, one entry each."""
+        sources = []
         # Handle both dict and list formats for availablemaneuvers
         if isinstance(self.availablemaneuvers, dict):
             for maneuver_name, entry in self.availablemaneuvers.items():
-                programs += f"{entry['code']}\n\n"
+                sources.append(entry['code'])
         elif isinstance(self.availablemaneuvers, list):
             for entry in self.availablemaneuvers:
                 if isinstance(entry, dict) and 'code' in entry:
-                    programs += f"{entry['code']}\n\n"
-        for primitives in self.control_primitives:
-            programs += f"{primitives}\n\n"
-        return programs
+                    sources.append(entry['code'])
+        sources.extend(self.control_primitives)
+        return sources
+
+    @property
+    def programs(self):
+        return "".join(f"{source}\n\n" for source in self.program_sources)
 
     # function to add a skill
     def add_new_maneuver(self, data):
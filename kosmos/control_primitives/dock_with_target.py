@@ -20,22 +20,18 @@ async def dock_with_target(conn, approach_distance=50, final_approach_speed=0.5)
         control.sas = True
         control.sas_mode = space_center.SASMode.target
         
-        # Get close to target
-        while True:
-            target_distance = vessel.orbital_reference_frame.position(target).magnitude
-            
-            if target_distance < approach_distance:
-                break
-            
-            # Thrust toward target
-            if target_distance > 1000:
-                control.throttle = 0.1
-            elif target_distance > 100:
-                control.throttle = 0.05
-            else:
-                control.throttle = 0.01
-            
-            time.sleep(0.5)
+        # Get close to target, throttling down at each distance band
+        def distance(position):
+            return sum(c * c for c in position) ** 0.5
+        
+        with StreamWatch(conn, target.position, vessel.reference_frame) as position:
+            for band, throttle in ((1000, 0.1), (100, 0.05), (0, 0.01)):
+                limit = max(band, approach_distance)
+                if distance(position.value) >= limit:
+                    # Thrust toward target
+                    control.throttle = throttle
+                    await position.until(lambda p: distance(p) < limit)
+            target_distance = distance(position.value)
         
         control.throttle = 0.0
         print(f"Close approach achieved: {target_distance:.1f}m")
@@ -52,12 +48,10 @@ async def dock_with_target(conn, approach_distance=50, final_approach_speed=0.5)
             return False
         
         # Approach target port
-        while not vessel.parts.docking_ports[0].state.name == 'docked':
-            # Simple approach logic
-            time.sleep(1)
-            
-            # In real implementation, this would use precise navigation
-            # This is simplified for the primitive example
+        # In real implementation, this would use precise navigation
+        # This is simplified for the primitive example
+        with StreamWatch(conn, getattr, my_port, 'state') as port_state:
+            await port_state.becomes('docked')
             
         print("Docking successful!")
         control.rcs = False
@@ -14,11 +14,11 @@ async def execute_maneuver_node(conn, node=None, tolerance=1.0):
         node = control.nodes[0]
     
     try:
-        # Calculate burn time
-        isp = vessel.specific_impulse * 9.82  # Convert to m/s
-        mass = vessel.mass
+        # Calculate burn time across stages from the cached propulsion model
         delta_v = node.delta_v
-        burn_time = mass * isp * (1 - math.exp(-delta_v / isp)) / vessel.available_thrust
+        burn_time = get_propulsion_model().burn_time(delta_v)
+        if burn_time is None:
+            raise Exception(f"Not enough delta-v for a {delta_v:.1f} m/s burn")
         
         # Wait until burn time
         burn_ut = node.ut - (burn_time / 2)
@@ -32,24 +32,26 @@ async def execute_maneuver_node(conn, node=None, tolerance=1.0):
         control.sas_mode = conn.space_center.SASMode.maneuver
         
         # Wait for orientation
-        time.sleep(3)
+        await asyncio.sleep(3)
         
-        # Execute burn
-        remaining_delta_v = node.remaining_delta_v
-        control.throttle = 1.0
-        
-        while remaining_delta_v > tolerance:
-            remaining_delta_v = node.remaining_delta_v
-            
-            # Throttle down as we approach target
-            if remaining_delta_v < 10:
-                control.throttle = 0.1
-            elif remaining_delta_v < 50:
-                control.throttle = 0.5
+        # Execute burn, waking on stream updates instead of polling
+        with StreamWatch(conn, getattr, node, 'remaining_delta_v') as remaining, \
+                StreamWatch(conn, getattr, vessel, 'available_thrust') as thrust:
+            control.throttle = 1.0
             
-            time.sleep(0.1)
+            # Throttle down as we approach target, stopping early if the engines run dry
+            steps = [(threshold, throttle) for threshold, throttle in ((50, 0.5), (10, 0.1)) if threshold > tolerance]
+            index = 0
+            for threshold, throttle in steps + [(tolerance, 0.0)]:
+                index, _ = await first(remaining.below(threshold), thrust.below(0.001))
+                if index == 1:
+                    break
+                control.throttle = throttle
+            control.throttle = 0.0
+            remaining_delta_v = remaining.value
         
-        control.throttle = 0.0
+        if index == 1:
+            raise Exception(f"Out of thrust with {remaining_delta_v:.1f} m/s remaining")
         node.remove()
         
         print(f"Maneuver executed successfully, {remaining_delta_v:.1f} m/s remaining")
@@ -26,7 +26,7 @@ async def explore_until_body_found(conn, target_body_name, max_time=3600):
             print(f"Found {target_body_name} after {time.time() - start_time:.1f} seconds")
             return target_body
         
-        time.sleep(10)  # Search interval
+        await asyncio.sleep(10)  # Search interval
     
     print(f"Could not find {target_body_name} within {max_time} seconds")
     return None
\ No newline at end of file
@@ -24,53 +24,49 @@ async def land_vessel(conn, target_body=None, deploy_gear=True, target_speed=5.0
             control.throttle = 1.0
             
             # Burn until periapsis is negative
-            while vessel.orbit.periapsis_altitude > -10000:
-                time.sleep(0.1)
+            with StreamWatch(conn, getattr, vessel.orbit, 'periapsis_altitude') as periapsis:
+                await periapsis.below(-10000)
             
             control.throttle = 0.0
         
         # Descent phase
         print("Beginning descent...")
-        altitude_stream = conn.add_stream(getattr, vessel.flight(), 'surface_altitude')
-        speed_stream = conn.add_stream(getattr, vessel.flight(), 'speed')
-        vertical_speed_stream = conn.add_stream(getattr, vessel.flight(), 'vertical_speed')
-        
-        # Deploy parachutes if available and in atmosphere
-        if target_body.has_atmosphere and vessel.parts.parachutes:
-            for parachute in vessel.parts.parachutes:
-                if parachute.can_deploy:
-                    parachute.deploy()
-                    print("Parachutes deployed")
-        
-        # Powered landing phase
-        gear_deployed = False
-        
-        while vessel.situation.name != 'landed':
-            altitude = altitude_stream()
-            speed = speed_stream()
-            vertical_speed = vertical_speed_stream()
+        flight = vessel.flight()
+        with StreamWatch(conn, getattr, vessel, 'situation') as situation, \
+                StreamWatch(conn, getattr, flight, 'surface_altitude') as altitude, \
+                StreamWatch(conn, getattr, flight, 'speed') as speed, \
+                StreamWatch(conn, getattr, flight, 'vertical_speed') as vertical_speed:
+            
+            # Deploy parachutes if available and in atmosphere
+            if target_body.has_atmosphere and vessel.parts.parachutes:
+                for parachute in vessel.parts.parachutes:
+                    if parachute.can_deploy:
+                        parachute.deploy()
+                        print("Parachutes deployed")
             
-            # Deploy landing gear
-            if altitude < 1000 and not gear_deployed and deploy_gear:
-                control.gear = True
-                gear_deployed = True
-                print("Landing gear deployed")
+            # Deploy landing gear once low enough, unless we touch down first
+            if deploy_gear:
+                index, _ = await first(altitude.below(1000), situation.becomes('landed'))
+                if index == 0:
+                    control.gear = True
+                    print("Landing gear deployed")
             
-            # Suicide burn calculation (simplified)
-            if altitude < 500 and vertical_speed < -10:
-                control.sas = True
-                control.sas_mode = conn.space_center.SASMode.retrograde
+            # Powered landing phase: adjust throttle on each vertical speed update
+            while situation.value.name != 'landed':
+                if altitude.value < 500 and vertical_speed.value < -10:
+                    control.sas = True
+                    control.sas_mode = conn.space_center.SASMode.retrograde
+                    
+                    # Calculate throttle needed
+                    if vertical_speed.value < -target_speed:
+                        control.throttle = min(1.0, abs(vertical_speed.value) / 20)
+                    else:
+                        control.throttle = 0.0
                 
-                # Calculate throttle needed
-                if vertical_speed < -target_speed:
-                    control.throttle = min(1.0, abs(vertical_speed) / 20)
-                else:
-                    control.throttle = 0.0
+                await first(situation.becomes('landed'), vertical_speed.changes())
             
-            time.sleep(0.1)
-        
-        control.throttle = 0.0
-        print(f"Landing successful! Touchdown speed: {speed:.1f} m/s")
+            control.throttle = 0.0
+            print(f"Landing successful! Touchdown speed: {speed.value:.1f} m/s")
         return True
         
     except Exception as err:
@@ -48,23 +48,23 @@ async def launch_vessel(conn, target_apoapsis=100000, target_inclination=0):
             # Check for staging opportunities
             if should_stage(vessel):
                 control.activate_next_stage()
-                time.sleep(1)
+                await asyncio.sleep(1)
             
-            time.sleep(0.1)
+            await asyncio.sleep(0.1)
         
         control.throttle = 0.0
         print(f"Target apoapsis of {target_apoapsis}m reached")
         
-        # Coast to apoapsis for circularization
-        while vessel.orbit.time_to_apoapsis > 60:
-            time.sleep(1)
+        # Coast to apoapsis for circularization, sleeping until the predicted time
+        orbit = read_orbit(conn, vessel.orbit)
+        await sleep_until(conn, orbit.next_apoapsis() - 60)
         
         # Circularization burn
         control.throttle = 1.0
         periapsis_stream = conn.add_stream(getattr, vessel.orbit, 'periapsis_altitude')
         
         while periapsis_stream() < target_apoapsis * 0.9:
-            time.sleep(0.1)
+            await asyncio.sleep(0.1)
         
         control.throttle = 0.0
         vessel.auto_pilot.disengage()
@@ -1,6 +1,3 @@
 def calculate_burn_time(vessel, delta_v):
-    """Calculate time needed for burn"""
-    isp = vessel.specific_impulse * 9.82
-    mass = vessel.mass
-    thrust = vessel.available_thrust
-    return mass * isp * (1 - math.exp(-delta_v / isp)) / thrust
\ No newline at end of file
+    """Calculate time needed for burn, staging as needed (None if the vessel lacks the delta-v)"""
+    return get_propulsion_model().burn_time(delta_v)
\ No newline at end of file
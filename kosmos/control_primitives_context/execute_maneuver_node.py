@@ -7,8 +7,10 @@ async def execute_maneuver_node(conn, node=None, tolerance=1.0):
     if node is None:
         node = control.nodes[0]  # Use first node
     
-    # Calculate burn time
+    # Calculate burn time, None if the vessel lacks the delta-v
     burn_time = calculate_burn_time(vessel, node.delta_v)
+    if burn_time is None:
+        raise Exception(f"Not enough delta-v for a {node.delta_v:.1f} m/s burn")
     burn_start = node.ut - (burn_time / 2)
     
     # Warp to maneuver
@@ -19,12 +21,12 @@ async def execute_maneuver_node(conn, node=None, tolerance=1.0):
     control.sas_mode = conn.space_center.SASMode.maneuver
     await asyncio.sleep(3)  # Wait for orientation
     
-    # Execute burn
-    control.throttle = 1.0
-    while node.remaining_delta_v > tolerance:
-        if node.remaining_delta_v < 10:
-            control.throttle = 0.1  # Fine control
-        await asyncio.sleep(0.1)
+    # Execute burn, waking on stream updates instead of polling
+    with StreamWatch(conn, getattr, node, 'remaining_delta_v') as remaining:
+        control.throttle = 1.0
+        await remaining.below(10)
+        control.throttle = 0.1  # Fine control
+        await remaining.below(tolerance)
     
     control.throttle = 0.0
     node.remove()
\ No newline at end of file
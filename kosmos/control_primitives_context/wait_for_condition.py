@@ -1,5 +1,8 @@
 # Wait until apoapsis: wait_for_condition(conn, lambda v: v.orbit.time_to_apoapsis < 60);
 # Wait for specific altitude: wait_for_condition(conn, lambda v: v.flight().mean_altitude > 70000);
+# Wait on streamed telemetry without polling: await telemetry.until(lambda s: s.apoapsis_altitude > 80000, timeout=300);
+# Sleep until 60s before the predicted apoapsis: await sleep_until(conn, read_orbit(conn, vessel.orbit).next_apoapsis() - 60);
+# Wake on stream updates, first of several: with StreamWatch(conn, getattr, vessel, 'situation') as situation: await first(situation.becomes('landed'), asyncio.sleep(600));
 async def wait_for_condition(conn, condition_func, timeout=300):
     vessel = conn.space_center.active_vessel
     start_time = time.time()
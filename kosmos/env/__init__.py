@@ -1 +1,3 @@
-from .bridge import KSPEnv
\ No newline at end of file
+from .bridge import KSPEnv
+from .gym_adapter import KSPGymEnv, make_vector_env
+from .pool import EnvPool
\ No newline at end of file
@@ -1,12 +1,24 @@
 
+import asyncio
 import time
-from typing import SupportsFloat, Any, Tuple, Dict
-import math
+from typing import SupportsFloat, Any, Tuple, Dict, Sequence, Union
 import krpc
 
 import gymnasium as gym
 from gymnasium.core import ObsType
 from kosmos.utils.telemetry_collector import TelemetryCollector
+from kosmos.utils.telemetry_sampler import TelemetrySampler
+from kosmos.utils.async_telemetry import AsyncTelemetry
+from kosmos.utils.krpc_batch import batch_read
+from kosmos.utils.orbit import read_orbit, sleep_until
+from kosmos.utils.spatial import VesselIndex
+from kosmos.utils.waits import StreamWatch, first
+from .connection import ConnectionMonitor, ConnectionPool
+from .programs import ProgramCache
+from .executor import ProcessExecutor
+from .runner import run_step_code
+from .instrumentation import RPCInstrumentation, exec_phase, rpc_phase
+from .streams import StreamRegistry
 
 class KSPEnv(gym.Env):
     def __init__(
@@ -14,11 +26,39 @@ class KSPEnv(gym.Env):
         krpc_address="127.0.0.1",
         krpc_rpc_port=50000,
         krpc_stream_port=50001,
+        telemetry_mode="stream",
+        trajectory_rate=10.0,
+        trajectory_capacity=2048,
+        execution_backend="inline",
+        execution_timeout=120.0,
+        execution_cpu_limit=None,
+        execution_workers=1,
+        heartbeat_timeout=5.0,
+        nearby_refresh_interval=30.0,
+        nearby_range=25000.0,
+        connect=krpc.connect,
     ):
         self.krpc_address = krpc_address
         self.krpc_rpc_port = krpc_rpc_port
         self.krpc_stream_port = krpc_stream_port
-
+        self.telemetry_mode = telemetry_mode
+        self.trajectory_rate = trajectory_rate  # Hz, 0 disables sampling during step execution
+        self.trajectory_capacity = trajectory_capacity
+        if execution_backend not in ("inline", "process"):
+            raise ValueError(f"Unknown execution backend '{execution_backend}', expected 'inline' or 'process'")
+        if execution_backend == "process" and connect is not krpc.connect:
+            raise ValueError("The process execution backend needs a kRPC server, workers connect with krpc.connect")
+        self.execution_backend = execution_backend  # "process" runs code in killable worker processes
+        self.execution_timeout = execution_timeout
+        self.execution_cpu_limit = execution_cpu_limit
+        self.execution_workers = execution_workers
+        self.executor = None
+        self.instrumentation = RPCInstrumentation()  # RPC counts and latencies, reported as telemetry["perf"]
+
+        self.connect = connect  # Connection factory, e.g. Simulator.connect to run without KSP
+        self.connection_pool = None
+        self.connection_monitor = None
+        self.heartbeat_timeout = heartbeat_timeout  # s without heartbeat before the connection is probed
         self.conn = None
         self.vessel = None
         self.space_center = None
@@ -27,118 +67,135 @@ class KSPEnv(gym.Env):
         self.reset_options = None
         self.connected = False
         self.streams = {} # Store active streams for clean
+        self.stream_registry = StreamRegistry()  # Shared, reference-counted streams of env, collector and executed code
         self.telemetry_collector = None 
+        self.telemetry_sampler = None
+        self.async_telemetry = None
+        self.vessel_index = None  # Positions of all vessels for nearby_vessels
+        self.nearby_refresh_interval = nearby_refresh_interval  # s between full re-reads of all vessels
+        self.nearby_range = nearby_range  # m; vessels this close are updated on every read in between
+        self._vessel_index_refreshed = None  # Monotonic time of the last full refresh
+        self.program_cache = ProgramCache()
         self._vessel_cached_for_collector = None
 
+    @rpc_phase("connection")
     def check_connection(self):
+        # Healthy path: the heartbeat stream is fresh, no RPC is sent. MechJeb
+        # was probed when connecting; without it, it is only probed again after a reconnect
+        if self.conn:
+            if self.connection_monitor is None or self.connection_monitor.check():
+                return True
+            print(f"⚠️ WARNING: kRPC connection lost ({self.connection_monitor.error}), reconnecting")
+            self._drop_connection()
+
         # Attempt to connect to KSP
         retry = 0
         max_retries = 5
 
         while retry < max_retries:
             try:
-                if self.conn:
-                    # Test existing connection
-                    self.conn.krpc.current_game_scene
-                    print(f"🔍 DEBUG: Existing connection found, mech_jeb={self.mech_jeb}")
-                    # Check if MechJeb is available but not connected
-                    if self.mech_jeb is None:
-                        try:
-                            print("🔍 DEBUG: Attempting to connect to MechJeb service...")
-                            self.mech_jeb = self.conn.mech_jeb
-                            self.telemetry_collector.mech_jeb = self.mech_jeb
-                            print("✅ MechJeb service available")
-                            print(f"🔍 DEBUG: MechJeb object: {self.mech_jeb}")
-                        except Exception as e:
-                            print(f"❌ MechJeb service not available: {e}")
-                            self.mech_jeb = None
-                    else:
-                        print(f"🔍 DEBUG: MechJeb already connected: {self.mech_jeb}")
-                        # Test MechJeb API readiness on existing connection
-                        try:
-                            api_ready = self.mech_jeb.api_ready
-                            print(f"🔍 DEBUG: MechJeb API ready: {api_ready}")
-                            if not api_ready:
-                                print("⚠️ WARNING: MechJeb service connected but API not ready - may need activation in game")
-                                # Try to refresh MechJeb connection
-                                try:
-                                    self.mech_jeb = self.conn.mech_jeb
-                                    self.telemetry_collector.mech_jeb = self.mech_jeb
-                                    print("🔄 DEBUG: Refreshed MechJeb connection")
-                                except Exception as refresh_e:
-                                    print(f"⚠️ WARNING: Could not refresh MechJeb connection: {refresh_e}")
-                        except Exception as api_e:
-                            print(f"⚠️ WARNING: Could not check MechJeb API readiness: {api_e}")
-                            # Try to reconnect to MechJeb
-                            try:
-                                self.mech_jeb = self.conn.mech_jeb
-                                self.telemetry_collector.mech_jeb = self.mech_jeb
-                                print("🔄 DEBUG: Reconnected to MechJeb service")
-                            except Exception as reconnect_e:
-                                print(f"❌ ERROR: Could not reconnect to MechJeb: {reconnect_e}")
-                                self.mech_jeb = None
-                    return True
-                else:
-                    # Establish new connection
-                    self.conn = krpc.connect(
-                        name=f"Kosmos-{int(time.time())}",
+                # Establish new connections: one for control/exec, one for telemetry
+                if self.connection_pool is None:
+                    self.connection_pool = ConnectionPool(
                         address=self.krpc_address,
                         rpc_port=self.krpc_rpc_port,
                         stream_port=self.krpc_stream_port,
+                        name=f"Kosmos-{int(time.time())}",
+                        connect=self.connect,
+                        instrumentation=self.instrumentation,
                     )
-                    print(f"Connected to kRPC at {self.krpc_address}:{self.krpc_rpc_port}")
-
-                    # Initialize core services
-                    self.space_center = self.conn.space_center
-
-                    # Initialize telemetry collector
-                    self.telemetry_collector = TelemetryCollector(f"Kosmos-{int(time.time())}")
-                    self.telemetry_collector.conn = self.conn
-                    self.telemetry_collector.space_center = self.space_center
-
-                    # Try to get MechJeb if available
-                    try:
-                        print("🔍 DEBUG: Attempting to connect to MechJeb service...")
-                        self.mech_jeb = self.conn.mech_jeb
-                        self.telemetry_collector.mech_jeb = self.mech_jeb
-                        print("✅ MechJeb service available")
-                        print(f"🔍 DEBUG: MechJeb object: {self.mech_jeb}")
-                        
-                        # Test MechJeb API readiness
-                        try:
-                            api_ready = self.mech_jeb.api_ready
-                            print(f"🔍 DEBUG: MechJeb API ready: {api_ready}")
-                            if not api_ready:
-                                print("⚠️ WARNING: MechJeb service connected but API not ready - may need activation in game")
-                        except Exception as api_e:
-                            print(f"⚠️ WARNING: Could not check MechJeb API readiness: {api_e}")
-                            
-                    except Exception as e:
-                        print(f"❌ MechJeb service not available: {e}")
-                        self.mech_jeb = None
-
-                    self.connected = True
-                    return True
+                self.conn = self.connection_pool.get("control")
+                print(f"Connected to kRPC at {self.krpc_address}:{self.krpc_rpc_port}")
+
+                # Initialize core services
+                self.space_center = self.conn.space_center
+                self.connection_monitor = ConnectionMonitor(
+                    self.conn, stale_after=self.heartbeat_timeout, streams=self.stream_registry
+                )
+
+                # Initialize telemetry collector on its own connection, so slow
+                # telemetry reads do not block control commands
+                self.telemetry_collector = TelemetryCollector(
+                    mode=self.telemetry_mode,
+                    conn=self.connection_pool.get("telemetry"),
+                )
+                self.telemetry_collector.instrumentation = self.instrumentation
+                self.telemetry_collector.stream_registry = self.stream_registry
+
+                if self.vessel is not None:
+                    # Objects of the lost connection cannot be used anymore
+                    self.vessel = self.space_center.active_vessel
+
+                self._connect_mech_jeb()
+                self.connected = True
+                return True
             except Exception as e:
                 retry += 1
                 print(f"Connection attempt {retry} failed: {e}")
+                self._drop_connection()
                 if retry < max_retries:
                     time.sleep(2 ** retry)
                 else:
                     raise RuntimeError(f"Failed to connect to kRPC after {max_retries} attempts")
 
+    def _connect_mech_jeb(self):
+        """Attach the MechJeb service if the server provides it; called once per connection, readiness is reported by telemetry."""
+        try:
+            print("🔍 DEBUG: Attempting to connect to MechJeb service...")
+            self.mech_jeb = self.conn.mech_jeb
+            self.telemetry_collector.mech_jeb = self.mech_jeb
+            print("✅ MechJeb service available")
+        except Exception as e:
+            print(f"❌ MechJeb service not available: {e}")
+            self.mech_jeb = None
+
+    def _drop_connection(self):
+        """Forget a failed connection and everything bound to it, so the next check reconnects."""
+        if self.connection_monitor:
+            self.connection_monitor.close()
+            self.connection_monitor = None
+        for attribute in ("telemetry_sampler", "async_telemetry"):
+            helper = getattr(self, attribute)
+            if helper is not None:
+                try:
+                    helper.close()
+                except Exception:
+                    pass
+                setattr(self, attribute, None)
+        self.streams.clear()
+        self.stream_registry.clear()
+        if self.connection_pool:
+            self.connection_pool.close()
+        self.conn = None
+        self.space_center = None
+        self.mech_jeb = None
+        self.telemetry_collector = None
+        self.vessel_index = None
+        self._vessel_cached_for_collector = None
+        self.connected = False
+
+    @rpc_phase("telemetry")
     def get_vessel_telemetry(self):
         if not self.connected or not self.vessel or not self.telemetry_collector:
             return {}
 
         try:
-            # Only (re)bind vessel to telemetry collector when it changes
-            if self._vessel_cached_for_collector is not self.vessel:
-                self.telemetry_collector.set_vessel()
-                self._vessel_cached_for_collector = self.vessel
+            self._bind_collector()
             
-            # Get AI-optimized telemetry data
-            ai_data = self.telemetry_collector.get_ai_decision_data()
+            # Read the AI-optimized and comprehensive telemetry as one snapshot so
+            # reference frames and position/velocity vectors are fetched once
+            with self.telemetry_collector.snapshot():
+                ai_data = self.telemetry_collector.get_ai_decision_data()
+                try:
+                    comprehensive = self.telemetry_collector.get_comprehensive_telemetry()
+                except Exception as e:
+                    print(f"🔍 DEBUG: Could not get comprehensive telemetry: {e}")
+                    comprehensive = {}
+                try:
+                    propulsion = self.telemetry_collector.get_propulsion_model()
+                except Exception as e:
+                    print(f"🔍 DEBUG: Could not build propulsion model: {e}")
+                    propulsion = None
             
             # Convert to the format expected by the agents
             telemetry = {
@@ -207,6 +264,13 @@ class KSPEnv(gym.Env):
             
             telemetry["resources"] = resources
 
+            # Per-stage delta-v, TWR and burn times
+            if propulsion is not None:
+                telemetry["delta_v"] = {
+                    "total": propulsion.total_delta_v,
+                    "stages": propulsion.stage_table(),
+                }
+
             # Vessel status
             telemetry["vessel_status"] = {
                 "mass": ai_data.get("mass", 0),
@@ -284,25 +348,12 @@ class KSPEnv(gym.Env):
                     else:
                         print(f"🔍 DEBUG: Node delta_v reported: total={dv_total:.3f}, prograde={dv_prograde:.3f}, normal={dv_normal:.3f}, radial={dv_radial:.3f}")
 
+                    # Burn time across stages from the cached propulsion model, no RPCs
                     burn_time = None
-                    thrust = self.vessel.available_thrust
-                    isp = self.vessel.specific_impulse
-                    g0 = 9.80665
-                    
-                    if thrust is not None and thrust > 0 and isp is not None and isp > 0 and dv_total is not None and dv_total > 0:
-                        ve = isp * g0
-                        if ve > 0:
-                            m0 = self.vessel.mass
-                            try:
-                                m1 = m0 / math.exp(dv_total / ve)
-                                prop_mass = max(m0 - m1, 0.0)
-                                mass_flow = thrust / (isp * g0)
-                                burn_time = prop_mass / mass_flow if mass_flow > 1e-9 and prop_mass >= 0 else None
-                            except OverflowError as e:
-                                print(f"🔍 DEBUG: Error calculating burn time (overflow): {e}")
-                                burn_time = None
-                        else:
-                            print(f"🔍 DEBUG: Burn time not computed - thrust={thrust}, isp={isp}, dv_total={dv_total}")
+                    if propulsion is not None and dv_total is not None and dv_total > 0:
+                        burn_time = propulsion.burn_time(dv_total)
+                        if burn_time is None:
+                            print(f"🔍 DEBUG: Burn time not computed - dv_total={dv_total} exceeds vessel delta-v {propulsion.total_delta_v:.1f}")
                     
                     half_burn_start = (node_ut - (burn_time / 2.0)) if burn_time else None
 
@@ -368,18 +419,17 @@ class KSPEnv(gym.Env):
                 "current_stage": ai_data.get("current_stage", 0),
             }
 
-            # Nearby vessels (simplified for now)
-            telemetry["nearby_vessels"] = []
-
-            # Add comprehensive telemetry if available
+            # Nearby vessels, nearest first
             try:
-                if self.telemetry_collector:
-                    comprehensive = self.telemetry_collector.get_comprehensive_telemetry()
-                    telemetry["comprehensive_telemetry"] = comprehensive
-                    print(f"🔍 DEBUG: Added comprehensive telemetry with {len(comprehensive)} categories")
+                telemetry["nearby_vessels"] = self.nearby_vessels()
             except Exception as e:
-                print(f"🔍 DEBUG: Could not get comprehensive telemetry: {e}")
-                telemetry["comprehensive_telemetry"] = {}
+                print(f"🔍 DEBUG: Could not read nearby vessels: {e}")
+                telemetry["nearby_vessels"] = []
+
+            # Add comprehensive telemetry if available
+            telemetry["comprehensive_telemetry"] = comprehensive
+            if comprehensive:
+                print(f"🔍 DEBUG: Added comprehensive telemetry with {len(comprehensive)} categories")
 
             return telemetry
 
@@ -387,10 +437,95 @@ class KSPEnv(gym.Env):
             print(f"Error getting telemetry: {e}")
             return {"error": str(e)}
 
+    def _bind_collector(self):
+        # Only (re)bind vessel to telemetry collector when it changes
+        if self._vessel_cached_for_collector is not self.vessel:
+            self.telemetry_collector.set_vessel()
+            self._vessel_cached_for_collector = self.vessel
+            if self.telemetry_sampler:
+                self.telemetry_sampler.close()
+                self.telemetry_sampler = None
+            if self.async_telemetry:
+                self.async_telemetry.close()
+                self.async_telemetry = None
+            # Anything else still streaming the old vessel; env streams are recreated by reset
+            self.stream_registry.clear(keep=("env", "monitor"))
+
+    def _propulsion_model(self):
+        """Propulsion model of the active vessel, for burn-time queries from executed code."""
+        if not self.telemetry_collector or not self.vessel:
+            return None
+        self._bind_collector()
+        return self.telemetry_collector.get_propulsion_model()
+
+    def _async_telemetry(self):
+        """Awaitable telemetry for executed code, on the telemetry connection; streams are added on first use."""
+        if not self.telemetry_collector or not self.vessel:
+            return None
+        self._bind_collector()
+        if self.async_telemetry is None:
+            self.async_telemetry = AsyncTelemetry(
+                self.telemetry_collector.conn, self.telemetry_collector.vessel, streams=self.stream_registry
+            )
+        return self.async_telemetry
+
+    def _start_sampler(self):
+        """Start sampling the hot telemetry fields in the background, if enabled."""
+        if not self.trajectory_rate or not self.telemetry_collector or not self.vessel:
+            return None
+        try:
+            self._bind_collector()
+            if self.telemetry_sampler is None:
+                self.telemetry_sampler = TelemetrySampler(
+                    self.telemetry_collector.conn,
+                    self.telemetry_collector.vessel,
+                    rate=self.trajectory_rate,
+                    capacity=self.trajectory_capacity,
+                    streams=self.stream_registry,
+                )
+            self.telemetry_sampler.start()
+            return self.telemetry_sampler
+        except Exception as e:
+            print(f"⚠️ WARNING: Could not start telemetry sampler: {e}")
+            return None
+
+    def nearby_vessels(self, limit=10, radius=None, types=None, refresh=False):
+        """
+        Vessels closest to the active vessel, nearest first.
+
+        All vessels are re-read in one batched request every
+        nearby_refresh_interval seconds. In between, only the active vessel and
+        the vessels within nearby_range of it are updated, so vessels further
+        out keep their state from the last full refresh.
+
+        Args:
+            limit: Maximum number of vessels
+            radius: Only vessels within this many metres, None for no limit
+            types: Only vessels of these type names, e.g. ("space_object",) for asteroids
+            refresh: Re-read all vessels now
+        """
+        if not self.telemetry_collector or not self.vessel:
+            return []
+        conn = self.telemetry_collector.conn
+        vessel = self.telemetry_collector.vessel
+        if self.vessel_index is None or self.vessel_index.conn is not conn:
+            self.vessel_index = VesselIndex(conn)
+            self._vessel_index_refreshed = None
+        now = time.monotonic()
+        if (refresh or self._vessel_index_refreshed is None or vessel not in self.vessel_index.vessels
+                or now - self._vessel_index_refreshed >= self.nearby_refresh_interval):
+            self.vessel_index.refresh()
+            self._vessel_index_refreshed = now
+        else:
+            in_range = self.vessel_index.within(vessel, self.nearby_range)
+            self.vessel_index.update([vessel] + [neighbour.vessel for neighbour in in_range])
+        return self.vessel_index.nearby(vessel, limit=limit, radius=radius, types=types)
+
     def calculate_distance(self, vessel1, vessel2):
         try:
-            pos1 = vessel1.position(vessel1.orbit.body.reference_frame)
-            pos2 = vessel2.position(vessel2.orbit.body.reference_frame)
+            # Both positions in one frame and one request
+            frame = vessel1.orbit.body.non_rotating_reference_frame
+            pos1, pos2 = batch_read(self.conn, [(vessel1, "position", (frame,)), (vessel2, "position", (frame,))])
             return ((pos1[0] - pos2[0]) ** 2 + (pos1[1] - pos2[1]) ** 2 + (pos1[2] - pos2[2]) ** 2) ** 0.5
         except Exception as e:
             return float('inf')
@@ -398,50 +533,80 @@ class KSPEnv(gym.Env):
     def step(
         self,
         code: str,
-        programs: str = "",
+        programs: Union[str, Sequence[str]] = "",
     ) -> Tuple[ObsType, SupportsFloat, bool, bool, Dict[str, Any]]:
+        # Measure the step's RPCs and report them with its events. RPCs made by
+        # process-backend workers go over the workers' own connections and are not counted.
+        self.instrumentation.start_window()
+        with self.instrumentation.phase("step"):
+            try:
+                events = self._run_step(code, programs)
+            finally:
+                # Streams the code opened and did not remove end with the step
+                self.stream_registry.release_owner("exec")
+        perf = self.instrumentation.summary()
+        perf["streams"] = self.stream_registry.summary()
+        for _, event in events:
+            if isinstance(event, dict):
+                event["perf"] = perf
+        return events
+
+    def _run_step(self, code: str, programs):
         if not self.has_reset:
             raise RuntimeError("Environment has not been reset yet")
         
         self.check_connection()
 
+        if self.execution_backend == "process":
+            return self._step_in_process(code, programs)
+
+        # Add a custom print function that shows what's happening
+        def debug_print(*args, **kwargs):
+            print(f"🔍 DEBUG: [KSP Code] {' '.join(str(arg) for arg in args)}")
+
         # Prepare execution context
         execution_context = {
-            "conn": self.conn,
+            "conn": self.stream_registry.connection(self.conn, owner="exec"),
             "vessel": self.vessel,
             "space_center": self.space_center,
             "print": print,
             "time": time,
+            "asyncio": asyncio,
             "krpc": krpc,
+            "get_propulsion_model": self._propulsion_model,
+            "read_orbit": read_orbit,
+            "sleep_until": sleep_until,
+            "StreamWatch": StreamWatch,
+            "first": first,
+            "telemetry": self._async_telemetry(),
+            "debug_print": debug_print,
         }
 
-        # Add programs to context
+        # Add programs to context; only programs not defined by an earlier step are executed
         if programs:
             try:
-                print(f"🔍 DEBUG: KSPEnv executing programs ({len(programs)} chars)")
-                print(f"🔍 DEBUG: Programs: {programs}")
-                exec(programs, execution_context)
+                namespace = self.program_cache.prepare(programs, execution_context)
+                print(f"🔍 DEBUG: KSPEnv programs prepared: {self.program_cache.stats}")
             except Exception as e:
                 return [("error", {"execution_error": f"Program error: {e}"})]
+            # Run the step's code in a copy so its own definitions do not leak into later steps
+            execution_context = dict(namespace)
 
-        # Execute main code
+        # Execute main code, sampling the trajectory while it runs
+        sampler = self._start_sampler()
         start_time = time.time()
         print(f"🔍 DEBUG: KSPEnv executing code ({len(code)} chars)")
         print(f"🔍 DEBUG: Code preview: {code[:200]}...")
         print(f"🔍 DEBUG: Execution context keys: {list(execution_context.keys())}")
         
         try:
-            # Add a custom print function that shows what's happening
-            def debug_print(*args, **kwargs):
-                print(f"🔍 DEBUG: [KSP Code] {' '.join(str(arg) for arg in args)}")
-            
-            # Add debug_print to execution context
-            execution_context["debug_print"] = debug_print
-            
             print(f"🔍 DEBUG: KSPEnv executing code ({len(code)} chars)")
             print(f"🔍 DEBUG: Code: {code}")
-            exec(code, execution_context)
+            # Coroutines started by the code (async primitives) are driven to completion
+            with self.instrumentation.phase(exec_phase(code)):
+                run_step_code(code, execution_context)
             execution_time = time.time() - start_time
+            trajectory = sampler.stop() if sampler else None
             print(f"🔍 DEBUG: Code execution completed in {execution_time:.3f}s")
 
             # Small delay to allow state to update; keep minimal for responsiveness
@@ -450,11 +615,14 @@ class KSPEnv(gym.Env):
             # Get telemetry after execution
             telemetry = self.get_vessel_telemetry()
             telemetry["execution_time"] = execution_time
+            if trajectory is not None:
+                telemetry["trajectory"] = trajectory
             print(f"🔍 DEBUG: Telemetry collected: {len(telemetry)} fields")
 
             return [("observe", telemetry)]
         except Exception as e:
             execution_time = time.time() - start_time
+            trajectory = sampler.stop() if sampler else None
             print(f"🔍 ERROR: Code execution failed after {execution_time:.3f}s: {e}")
             print(f"🔍 ERROR: Exception type: {type(e).__name__}")
             import traceback
@@ -464,6 +632,8 @@ class KSPEnv(gym.Env):
                 "execution_error": str(e),
                 "execution_time": execution_time,
             }
+            if trajectory is not None:
+                error_data["trajectory"] = trajectory
             # Still try to get telemetry even on error
             try:
                 telemetry = self.get_vessel_telemetry()
@@ -474,6 +644,65 @@ class KSPEnv(gym.Env):
 
             return [("error", error_data)]
 
+    def _step_in_process(self, code: str, programs):
+        """Run the step's code in a worker process, killing it if it exceeds its time limits."""
+        if self.executor is None:
+            self.executor = ProcessExecutor(
+                address=self.krpc_address,
+                rpc_port=self.krpc_rpc_port,
+                stream_port=self.krpc_stream_port,
+                workers=self.execution_workers,
+                timeout=self.execution_timeout,
+                cpu_limit=self.execution_cpu_limit,
+                name=f"{self.connection_pool.name}-exec" if self.connection_pool else "Kosmos-exec",
+                output=lambda line: print(f"🔍 DEBUG: [KSP Code] {line}"),
+            )
+
+        sampler = self._start_sampler()
+        print(f"🔍 DEBUG: KSPEnv executing code in worker process ({len(code)} chars)")
+        print(f"🔍 DEBUG: Code: {code}")
+        try:
+            with self.instrumentation.phase(exec_phase(code)):
+                result = self.executor.run(code, programs)
+        except Exception as e:
+            result = {"ok": False, "phase": "code", "error": f"Executor error: {e}", "execution_time": 0.0, "timed_out": False}
+        trajectory = sampler.stop() if sampler else None
+
+        if result["phase"] == "programs":
+            return [("error", {"execution_error": f"Program error: {result['error']}"})]
+
+        if result["ok"]:
+            print(f"🔍 DEBUG: Code execution completed in {result['execution_time']:.3f}s")
+            time.sleep(0.05)
+            telemetry = self.get_vessel_telemetry()
+            telemetry["execution_time"] = result["execution_time"]
+            if trajectory is not None:
+                telemetry["trajectory"] = trajectory
+            return [("observe", telemetry)]
+
+        print(f"🔍 ERROR: Code execution failed after {result['execution_time']:.3f}s: {result['error']}")
+        if result.get("traceback"):
+            print(f"🔍 ERROR: Traceback: {result['traceback']}")
+        if result.get("timed_out"):
+            # The killed code may have left the engines running
+            try:
+                self.vessel.control.throttle = 0.0
+            except Exception as e:
+                print(f"⚠️ WARNING: Could not cut throttle after timeout: {e}")
+
+        error_data = {
+            "execution_error": result["error"],
+            "execution_time": result["execution_time"],
+        }
+        if trajectory is not None:
+            error_data["trajectory"] = trajectory
+        try:
+            error_data.update(self.get_vessel_telemetry())
+        except Exception as te:
+            print(f"🔍 ERROR: Failed to collect error telemetry: {te}")
+        return [("error", error_data)]
+
+    @rpc_phase("reset")
     def reset(
         self,
         *,
@@ -563,7 +792,19 @@ class KSPEnv(gym.Env):
         return [("observe"), initial_telemetry]
 
     def close(self):
+        if self.executor:
+            self.executor.close()
+            self.executor = None
+
         # Remove all streams
+        if self.telemetry_sampler:
+            self.telemetry_sampler.close()
+            self.telemetry_sampler = None
+        if self.async_telemetry:
+            self.async_telemetry.close()
+            self.async_telemetry = None
+        if self.telemetry_collector:
+            self.telemetry_collector.clear_streams()
         for stream in self.streams.values():
             try:
                 stream.remove()
@@ -571,10 +812,15 @@ class KSPEnv(gym.Env):
                 pass
         self.streams.clear()
 
-        # Close kRPC connection
-        if self.conn:
+        # Close kRPC connections
+        if self.connection_monitor:
+            self.connection_monitor.close()
+            self.connection_monitor = None
+        self.stream_registry.clear()
+        if self.connection_pool:
             try:
-                self.conn.close()
+                self.connection_pool.close()
+                self.conn = None
                 self.connected = False
                 print("kRPC connection closed")
             except:
@@ -583,10 +829,8 @@ class KSPEnv(gym.Env):
         return not self.connected
 
     def add_stream(self, func, *args, **kwargs):
-        stream = self.conn.add_stream(func, *args, **kwargs)
-        stream_id = f"{func.__name__}_{len(self.streams)}"
-        self.streams[stream_id] = stream
-        return stream
+        """Stream func(*args) through the shared registry; callers keep the handle, e.g. in self.streams."""
+        return self.stream_registry.acquire(self.conn, func, *args, owner="env", **kwargs)
 
     def remove_stream(self, stream_id):
         if stream_id in self.streams:
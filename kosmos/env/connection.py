@@ -0,0 +1,172 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import krpc
+
+
+class ConnectionPool:
+    """
+    kRPC connections of one environment, one dedicated connection per role.
+
+    A kRPC client sends its RPCs one at a time over a single socket, so when
+    telemetry snapshots and agent code share a client, a slow snapshot delays
+    every control command queued behind it. The pool hands out a separate
+    client for each role: "control" for agent code and commands and
+    "telemetry" for the TelemetryCollector. All connections use the address
+    and ports the environment was configured with.
+    """
+
+    ROLES = ("control", "telemetry")
+
+    def __init__(
+        self,
+        address: str = "127.0.0.1",
+        rpc_port: int = 50000,
+        stream_port: int = 50001,
+        name: str = "Kosmos",
+        connect: Callable = krpc.connect,
+        instrumentation=None,
+    ):
+        """
+        Args:
+            address: kRPC server address
+            rpc_port: kRPC RPC port
+            stream_port: kRPC stream port
+            name: Connection name prefix, each connection is named "<name>-<role>"
+            connect: Connection factory with the signature of krpc.connect
+            instrumentation: RPCInstrumentation applied to every connection, if given
+        """
+        self.address = address
+        self.rpc_port = rpc_port
+        self.stream_port = stream_port
+        self.name = name
+        self._connect = connect
+        self.instrumentation = instrumentation
+        self._connections: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def get(self, role: str = "control"):
+        """Return the connection for a role, connecting on first use."""
+        if role not in self.ROLES:
+            raise ValueError(f"Unknown connection role '{role}', expected one of {self.ROLES}")
+
+        with self._lock:
+            conn = self._connections.get(role)
+            if conn is None:
+                conn = self._connect(
+                    name=f"{self.name}-{role}",
+                    address=self.address,
+                    rpc_port=self.rpc_port,
+                    stream_port=self.stream_port,
+                )
+                if self.instrumentation is not None:
+                    self.instrumentation.instrument(conn)
+                self._connections[role] = conn
+            return conn
+
+    def peek(self, role: str) -> Optional[object]:
+        """Return the connection for a role if it is open, without connecting."""
+        return self._connections.get(role)
+
+    def discard(self, role: str):
+        """Close and forget a role's connection, e.g. after it failed, so the next get reconnects."""
+        with self._lock:
+            conn = self._connections.pop(role, None)
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def close(self):
+        """Close every connection in the pool."""
+        for role in list(self._connections):
+            self.discard(role)
+
+
+class ConnectionMonitor:
+    """
+    Health of a kRPC connection, judged from a heartbeat stream instead of probing RPCs.
+
+    KSPEnv used to send a probe RPC (and a MechJeb readiness RPC) at the start
+    of every step and reset just to learn that the connection was still up.
+    The monitor streams the universal time, which the server pushes every
+    physics frame while the game runs, and records when it last heard from
+    the server. check() is then a clock comparison on the healthy path. Only
+    when the heartbeat has gone quiet for longer than stale_after, e.g.
+    because the game is paused, does it send a single probe RPC; a failed
+    probe, or a dead stream connection, marks the connection as failed so the
+    caller reconnects.
+
+    Example:
+        monitor = ConnectionMonitor(conn)
+        if not monitor.check():
+            reconnect(monitor.error)
+    """
+
+    def __init__(self, conn, stale_after: float = 5.0, streams=None):
+        """
+        Args:
+            conn: kRPC connection to watch
+            stale_after: Seconds without a heartbeat after which the connection is probed
+            streams: Optional StreamRegistry the heartbeat stream is shared through
+        """
+        self.conn = conn
+        self.stale_after = stale_after
+        self.error: Optional[str] = None
+        self.probes = 0
+        self._last_heartbeat = time.monotonic()
+        if streams is not None:
+            self._stream = streams.acquire(conn, getattr, conn.space_center, "ut", owner="monitor")
+        else:
+            self._stream = conn.add_stream(getattr, conn.space_center, "ut")
+        self._stream.add_callback(self._on_heartbeat)
+        self._stream.start(wait=False)
+
+    def _on_heartbeat(self, ut):
+        self._last_heartbeat = time.monotonic()
+
+    @property
+    def heartbeat_age(self) -> float:
+        """Seconds since the server last sent a heartbeat."""
+        return time.monotonic() - self._last_heartbeat
+
+    @property
+    def stale(self) -> bool:
+        return self.heartbeat_age > self.stale_after
+
+    def _stream_alive(self) -> bool:
+        thread = getattr(self.conn, "_stream_thread", None)
+        return thread is None or thread.is_alive()
+
+    def check(self) -> bool:
+        """Return whether the connection is usable, probing it only if the heartbeat is stale."""
+        if self.error is not None:
+            return False
+        if not self._stream_alive():
+            self.error = "stream connection closed"
+            return False
+        if not self.stale:
+            return True
+
+        self.probes += 1
+        try:
+            self.conn.krpc.current_game_scene
+        except Exception as e:
+            self.error = f"no heartbeat for {self.heartbeat_age:.1f}s and probe failed: {e}"
+            return False
+        # The server answered; the game is paused or between scenes
+        self._last_heartbeat = time.monotonic()
+        return True
+
+    def mark_failed(self, error: str):
+        """Flag the connection as failed, e.g. after an RPC raised a connection error."""
+        self.error = error
+
+    def close(self):
+        try:
+            self._stream.remove_callback(self._on_heartbeat)
+            self._stream.remove()
+        except Exception:
+            pass
@@ -0,0 +1,368 @@
+import asyncio
+import contextlib
+import math
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import krpc
+
+from .programs import ProgramCache
+from .runner import run_step_code
+from .streams import StreamRegistry
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; CPU limits are then not enforced
+    resource = None
+
+
+class _PipeWriter:
+    """File-like object forwarding complete lines of output to the parent process."""
+
+    def __init__(self, pipe):
+        self._pipe = pipe
+        self._buffer = ""
+
+    def write(self, text: str) -> int:
+        self._buffer += text
+        if "\n" in self._buffer:
+            lines, self._buffer = self._buffer.rsplit("\n", 1)
+            self._pipe.send(("stdout", lines))
+        return len(text)
+
+    def flush(self):
+        if self._buffer:
+            self._pipe.send(("stdout", self._buffer))
+            self._buffer = ""
+
+
+def _limit_cpu(seconds: Optional[float]):
+    """Let the process use at most seconds more CPU time; the kernel kills it with SIGXCPU beyond that."""
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if not seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(math.ceil(usage.ru_utime + usage.ru_stime + seconds))
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+class _WorkerState:
+    """Connection-bound objects a worker keeps between jobs."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.programs = ProgramCache()
+        self.streams = StreamRegistry()
+        self.vessel = None
+        self.collector = None
+        self.telemetry = None
+
+    def context(self) -> Dict[str, Any]:
+        """Globals for executed code, matching the ones KSPEnv.step provides."""
+        # Imported here so a worker only pays for them once it runs code
+        from kosmos.utils.async_telemetry import AsyncTelemetry
+        from kosmos.utils.orbit import read_orbit, sleep_until
+        from kosmos.utils.telemetry_collector import TelemetryCollector
+        from kosmos.utils.waits import StreamWatch, first
+
+        space_center = self.conn.space_center
+        vessel = space_center.active_vessel
+        if vessel != self.vessel:
+            if self.telemetry is not None:
+                self.telemetry.close()
+            self.vessel = vessel
+            self.collector = TelemetryCollector(mode="direct", conn=self.conn)
+            self.collector.stream_registry = self.streams
+            self.collector.set_vessel()
+            self.telemetry = AsyncTelemetry(self.conn, vessel, streams=self.streams)
+
+        def debug_print(*args, **kwargs):
+            print(f"🔍 DEBUG: [KSP Code] {' '.join(str(arg) for arg in args)}")
+
+        return {
+            "conn": self.streams.connection(self.conn, owner="exec"),
+            "vessel": vessel,
+            "space_center": space_center,
+            "print": print,
+            "time": time,
+            "asyncio": asyncio,
+            "krpc": krpc,
+            "get_propulsion_model": self.collector.get_propulsion_model,
+            "read_orbit": read_orbit,
+            "sleep_until": sleep_until,
+            "StreamWatch": StreamWatch,
+            "first": first,
+            "telemetry": self.telemetry,
+            "debug_print": debug_print,
+        }
+
+
+def _run_job(state: _WorkerState, job: Dict[str, Any], pipe) -> Dict[str, Any]:
+    result = {"ok": False, "phase": "programs", "error": None, "error_type": None, "traceback": None}
+    writer = _PipeWriter(pipe)
+    start_time = time.time()
+    _limit_cpu(job.get("cpu_limit"))
+    try:
+        with contextlib.redirect_stdout(writer), contextlib.redirect_stderr(writer):
+            try:
+                context = state.context()
+                if job.get("programs"):
+                    context = dict(state.programs.prepare(job["programs"], context))
+                result["phase"] = "code"
+                run_step_code(job["code"], context)
+                result["ok"] = True
+            except Exception as e:
+                result.update(error=str(e), error_type=type(e).__name__, traceback=traceback.format_exc())
+            finally:
+                writer.flush()
+    finally:
+        _limit_cpu(None)
+        state.streams.release_owner("exec")
+    result["execution_time"] = time.time() - start_time
+    return result
+
+
+def _worker_main(pipe, config: Dict[str, Any]):
+    """Worker process: connect to kRPC once, then run jobs until told to stop."""
+    try:
+        conn = krpc.connect(
+            name=config["name"],
+            address=config["address"],
+            rpc_port=config["rpc_port"],
+            stream_port=config["stream_port"],
+        )
+    except Exception as e:
+        pipe.send(("failed", str(e)))
+        return
+
+    state = _WorkerState(conn)
+    pipe.send(("ready", os.getpid()))
+    try:
+        while True:
+            try:
+                message, payload = pipe.recv()
+            except EOFError:
+                break
+            if message == "stop":
+                break
+            pipe.send(("done", _run_job(state, payload, pipe)))
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class _Worker:
+    def __init__(self, context, config: Dict[str, Any]):
+        self.pipe, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, config), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+
+    def wait_ready(self, timeout: float):
+        """Wait for the worker's kRPC connection, raising RuntimeError if it cannot connect."""
+        if self.ready:
+            return
+        if not self.pipe.poll(timeout):
+            raise RuntimeError(f"Execution worker did not connect to kRPC within {timeout}s")
+        try:
+            message, payload = self.pipe.recv()
+        except (EOFError, OSError):
+            raise RuntimeError("Execution worker exited before connecting to kRPC") from None
+        if message != "ready":
+            raise RuntimeError(f"Execution worker could not connect to kRPC: {payload}")
+        self.ready = True
+
+    def stop(self):
+        """Ask the worker to exit, killing it if it does not."""
+        try:
+            self.pipe.send(("stop", None))
+        except (OSError, ValueError):
+            pass
+        self.process.join(1.0)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1.0)
+        self.pipe.close()
+
+
+class ProcessExecutor:
+    """
+    Runs flight code in worker processes with wall-clock and CPU time limits.
+
+    Code executed inline in KSPEnv.step blocks the agent for as long as it
+    runs; a hung loop blocks it forever. The executor keeps a pool of worker
+    processes started ahead of time, each with its own kRPC connection and
+    compiled program cache, and runs every step's code in one of them. Output
+    is streamed back line by line while the code runs. A worker that exceeds
+    the wall-clock timeout is killed; one that exceeds the CPU limit is killed
+    by the kernel. Either way a replacement is started right away, so the
+    next step finds a warm worker.
+
+    Example:
+        executor = ProcessExecutor(address="127.0.0.1", timeout=120)
+        result = executor.run("launch_vessel(conn)", programs=maneuver_sources)
+        if result["timed_out"]: ...
+    """
+
+    def __init__(
+        self,
+        address: str = "127.0.0.1",
+        rpc_port: int = 50000,
+        stream_port: int = 50001,
+        workers: int = 1,
+        timeout: float = 120.0,
+        cpu_limit: Optional[float] = None,
+        name: str = "Kosmos-exec",
+        start_method: str = "spawn",
+        connect_timeout: float = 30.0,
+        output: Callable[[str], None] = print,
+    ):
+        """
+        Args:
+            address, rpc_port, stream_port: kRPC server the workers connect to
+            workers: Number of warm worker processes
+            timeout: Default wall-clock limit per run in seconds
+            cpu_limit: CPU time limit per run in seconds, None for no limit (Unix only)
+            name: Connection name prefix, each worker connects as "<name>-<index>"
+            start_method: multiprocessing start method for workers
+            connect_timeout: How long to wait for a worker's kRPC connection
+            output: Called with each line the executed code prints
+        """
+        if workers < 1:
+            raise ValueError("An executor needs at least one worker")
+        self.address = address
+        self.rpc_port = rpc_port
+        self.stream_port = stream_port
+        self.workers = workers
+        self.timeout = timeout
+        self.cpu_limit = cpu_limit
+        self.name = name
+        self.connect_timeout = connect_timeout
+        self.output = output
+        self._context = multiprocessing.get_context(start_method)
+        self._idle: List[_Worker] = []
+        self._spawned = 0
+
+    def _spawn(self) -> _Worker:
+        config = {
+            "name": f"{self.name}-{self._spawned}",
+            "address": self.address,
+            "rpc_port": self.rpc_port,
+            "stream_port": self.stream_port,
+        }
+        self._spawned += 1
+        return _Worker(self._context, config)
+
+    def start(self):
+        """Start the worker pool; workers connect to kRPC in the background."""
+        while len(self._idle) < self.workers:
+            self._idle.append(self._spawn())
+
+    def _acquire(self) -> _Worker:
+        self.start()
+        worker = self._idle.pop(0)
+        try:
+            worker.wait_ready(self.connect_timeout)
+        except RuntimeError:
+            worker.kill()
+            raise
+        return worker
+
+    def _replace(self, worker: _Worker):
+        """Kill a worker and start its replacement, which connects while the caller carries on."""
+        worker.kill()
+        self._idle.append(self._spawn())
+
+    def run(
+        self,
+        code: str,
+        programs: Union[str, Sequence[str]] = (),
+        timeout: Optional[float] = None,
+        cpu_limit: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute code in a worker after defining programs there.
+
+        Returns:
+            Dictionary with "ok", the "phase" that failed ("programs" or "code"),
+            "error", "error_type" and "traceback" of the failure, "timed_out",
+            "execution_time" in seconds and the printed "output"
+        """
+        timeout = self.timeout if timeout is None else timeout
+        cpu_limit = self.cpu_limit if cpu_limit is None else cpu_limit
+        worker = self._acquire()
+        output: List[str] = []
+        start_time = time.time()
+        worker.pipe.send(("run", {"code": code, "programs": programs, "cpu_limit": cpu_limit}))
+
+        while True:
+            remaining = start_time + timeout - time.time() if timeout else 0.5
+            if remaining <= 0:
+                self._replace(worker)
+                return self._failure(
+                    f"Execution timed out after {timeout:.0f}s; the worker was killed",
+                    "TimeoutError", start_time, output, timed_out=True,
+                )
+
+            try:
+                if not worker.pipe.poll(min(remaining, 0.5)):
+                    if not worker.process.is_alive():
+                        raise EOFError
+                    continue
+                message, payload = worker.pipe.recv()
+            except (EOFError, OSError):
+                worker.process.join(1.0)
+                exitcode = worker.process.exitcode
+                self._replace(worker)
+                if hasattr(signal, "SIGXCPU") and exitcode == -signal.SIGXCPU:
+                    reason = f"Execution exceeded its CPU limit of {cpu_limit:.0f}s; the worker was killed"
+                else:
+                    reason = f"Execution worker exited unexpectedly (exit code {exitcode})"
+                return self._failure(reason, "WorkerExit", start_time, output)
+
+            if message == "stdout":
+                output.append(payload)
+                for line in payload.split("\n"):
+                    self.output(line)
+            elif message == "done":
+                self._idle.append(worker)
+                payload["timed_out"] = False
+                payload["output"] = "\n".join(output)
+                return payload
+
+    @staticmethod
+    def _failure(error: str, error_type: str, start_time: float, output: List[str], timed_out: bool = False):
+        return {
+            "ok": False,
+            "phase": "code",
+            "error": error,
+            "error_type": error_type,
+            "traceback": None,
+            "timed_out": timed_out,
+            "execution_time": time.time() - start_time,
+            "output": "\n".join(output),
+        }
+
+    def close(self):
+        """Stop every worker."""
+        for worker in self._idle:
+            worker.stop()
+        self._idle = []
@@ -0,0 +1,225 @@
+"""
+Gymnasium interface to KSPEnv.
+
+KSPEnv.step returns the list of events the agents consume, not the
+Gymnasium (observation, reward, terminated, truncated, info) tuple, and its
+observations are nested telemetry dictionaries. KSPGymEnv wraps a KSPEnv
+with a fixed observation vector read from the telemetry, code strings as
+actions and pluggable reward and termination functions, so RL and batch
+evaluation code can drive it like any other Gymnasium environment.
+make_vector_env runs several of them in parallel worker processes.
+
+Example:
+    envs = make_vector_env(simulators=4, simulator_kwargs={"time_scale": 50})
+    observations, infos = envs.reset(seed=0)
+    observations, rewards, terminated, truncated, infos = envs.step(("vessel.control.throttle = 1.0",) * 4)
+    envs.close()
+"""
+
+import functools
+import string
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import AsyncVectorEnv
+
+from .bridge import KSPEnv
+from .simulator import Simulator
+
+
+class ObservationField(NamedTuple):
+    name: str
+    path: Tuple[str, ...]  # Keys into the telemetry dictionary
+    low: float = -np.inf
+    high: float = np.inf
+
+
+OBSERVATION_FIELDS: Tuple[ObservationField, ...] = (
+    ObservationField("altitude", ("altitude",)),
+    ObservationField("surface_altitude", ("surface_altitude",)),
+    ObservationField("speed", ("speed",), 0.0),
+    ObservationField("vertical_speed", ("vertical_speed",)),
+    ObservationField("apoapsis_altitude", ("orbit_parameters", "apoapsis_altitude")),
+    ObservationField("periapsis_altitude", ("orbit_parameters", "periapsis_altitude")),
+    ObservationField("inclination", ("orbit_parameters", "inclination")),
+    ObservationField("eccentricity", ("orbit_parameters", "eccentricity"), 0.0),
+    ObservationField("mass", ("vessel_status", "mass"), 0.0),
+    ObservationField("thrust", ("vessel_status", "thrust"), 0.0),
+    ObservationField("max_thrust", ("vessel_status", "max_thrust"), 0.0),
+    ObservationField("throttle", ("vessel_status", "control_state", "throttle"), 0.0, 1.0),
+    ObservationField("delta_v", ("delta_v", "total"), 0.0),
+    ObservationField("liquid_fuel", ("resources", "LiquidFuel", "amount"), 0.0),
+    ObservationField("electric_charge", ("resources", "ElectricCharge", "amount"), 0.0),
+    ObservationField("universal_time", ("universal_time",), 0.0),
+)
+
+# Characters flight code may contain
+CODE_CHARSET = string.printable
+
+# reward_fn(previous telemetry, telemetry, events) and terminate_fn(telemetry, events)
+RewardFn = Callable[[Dict[str, Any], Dict[str, Any], List[Tuple[str, Any]]], float]
+TerminateFn = Callable[[Dict[str, Any], List[Tuple[str, Any]]], bool]
+
+
+def last_telemetry(events) -> Dict[str, Any]:
+    """Telemetry of the last event, from KSPEnv.step events or the KSPEnv.reset result."""
+    for event in reversed(list(events or ())):
+        data = event[1] if isinstance(event, tuple) else event
+        if isinstance(data, dict):
+            return data
+    return {}
+
+
+class KSPGymEnv(gym.Env):
+    """
+    A KSPEnv behind the Gymnasium Env API.
+
+    Actions are Python flight code, executed by KSPEnv.step together with
+    the given programs. Observations are float32 vectors with one entry per
+    field in fields; a value missing from the telemetry, e.g. after a failed
+    read, is reported as 0. The full telemetry and the step's events are in
+    info. The reward is 0 and episodes only end through max_steps unless
+    reward_fn and terminate_fn are given.
+    """
+
+    metadata = {"render_modes": []}
+
+    def __init__(
+        self,
+        env: Optional[KSPEnv] = None,
+        programs: Union[Sequence[str], Callable[[], Sequence[str]]] = (),
+        fields: Sequence[ObservationField] = OBSERVATION_FIELDS,
+        reward_fn: Optional[RewardFn] = None,
+        terminate_fn: Optional[TerminateFn] = None,
+        max_steps: Optional[int] = None,
+        reset_options: Optional[Dict[str, Any]] = None,
+        max_code_length: int = 65536,
+    ):
+        """
+        Args:
+            env: Environment to wrap, by default a KSPEnv for the local kRPC server
+            programs: Program sources defined before each step's code, or a callable returning them
+            fields: Telemetry values making up the observation vector
+            reward_fn: Reward of a step from the previous and new telemetry and the events
+            terminate_fn: Whether a step ended the episode, from the new telemetry and the events
+            max_steps: Steps after which an episode is truncated, None for no limit
+            reset_options: Default options for KSPEnv.reset
+            max_code_length: Longest code accepted by the action space
+        """
+        self.env = env if env is not None else KSPEnv()
+        self.programs = programs
+        self.fields = tuple(fields)
+        self.reward_fn = reward_fn
+        self.terminate_fn = terminate_fn
+        self.max_steps = max_steps
+        self.reset_options = reset_options
+        self.observation_space = spaces.Box(
+            low=np.array([field.low for field in self.fields], dtype=np.float32),
+            high=np.array([field.high for field in self.fields], dtype=np.float32),
+            dtype=np.float32,
+        )
+        self.action_space = spaces.Text(max_code_length, min_length=0, charset=CODE_CHARSET)
+        self._telemetry: Dict[str, Any] = {}
+        self._steps = 0
+
+    def observe(self, telemetry: Dict[str, Any]) -> np.ndarray:
+        """Observation vector of a telemetry dictionary."""
+        values = np.zeros(len(self.fields), dtype=np.float32)
+        for i, field in enumerate(self.fields):
+            value = telemetry
+            for key in field.path:
+                value = value.get(key) if isinstance(value, dict) else None
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                continue
+            if np.isfinite(value):
+                values[i] = value
+        return np.clip(values, self.observation_space.low, self.observation_space.high)
+
+    def reset(self, *, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None):
+        super().reset(seed=seed)
+        result = self.env.reset(options=options if options is not None else self.reset_options)
+        self._telemetry = last_telemetry(result)
+        self._steps = 0
+        return self.observe(self._telemetry), {"telemetry": self._telemetry}
+
+    def step(self, action: str):
+        programs = self.programs() if callable(self.programs) else self.programs
+        events = self.env.step(action, programs=programs)
+        telemetry = last_telemetry(events)
+
+        reward = float(self.reward_fn(self._telemetry, telemetry, events)) if self.reward_fn else 0.0
+        terminated = bool(self.terminate_fn(telemetry, events)) if self.terminate_fn else False
+        self._steps += 1
+        truncated = self.max_steps is not None and self._steps >= self.max_steps
+        self._telemetry = telemetry
+
+        info = {
+            "events": [event_type for event_type, _ in events],
+            "execution_error": telemetry.get("execution_error"),
+            "telemetry": telemetry,
+        }
+        return self.observe(telemetry), reward, terminated, truncated, info
+
+    def close(self):
+        self.env.close()
+
+
+def make_env(
+    address: str = "127.0.0.1",
+    rpc_port: int = 50000,
+    stream_port: int = 50001,
+    simulator_kwargs: Optional[Dict[str, Any]] = None,
+    env_kwargs: Optional[Dict[str, Any]] = None,
+    **kwargs,
+) -> KSPGymEnv:
+    """
+    Build a KSPGymEnv for a kRPC server, or for a new Simulator if simulator_kwargs is given.
+
+    Module-level so vector env workers can build their env from a pickled partial.
+    """
+    env_kwargs = dict(env_kwargs or {})
+    if simulator_kwargs is not None:
+        env_kwargs["connect"] = Simulator(**simulator_kwargs).connect
+    env = KSPEnv(krpc_address=address, krpc_rpc_port=rpc_port, krpc_stream_port=stream_port, **env_kwargs)
+    return KSPGymEnv(env, **kwargs)
+
+
+def make_vector_env(
+    addresses: Sequence[Tuple[str, int, int]] = (),
+    simulators: int = 0,
+    simulator_kwargs: Optional[Dict[str, Any]] = None,
+    env_kwargs: Optional[Dict[str, Any]] = None,
+    context: str = "spawn",
+    **kwargs,
+) -> AsyncVectorEnv:
+    """
+    Step several KSPGymEnvs in parallel, each in its own worker process.
+
+    Args:
+        addresses: (address, rpc_port, stream_port) of each KSP instance to drive
+        simulators: Number of additional envs flying offline simulators
+        simulator_kwargs: Simulator arguments for the simulated envs
+        env_kwargs: Further KSPEnv arguments shared by all envs
+        context: multiprocessing start method for the workers
+        kwargs: KSPGymEnv arguments; reward_fn, terminate_fn and programs must be picklable
+
+    Returns:
+        An AsyncVectorEnv; step it with one code string per env
+    """
+    env_fns = [
+        functools.partial(make_env, address, rpc_port, stream_port, env_kwargs=env_kwargs, **kwargs)
+        for address, rpc_port, stream_port in addresses
+    ]
+    env_fns += [
+        functools.partial(make_env, simulator_kwargs=dict(simulator_kwargs or {}), env_kwargs=env_kwargs, **kwargs)
+        for _ in range(simulators)
+    ]
+    if not env_fns:
+        raise ValueError("A vector env needs at least one kRPC address or simulator")
+    # Workers running code in execution processes of their own cannot be daemonic
+    daemon = (env_kwargs or {}).get("execution_backend", "inline") != "process"
+    return AsyncVectorEnv(env_fns, context=context, daemon=daemon)
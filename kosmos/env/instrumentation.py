@@ -0,0 +1,220 @@
+import functools
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+import numpy as np
+import krpc.schema.KRPC_pb2 as KRPC
+from krpc.encoder import Encoder
+
+
+# Upper bounds (ms) of the latency histogram buckets; slower requests land in a final overflow bucket
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Procedures that manage streams; their calls are attributed to stream setup whatever the active phase
+STREAM_PROCEDURES = frozenset({"AddStream", "StartStream", "SetStreamRate", "RemoveStream"})
+STREAM_SETUP = "stream_setup"
+
+# Latencies kept per window for percentiles
+MAX_WINDOW_SAMPLES = 10000
+
+_ENTRY_CALL = re.compile(r"^\s*(?:await\s+)?(?:asyncio\.run\(\s*)?([\w.]+)\(")
+
+
+def _size_prefix_length(size: int) -> int:
+    """Bytes of the varint length prefix kRPC puts in front of a message."""
+    return max((size.bit_length() + 6) // 7, 1)
+
+
+class RPCStats:
+    """RPC counts, bytes and latencies over one window (e.g. a step)."""
+
+    def __init__(self):
+        self.requests = 0
+        self.calls = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.rpc_time = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latencies: List[float] = []
+        self.procedures: Dict[str, List[float]] = {}  # procedure -> [calls, time]
+        self.phases: Dict[str, Dict[str, float]] = {}
+
+    def record(self, phase: str, procedures: List[str], sent: int, received: int, latency: float):
+        self.requests += 1
+        self.calls += len(procedures)
+        self.bytes_sent += sent
+        self.bytes_received += received
+        self.rpc_time += latency
+        latency_ms = latency * 1000.0
+        self.histogram[int(np.searchsorted(LATENCY_BUCKETS_MS, latency_ms, side="left"))] += 1
+        if len(self.latencies) < MAX_WINDOW_SAMPLES:
+            self.latencies.append(latency_ms)
+
+        # A batched request's latency is shared evenly among its calls
+        share = latency / len(procedures) if procedures else 0.0
+        for procedure in procedures:
+            entry = self.procedures.setdefault(procedure, [0, 0.0])
+            entry[0] += 1
+            entry[1] += share
+            call_phase = STREAM_SETUP if procedure.rsplit(".", 1)[-1] in STREAM_PROCEDURES else phase
+            stats = self.phases.setdefault(call_phase, {"calls": 0, "time": 0.0})
+            stats["calls"] += 1
+            stats["time"] += share
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """JSON-serializable summary, with the procedures that took the most time first."""
+        latency = {"histogram": {}}
+        bounds = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        for bound, count in zip(bounds, self.histogram):
+            if count:
+                latency["histogram"][bound] = count
+        if self.latencies:
+            values = np.array(self.latencies)
+            latency.update(
+                p50=float(np.percentile(values, 50)),
+                p90=float(np.percentile(values, 90)),
+                max=float(values.max()),
+            )
+        procedures = sorted(self.procedures.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "requests": self.requests,
+            "calls": self.calls,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "rpc_time": self.rpc_time,
+            "latency_ms": latency,
+            "phases": {
+                phase: {"calls": int(stats["calls"]), "time": stats["time"]}
+                for phase, stats in sorted(self.phases.items(), key=lambda item: item[1]["time"], reverse=True)
+            },
+            "top_procedures": [
+                {"procedure": procedure, "calls": calls, "time": total}
+                for procedure, (calls, total) in procedures[:top]
+            ],
+        }
+
+
+class _InstrumentedConnection:
+    """Wraps a client's RPC socket connection, timing each request/response exchange."""
+
+    def __init__(self, inner, instrumentation: "RPCInstrumentation"):
+        self._inner = inner
+        self._instrumentation = instrumentation
+        self._pending = None
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    def send_message(self, message):
+        data = Encoder.encode_message_with_size(message)
+        if isinstance(message, KRPC.Request):
+            procedures = [f"{call.service}.{call.procedure}" for call in message.calls]
+            self._pending = (procedures, len(data), time.perf_counter())
+        self._inner.send(data)
+
+    def receive_message(self, typ):
+        message = self._inner.receive_message(typ)
+        pending, self._pending = self._pending, None
+        if pending is not None and typ is KRPC.Response:
+            procedures, sent, started = pending
+            size = message.ByteSize()
+            self._instrumentation.record(
+                procedures, sent, size + _size_prefix_length(size), time.perf_counter() - started
+            )
+        return message
+
+
+class RPCInstrumentation:
+    """
+    Counts, sizes and times the RPCs of instrumented kRPC clients.
+
+    Every request is attributed to the active phase (set with phase(), e.g.
+    "reset", "exec" or "telemetry:orbital"), except stream management calls,
+    which count as "stream_setup". Statistics are kept both for the current
+    window, which start_window() resets at the start of every step, and for
+    the whole session.
+
+    Example:
+        instrumentation = RPCInstrumentation()
+        conn = instrumentation.instrument(krpc.connect())
+        instrumentation.start_window()
+        with instrumentation.phase("exec"):
+            ...
+        telemetry["perf"] = instrumentation.summary()
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()  # Phase stack per thread, so sampler threads keep their own phases
+        self.window = RPCStats()
+        self.total = RPCStats()
+        self._window_started = time.monotonic()
+
+    def instrument(self, conn):
+        """Instrument a kRPC client in place and return it. Clients without an RPC socket are returned unchanged."""
+        inner = getattr(conn, "_rpc_connection", None)
+        if inner is not None and not isinstance(inner, _InstrumentedConnection):
+            conn._rpc_connection = _InstrumentedConnection(inner, self)
+        return conn
+
+    @property
+    def _phases(self) -> List[str]:
+        if not hasattr(self._local, "phases"):
+            self._local.phases = []
+        return self._local.phases
+
+    @property
+    def current_phase(self) -> str:
+        phases = self._phases
+        return phases[-1] if phases else "idle"
+
+    @contextmanager
+    def phase(self, name: str):
+        """Attribute the RPCs made inside the block to a phase; phases nest."""
+        self._phases.append(name)
+        try:
+            yield
+        finally:
+            self._phases.pop()
+
+    def record(self, procedures: List[str], sent: int, received: int, latency: float):
+        with self._lock:
+            phase = self.current_phase
+            self.window.record(phase, procedures, sent, received, latency)
+            self.total.record(phase, procedures, sent, received, latency)
+
+    def start_window(self):
+        """Start a new measurement window, e.g. at the beginning of a step."""
+        with self._lock:
+            self.window = RPCStats()
+            self._window_started = time.monotonic()
+
+    def summary(self, total: bool = False) -> Dict[str, Any]:
+        """Summary of the current window (or of the whole session), for telemetry["perf"]."""
+        with self._lock:
+            stats = self.total if total else self.window
+            summary = stats.summary()
+        if not total:
+            summary["wall_time"] = time.monotonic() - self._window_started
+        return summary
+
+
+def rpc_phase(name: str):
+    """Method decorator attributing the RPCs a method makes to a phase of self.instrumentation."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.instrumentation.phase(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def exec_phase(code: str) -> str:
+    """Phase name for executed code, naming the entry point its last line calls (e.g. "exec:launch_vessel")."""
+    lines = [line for line in code.strip().splitlines() if line.strip()]
+    match = _ENTRY_CALL.match(lines[-1]) if lines else None
+    return f"exec:{match.group(1)}" if match else "exec"
@@ -0,0 +1,229 @@
+import contextlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .bridge import KSPEnv
+from .simulator import Simulator
+
+
+class EnvPool:
+    """
+    A fixed set of KSPEnv instances leased out to concurrent rollouts.
+
+    A single KSPEnv runs one rollout at a time, and most of a rollout is spent
+    waiting for the LLM or for flight code to finish. The pool owns one env
+    per KSP instance (or simulator) and hands each to one rollout at a time.
+    Before an env is leased its connection is checked through the heartbeat
+    monitor; an env that fails the check or its reset is set aside and
+    retried after retry_interval seconds, so one crashed game does not stall
+    the other rollouts. Returned envs are reset before they are leased again.
+
+    Example:
+        pool = EnvPool.from_addresses([("127.0.0.1", 50000, 50001), ("127.0.0.1", 50010, 50011)])
+        results = pool.map(lambda env, mission: run_mission(env, mission), missions)
+        pool.close()
+    """
+
+    def __init__(
+        self,
+        envs: Sequence[KSPEnv],
+        reset_options: Optional[Dict[str, Any]] = None,
+        retry_interval: float = 30.0,
+    ):
+        """
+        Args:
+            envs: Environments to manage; the pool closes them on close()
+            reset_options: Options for KSPEnv.reset when an env is first leased and when it is returned
+            retry_interval: Seconds before an env that failed its health check or reset is tried again
+        """
+        if not envs:
+            raise ValueError("An environment pool needs at least one environment")
+        self.envs = list(envs)
+        self.reset_options = {"mode": "hard", "wait_time": 0.1} if reset_options is None else dict(reset_options)
+        self.retry_interval = retry_interval
+        self._condition = threading.Condition()
+        self._idle: List[KSPEnv] = list(self.envs)
+        self._leased: List[KSPEnv] = []
+        self._broken: Dict[KSPEnv, Tuple[float, str]] = {}  # env -> (time it failed, error)
+        self._needs_reset = set(self.envs)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+
+    @classmethod
+    def from_addresses(cls, addresses: Iterable[Tuple[str, int, int]], env_kwargs: Optional[Dict[str, Any]] = None, **kwargs) -> "EnvPool":
+        """
+        One env per kRPC server.
+
+        Args:
+            addresses: (address, rpc_port, stream_port) of each KSP instance
+            env_kwargs: Further KSPEnv arguments shared by all envs
+        """
+        env_kwargs = env_kwargs or {}
+        envs = [
+            KSPEnv(krpc_address=address, krpc_rpc_port=rpc_port, krpc_stream_port=stream_port, **env_kwargs)
+            for address, rpc_port, stream_port in addresses
+        ]
+        return cls(envs, **kwargs)
+
+    @classmethod
+    def simulated(cls, size: int, simulator_kwargs: Optional[Dict[str, Any]] = None,
+                  env_kwargs: Optional[Dict[str, Any]] = None, **kwargs) -> "EnvPool":
+        """
+        size envs, each flying its own offline Simulator.
+
+        Args:
+            simulator_kwargs: Simulator arguments, e.g. {"time_scale": 50}
+            env_kwargs: Further KSPEnv arguments shared by all envs
+        """
+        simulator_kwargs = simulator_kwargs or {}
+        env_kwargs = env_kwargs or {}
+        envs = [KSPEnv(connect=Simulator(**simulator_kwargs).connect, **env_kwargs) for _ in range(size)]
+        return cls(envs, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.envs)
+
+    def _healthy(self, env: KSPEnv) -> bool:
+        """Heartbeat check of a connected env; no RPC on the healthy path."""
+        if not env.connected or env.conn is None:
+            return False
+        return env.connection_monitor is None or env.connection_monitor.check()
+
+    def _prepare(self, env: KSPEnv) -> Optional[str]:
+        """Reset env if it needs it or fails its health check; returns the error if it cannot be used."""
+        try:
+            if env in self._needs_reset or not self._healthy(env):
+                env.reset(options=dict(self.reset_options))
+                if not env.connected:
+                    return "not connected after reset"
+            self._needs_reset.discard(env)
+            return None
+        except Exception as e:
+            return str(e) or type(e).__name__
+
+    def _revive_broken(self):
+        """Move envs whose retry interval has passed back to the idle list. Caller holds the lock."""
+        now = time.monotonic()
+        for env, (failed_at, _) in list(self._broken.items()):
+            if now - failed_at >= self.retry_interval:
+                del self._broken[env]
+                self._needs_reset.add(env)
+                self._idle.append(env)
+
+    def acquire(self, timeout: Optional[float] = None) -> KSPEnv:
+        """
+        Lease a healthy, reset env, waiting for one to become free.
+
+        Raises:
+            TimeoutError: If no env could be leased within timeout seconds
+            RuntimeError: If the pool is closed
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Environment pool is closed")
+                    self._revive_broken()
+                    if self._idle:
+                        env = self._idle.pop(0)
+                        self._leased.append(env)
+                        break
+                    wait = None if deadline is None else deadline - time.monotonic()
+                    if wait is not None and wait <= 0:
+                        raise TimeoutError(f"No environment became available within {timeout}s")
+                    if self._broken:
+                        # Wake up for the next retry even if nothing is returned
+                        next_retry = min(failed_at for failed_at, _ in self._broken.values()) + self.retry_interval
+                        retry_wait = max(next_retry - time.monotonic(), 0.0)
+                        wait = retry_wait if wait is None else min(wait, retry_wait)
+                    self._condition.wait(wait)
+
+            # Health check and reset outside the lock, so other leases are not blocked
+            error = self._prepare(env)
+            if error is None:
+                return env
+            print(f"⚠️ WARNING: Environment at {env.krpc_address}:{env.krpc_rpc_port} is unavailable ({error}), "
+                  f"retrying it in {self.retry_interval:g}s")
+            with self._condition:
+                self._leased.remove(env)
+                self._broken[env] = (time.monotonic(), error)
+                self._condition.notify_all()
+
+    def release(self, env: KSPEnv, reset: bool = True):
+        """Return a leased env; with reset it is reset before its next lease."""
+        with self._condition:
+            if env not in self._leased:
+                raise ValueError("Environment is not leased from this pool")
+            self._leased.remove(env)
+            if reset:
+                self._needs_reset.add(env)
+            self._idle.append(env)
+            self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def lease(self, timeout: Optional[float] = None, reset: bool = True):
+        """Lease an env for the duration of a with block."""
+        env = self.acquire(timeout)
+        try:
+            yield env
+        finally:
+            self.release(env, reset=reset)
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Run fn(env, *args, **kwargs) on a leased env in a background thread."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Environment pool is closed")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=len(self.envs), thread_name_prefix="kosmos-rollout")
+
+        def run():
+            with self.lease() as env:
+                return fn(env, *args, **kwargs)
+
+        return self._executor.submit(run)
+
+    def map(self, fn: Callable[[KSPEnv, Any], Any], items: Iterable[Any]) -> List[Any]:
+        """
+        Run fn(env, item) for every item, as many at a time as there are envs.
+
+        Returns:
+            Results in the order of items; the first exception raised by fn is re-raised
+        """
+        futures = [self.submit(fn, item) for item in items]
+        return [future.result() for future in futures]
+
+    def status(self) -> Dict[str, Any]:
+        """Counts of idle, leased and unavailable envs, with the errors of the unavailable ones."""
+        with self._condition:
+            return {
+                "size": len(self.envs),
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                "unavailable": {
+                    f"{env.krpc_address}:{env.krpc_rpc_port}": error for env, (_, error) in self._broken.items()
+                },
+            }
+
+    def close(self):
+        """Wait for running rollouts, then close every env."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for env in self.envs:
+            try:
+                env.close()
+            except Exception as e:
+                print(f"⚠️ WARNING: Could not close environment: {e}")
+
+    def __enter__(self) -> "EnvPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
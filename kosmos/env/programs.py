@@ -0,0 +1,85 @@
+import hashlib
+from collections import OrderedDict
+from types import CodeType
+from typing import Any, Dict, Iterable, Mapping, Set, Union
+
+
+class ProgramCache:
+    """
+    Compiled maneuver programs and the namespace they define.
+
+    KSPEnv.step used to exec the whole maneuver library (every learned
+    maneuver plus the control primitives) before running each step's code,
+    so every step paid to parse and compile the complete library again. The
+    cache keeps compiled code objects keyed by the SHA-256 of their source
+    and a prepared namespace holding the definitions of every program run so
+    far. A step only executes programs the namespace has not seen yet, e.g.
+    a newly learned maneuver. If a program disappears or changes, the
+    namespace is rebuilt from the cached code objects without recompiling.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Args:
+            max_entries: Maximum number of compiled programs kept, least recently used are dropped first
+        """
+        self.max_entries = max_entries
+        self.namespace: Dict[str, Any] = {}
+        self.stats = {"compiled": 0, "hits": 0, "executed": 0, "rebuilds": 0}
+        self._code: "OrderedDict[str, CodeType]" = OrderedDict()
+        self._prepared: Set[str] = set()
+
+    @staticmethod
+    def key(source: str) -> str:
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    def compile(self, source: str) -> CodeType:
+        """Return the compiled code of a program, compiling it only the first time it is seen."""
+        key = self.key(source)
+        code = self._code.get(key)
+        if code is not None:
+            self._code.move_to_end(key)
+            self.stats["hits"] += 1
+            return code
+
+        code = compile(source, f"<program {key[:12]}>", "exec")
+        self._code[key] = code
+        if len(self._code) > self.max_entries:
+            self._code.popitem(last=False)
+        self.stats["compiled"] += 1
+        return code
+
+    def prepare(self, programs: Union[str, Iterable[str]], context: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Return the namespace with every program defined.
+
+        Args:
+            programs: Program sources, or one string holding all of them
+            context: Globals the programs run against (conn, vessel, ...); refreshed on every call
+
+        Programs are executed in order; definitions of programs added later
+        replace earlier ones with the same name.
+        """
+        sources = [programs] if isinstance(programs, str) else list(programs)
+        sources = [source for source in sources if source and source.strip()]
+        keys = [self.key(source) for source in sources]
+
+        if not self._prepared.issubset(keys):
+            # A program changed or was removed: start over so stale definitions disappear
+            self.namespace = {}
+            self._prepared = set()
+            self.stats["rebuilds"] += 1
+
+        self.namespace.update(context)
+        for key, source in zip(keys, sources):
+            if key in self._prepared:
+                continue
+            exec(self.compile(source), self.namespace)
+            self._prepared.add(key)
+            self.stats["executed"] += 1
+        return self.namespace
+
+    def clear(self):
+        """Forget the prepared namespace; compiled code is kept."""
+        self.namespace = {}
+        self._prepared = set()
@@ -0,0 +1,393 @@
+import bisect
+import gzip
+import struct
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+import krpc
+import krpc.schema.KRPC_pb2 as KRPC
+from krpc.client import Client
+from krpc.connection import Connection
+from krpc.decoder import Decoder
+from krpc.encoder import Encoder
+from krpc.error import ConnectionError as KRPCConnectionError
+
+
+MAGIC = b"KOSMOSRPC1"
+
+# Record header: kind, connection index, seconds since the recording started, payload length
+_HEADER = struct.Struct("<BHdI")
+
+# Record kinds
+OPEN = 0  # A client connected; payload is a stream flag byte and the client name
+REQUEST = 1  # A size-prefixed Request as sent
+RESPONSE = 2  # The Response to the connection's last request
+STREAM_UPDATE = 3  # A StreamUpdate received on the connection's stream socket
+
+# A replayed response stops waiting for the stream updates recorded before it once the stream
+# thread has made no progress for this long, e.g. while the caller holds a lock the thread needs
+UPDATE_STALL = 0.05
+
+
+class TrafficRecord(NamedTuple):
+    kind: int
+    connection: int
+    time: float
+    payload: bytes
+
+
+def _open_log(path, mode: str):
+    """Traffic logs are gzip-compressed when their name ends in .gz."""
+    return gzip.open(path, mode) if str(path).endswith(".gz") else open(path, mode)
+
+
+def _varint(value: int) -> bytes:
+    data = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            data.append(byte | 0x80)
+        else:
+            data.append(byte)
+            return bytes(data)
+
+
+def read_traffic(path) -> Iterator[TrafficRecord]:
+    """Iterate over the records of a traffic log; a record cut short by a crash ends the log."""
+    with _open_log(path, "rb") as log:
+        if log.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a kRPC traffic log")
+        while True:
+            header = log.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            kind, connection, timestamp, length = _HEADER.unpack(header)
+            payload = log.read(length)
+            if len(payload) < length:
+                return
+            yield TrafficRecord(kind, connection, timestamp, payload)
+
+
+def _handshake(connection: Connection, request: KRPC.ConnectionRequest) -> KRPC.ConnectionResponse:
+    """Open a socket connection and introduce the client, as krpc.connect does."""
+    connection.connect()
+    connection.send_message(request)
+    response = connection.receive_message(KRPC.ConnectionResponse)
+    if response.status != KRPC.ConnectionResponse.OK:
+        raise KRPCConnectionError(response.message)
+    return response
+
+
+class _RecordingConnection(Connection):
+    """A kRPC socket connection that logs the messages it carries once recording is on."""
+
+    def __init__(self, address: str, port: int, recorder: "TrafficRecorder", index: int, stream: bool = False):
+        super().__init__(address, port)
+        self._recorder = recorder
+        self._index = index
+        self._stream = stream
+        self.recording = False  # Off during the handshake
+
+    def send(self, data: bytes):
+        super().send(data)
+        if self.recording:
+            self._recorder._write(REQUEST, self._index, data)
+
+    def receive_message(self, typ):
+        message = super().receive_message(typ)
+        if self.recording and typ is KRPC.Response:
+            self._recorder._write(RESPONSE, self._index, message.SerializeToString())
+        return message
+
+    def receive(self, length: int) -> bytes:
+        data = super().receive(length)
+        # The stream thread reads the size prefix byte by byte, then each update whole
+        if self.recording and self._stream:
+            self._recorder._write(STREAM_UPDATE, self._index, data)
+        return data
+
+
+class TrafficRecorder:
+    """
+    Records the kRPC traffic of every client it connects to a binary log.
+
+    Each connection's requests, responses and stream updates are written as
+    they pass, with a timestamp, as the raw protobuf bytes kRPC puts on the
+    wire (gzip-compressed if the path ends in .gz). TrafficReplay serves a
+    log back without a server, so a session's telemetry and exec workload
+    can be rerun offline against collector or bridge changes.
+
+    Example:
+        recorder = TrafficRecorder("session.krpclog.gz")
+        env = KSPEnv(connect=recorder.connect)
+        ...
+        env.close()
+        recorder.close()
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._log = _open_log(path, "wb")
+        self._log.write(MAGIC)
+        self._started = time.monotonic()
+        self._connections = 0
+        self.records = 0
+        self.bytes = 0
+
+    def connect(
+        self,
+        name: Optional[str] = None,
+        address: str = krpc.DEFAULT_ADDRESS,
+        rpc_port: int = krpc.DEFAULT_RPC_PORT,
+        stream_port: Optional[int] = krpc.DEFAULT_STREAM_PORT,
+    ) -> Client:
+        """Connect to a kRPC server like krpc.connect, recording the connection's traffic."""
+        with self._lock:
+            index = self._connections
+            self._connections += 1
+
+        rpc_connection = _RecordingConnection(address, rpc_port, self, index)
+        request = KRPC.ConnectionRequest(type=KRPC.ConnectionRequest.RPC)
+        if name is not None:
+            request.client_name = name
+        response = _handshake(rpc_connection, request)
+
+        stream_connection = None
+        if stream_port is not None:
+            stream_connection = _RecordingConnection(address, stream_port, self, index, stream=True)
+            _handshake(stream_connection, KRPC.ConnectionRequest(
+                type=KRPC.ConnectionRequest.STREAM, client_identifier=response.client_identifier
+            ))
+            stream_connection.recording = True
+
+        self._write(OPEN, index, bytes([stream_connection is not None]) + (name or "").encode())
+        rpc_connection.recording = True
+        return Client(rpc_connection, stream_connection)
+
+    def _write(self, kind: int, index: int, payload: bytes):
+        with self._lock:
+            if self._log is None:
+                return
+            self._log.write(_HEADER.pack(kind, index, time.monotonic() - self._started, len(payload)))
+            self._log.write(payload)
+            self.records += 1
+            self.bytes += _HEADER.size + len(payload)
+
+    def close(self):
+        """Finish the log; traffic of connections still open is no longer recorded."""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def __enter__(self) -> "TrafficRecorder":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _ReplayedConnection:
+    """
+    Recorded traffic of one client: RPC exchanges matched by request, stream updates in order.
+
+    A request is answered with the response of the earliest unserved recorded
+    exchange with the same request bytes. Stream updates are released up to
+    the next recorded exchange after the latest one served, and a response is
+    only returned once the updates recorded before it have been delivered,
+    so stream values seen after each call match the recording.
+    """
+
+    def __init__(self, name: str, streaming: bool):
+        self.name = name
+        self.streaming = streaming
+        self._responses: Dict[bytes, deque] = {}
+        self._exchange_seqs: List[int] = []
+        self._update_seqs: List[int] = []
+        self._updates: List[bytes] = []
+        self._condition = threading.Condition()
+        self._position = -1  # Sequence number of the latest exchange served
+        self._next_update = 0
+        self._delivered = 0
+        self.closed = False
+        self.served = 0
+
+    def _add_exchange(self, seq: int, request: bytes, response: bytes):
+        self._responses.setdefault(request, deque()).append((seq, response))
+        self._exchange_seqs.append(seq)
+
+    def _add_update(self, seq: int, payload: bytes):
+        self._update_seqs.append(seq)
+        self._updates.append(payload)
+
+    @property
+    def exchanges(self) -> int:
+        return len(self._exchange_seqs)
+
+    def exchange(self, request: bytes) -> bytes:
+        with self._condition:
+            queue = self._responses.get(request)
+            if not queue:
+                call = KRPC.Request.FromString(request[len(_varint(Decoder.decode_message_size(request))):])
+                procedures = ", ".join(f"{c.service}.{c.procedure}" for c in call.calls)
+                raise RuntimeError(f"Request not in the recording of connection '{self.name}': {procedures}")
+            seq, response = queue.popleft()
+            self._position = max(self._position, seq)
+            self._condition.notify_all()
+
+            # Let the stream thread deliver the updates this response came after
+            if self.streaming:
+                recorded_before = bisect.bisect_left(self._update_seqs, seq)
+                while self._delivered < recorded_before and not self.closed:
+                    delivered = self._delivered
+                    self._condition.wait(UPDATE_STALL)
+                    if self._delivered == delivered:
+                        break
+            self.served += 1
+            return response
+
+    def _releasable(self) -> bool:
+        if self._next_update >= len(self._updates):
+            return False
+        following = bisect.bisect_right(self._exchange_seqs, self._position)
+        limit = self._exchange_seqs[following] if following < len(self._exchange_seqs) else float("inf")
+        return self._update_seqs[self._next_update] < limit
+
+    def next_update(self, timeout: float) -> Optional[bytes]:
+        """Next stream update to deliver, None if none is due within timeout."""
+        with self._condition:
+            # The stream thread asks for the next update once the previous one is processed
+            self._delivered = self._next_update
+            self._condition.notify_all()
+            if not self._releasable() and not self.closed:
+                self._condition.wait(timeout)
+            if self.closed or not self._releasable():
+                return None
+            payload = self._updates[self._next_update]
+            self._next_update += 1
+            return payload
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "exchanges": self.exchanges,
+            "served": self.served,
+            "updates": len(self._updates),
+            "delivered": self._next_update,
+        }
+
+
+class _ReplayRPCConnection:
+    """Stands in for a client's RPC socket, answering from the recording."""
+
+    def __init__(self, replayed: _ReplayedConnection):
+        self._replayed = replayed
+        self._request: Optional[bytes] = None
+
+    def send_message(self, message):
+        self.send(Encoder.encode_message_with_size(message))
+
+    def send(self, data: bytes):
+        self._request = data
+
+    def receive_message(self, typ):
+        request, self._request = self._request, None
+        return Decoder.decode_message(self._replayed.exchange(request), typ)
+
+    def close(self):
+        pass
+
+
+class _ReplayStreamConnection:
+    """Stands in for a client's stream socket, feeding recorded updates to its stream thread."""
+
+    def __init__(self, replayed: _ReplayedConnection):
+        self._replayed = replayed
+        self._buffer = b""
+
+    def partial_receive(self, length: int, timeout: float = 0.01) -> bytes:
+        if not self._buffer:
+            payload = self._replayed.next_update(timeout)
+            if payload is None:
+                return b""
+            self._buffer = _varint(len(payload)) + payload
+        data, self._buffer = self._buffer[:length], self._buffer[length:]
+        return data
+
+    def receive(self, length: int) -> bytes:
+        data, self._buffer = self._buffer[:length], self._buffer[length:]
+        return data
+
+    def close(self):
+        self._replayed.close()
+
+
+class TrafficReplay:
+    """
+    Serves a traffic log recorded by TrafficRecorder back to kRPC clients, without a server.
+
+    connect() returns a real krpc Client for the next recorded connection, in
+    the order they were opened, whose calls are answered from the log as
+    fast as possible instead of at the recorded pace. Replaying code that
+    makes the same calls reproduces the session's responses and stream
+    values deterministically; a call the session never made raises
+    RuntimeError.
+
+    Example:
+        replay = TrafficReplay("session.krpclog.gz")
+        env = KSPEnv(connect=replay.connect)
+        ...
+        print(replay.summary())
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connections: List[_ReplayedConnection] = []
+        self._opened = 0
+
+        by_index: Dict[int, _ReplayedConnection] = {}
+        pending: Dict[int, bytes] = {}  # Last unanswered request per connection
+        for seq, record in enumerate(read_traffic(path)):
+            if record.kind == OPEN:
+                replayed = _ReplayedConnection(record.payload[1:].decode(), record.payload[:1] == b"\x01")
+                by_index[record.connection] = replayed
+                self._connections.append(replayed)
+            elif record.connection not in by_index:
+                continue
+            elif record.kind == REQUEST:
+                pending[record.connection] = record.payload
+            elif record.kind == RESPONSE and record.connection in pending:
+                by_index[record.connection]._add_exchange(seq, pending.pop(record.connection), record.payload)
+            elif record.kind == STREAM_UPDATE:
+                by_index[record.connection]._add_update(seq, record.payload)
+
+    def connect(
+        self,
+        name: Optional[str] = None,
+        address: Optional[str] = None,
+        rpc_port: Optional[int] = None,
+        stream_port: Optional[int] = None,
+    ) -> Client:
+        """Client for the next recorded connection; the arguments of krpc.connect are accepted and ignored."""
+        with self._lock:
+            index = self._opened
+            self._opened += 1
+        if index >= len(self._connections):
+            raise RuntimeError(f"The recording has only {len(self._connections)} connections")
+        replayed = self._connections[index]
+        stream_connection = _ReplayStreamConnection(replayed) if replayed.streaming else None
+        return Client(_ReplayRPCConnection(replayed), stream_connection)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Exchanges served and stream updates delivered per recorded connection."""
+        return [connection.summary() for connection in self._connections]
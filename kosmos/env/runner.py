@@ -0,0 +1,93 @@
+import ast
+import asyncio
+import concurrent.futures
+import inspect
+from types import CodeType
+from typing import Any, Dict
+
+
+# Name under which the await helper is placed in the execution globals
+AWAIT_HELPER = "__kosmos_await__"
+
+
+async def _await_if_needed(value):
+    """Await value if it is awaitable, e.g. the coroutine returned by calling an async primitive."""
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+class _AwaitTopLevelCalls(ast.NodeTransformer):
+    """
+    Await the result of every call made by a top-level statement.
+
+    Calling an async def primitive without await (launch_vessel(conn)) only
+    creates a coroutine. Wrapping the call in await __kosmos_await__(...) runs
+    it while leaving calls to plain functions unchanged. Function and class
+    bodies are left alone; only the statements the step runs directly are
+    rewritten. asyncio.run(coro) becomes a plain await, since the code
+    already runs on an event loop.
+    """
+
+    def _skip(self, node):
+        return node
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = visit_Lambda = _skip
+
+    def _wrap(self, call: ast.Call) -> ast.expr:
+        func = call.func
+        if (
+            isinstance(func, ast.Attribute) and func.attr == "run"
+            and isinstance(func.value, ast.Name) and func.value.id == "asyncio"
+            and len(call.args) == 1 and not call.keywords
+        ):
+            call = call.args[0]
+        helper = ast.Name(id=AWAIT_HELPER, ctx=ast.Load())
+        return ast.copy_location(ast.Await(value=ast.Call(func=helper, args=[call], keywords=[])), call)
+
+    def visit_Expr(self, node: ast.Expr):
+        if isinstance(node.value, ast.Call):
+            node.value = self._wrap(node.value)
+        return node
+
+    def visit_Assign(self, node):
+        if isinstance(node.value, ast.Call):
+            node.value = self._wrap(node.value)
+        return node
+
+    visit_AnnAssign = visit_Assign
+
+
+def compile_step_code(code: str, filename: str = "<code>") -> CodeType:
+    """
+    Compile a step's code so coroutines started by its top-level calls are awaited.
+
+    The result is a coroutine code object when the code makes any call; it
+    allows top-level await, so code can also await primitives explicitly
+    or run several at once with asyncio.gather.
+    """
+    tree = _AwaitTopLevelCalls().visit(ast.parse(code, filename, "exec"))
+    ast.fix_missing_locations(tree)
+    return compile(tree, filename, "exec", flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT)
+
+
+def run_step_code(code: str, context: Dict[str, Any]) -> Any:
+    """
+    Execute a step's code in context, driving the coroutines it starts on an event loop.
+
+    Tasks the code started but did not await are cancelled when it finishes.
+    """
+    compiled = compile_step_code(code)
+    context.setdefault(AWAIT_HELPER, _await_if_needed)
+    if not compiled.co_flags & inspect.CO_COROUTINE:
+        exec(compiled, context)
+        return None
+
+    coroutine = eval(compiled, context)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    # Called from inside an event loop: give the code a loop of its own in another thread
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coroutine).result()
@@ -0,0 +1,1468 @@
+"""
+Offline stand-in for a kRPC server running KSP.
+
+Simulator is an in-process fake kRPC client backed by a small physics model:
+one vessel around one body, integrated with NumPy (two-body gravity, engine
+thrust and propellant flow, an exponential atmosphere with drag, a flat
+non-rotating surface). It implements the part of the SpaceCenter surface
+that KSPEnv, TelemetryCollector, TelemetrySampler, AsyncTelemetry and the
+control primitives use, so whole reset/step loops can run and be benchmarked
+without KSP.
+
+Simulation time follows the wall clock scaled by time_scale and is advanced
+lazily whenever a value is read or a control is set; warp_to jumps ahead
+immediately. Remote objects are plain Python objects, so there is no RPC
+traffic to instrument and batched reads fall back to one call per read.
+
+Example:
+    sim = Simulator(time_scale=20.0)
+    env = KSPEnv(connect=sim.connect)
+    env.reset()
+    env.step("launch_vessel(conn)", programs=maneuver_sources)
+"""
+
+import contextlib
+import copy
+import itertools
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+G0 = 9.80665  # Standard gravity, converts Isp to exhaust velocity (m/s^2)
+
+# Fixed physics steps in seconds: under thrust or in the atmosphere, and coasting in vacuum
+POWERED_STEP = 0.02
+COAST_STEP = 0.5
+
+# Wall-clock seconds one sync may spend integrating; if physics falls further behind,
+# simulation time runs slower than time_scale, like KSP's clock under load
+MAX_SYNC_TIME = 0.1
+
+# kg per unit of each resource
+RESOURCE_DENSITY = {
+    "LiquidFuel": 5.0,
+    "Oxidizer": 5.0,
+    "SolidFuel": 7.5,
+    "MonoPropellant": 4.0,
+    "ElectricCharge": 0.0,
+}
+
+# Propellant mixtures by mass
+LFO = {"LiquidFuel": 0.45, "Oxidizer": 0.55}
+SOLID = {"SolidFuel": 1.0}
+
+
+class VesselSituation(Enum):
+    pre_launch = 0
+    orbiting = 1
+    sub_orbital = 2
+    escaping = 3
+    flying = 4
+    landed = 5
+    splashed = 6
+    docked = 7
+
+
+class VesselType(Enum):
+    ship = 0
+    station = 1
+    lander = 2
+    probe = 3
+    rover = 4
+    base = 5
+    debris = 6
+
+
+class SASMode(Enum):
+    stability_assist = 0
+    maneuver = 1
+    prograde = 2
+    retrograde = 3
+    normal = 4
+    anti_normal = 5
+    radial = 6
+    anti_radial = 7
+    target = 8
+    anti_target = 9
+
+
+class ControlState(Enum):
+    full = 0
+    partial = 1
+    none = 2
+
+
+class ControlSource(Enum):
+    kerbal = 0
+    probe = 1
+    none = 2
+
+
+class ControlInputMode(Enum):
+    additive = 0
+    override = 1
+
+
+class ResourceFlowMode(Enum):
+    vessel = 0
+    stage = 1
+    adjacent = 2
+    none = 3
+
+
+class GameScene(Enum):
+    space_center = 0
+    flight = 1
+    tracking_station = 2
+    editor_vab = 3
+    editor_sph = 4
+
+
+@dataclass(frozen=True)
+class BodySpec:
+    name: str
+    gravitational_parameter: float  # m^3/s^2
+    equatorial_radius: float  # m
+    sphere_of_influence: float  # m
+    atmosphere_depth: float = 0.0  # m, 0 for airless bodies
+    surface_pressure: float = 0.0  # Pa
+    surface_density: float = 0.0  # kg/m^3
+    scale_height: float = 5600.0  # m
+
+
+KERBIN = BodySpec(
+    name="Kerbin",
+    gravitational_parameter=3.5316e12,
+    equatorial_radius=600000.0,
+    sphere_of_influence=84159286.0,
+    atmosphere_depth=70000.0,
+    surface_pressure=101325.0,
+    surface_density=1.225,
+)
+
+
+@dataclass(frozen=True)
+class PartSpec:
+    name: str
+    mass: float  # dry mass, kg
+    stage: int = -1  # stage that activates the part (engines), -1 for never
+    decouple_stage: int = -1  # stage that decouples the part, -1 for never
+    resources: Dict[str, float] = field(default_factory=dict)  # resource -> capacity in units
+    max_vacuum_thrust: float = 0.0  # N, 0 for parts without an engine
+    vacuum_isp: float = 0.0  # s
+    sea_level_isp: float = 0.0  # s
+    propellants: Dict[str, float] = field(default_factory=dict)  # resource -> mass fraction
+
+
+# Two-stage orbital rocket: pod and Terrier upper stage on a Swivel booster
+DEFAULT_CRAFT: Tuple[PartSpec, ...] = (
+    PartSpec("mk1pod.v2", 840.0, resources={"ElectricCharge": 50.0, "MonoPropellant": 10.0}),
+    PartSpec("fuelTank", 250.0, resources={"LiquidFuel": 180.0, "Oxidizer": 220.0}),
+    PartSpec("liquidEngine3.v2", 500.0, stage=1, max_vacuum_thrust=60000.0,
+             vacuum_isp=345.0, sea_level_isp=85.0, propellants=LFO),
+    PartSpec("Decoupler.1", 50.0, stage=1, decouple_stage=1),
+    PartSpec("Rockomax16.BW", 1000.0, decouple_stage=1, resources={"LiquidFuel": 720.0, "Oxidizer": 880.0}),
+    PartSpec("liquidEngine2", 1500.0, stage=2, decouple_stage=1, max_vacuum_thrust=215000.0,
+             vacuum_isp=320.0, sea_level_isp=250.0, propellants=LFO),
+)
+
+
+_object_ids = itertools.count(1)
+
+
+class _Remote:
+    """Base of simulated remote objects; _object_id identifies them like kRPC objects."""
+
+    def __init__(self, sim: "Simulator"):
+        self._sim = sim
+        self._object_id = next(_object_ids)
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def _quaternion(matrix: np.ndarray) -> Tuple[float, float, float, float]:
+    """(x, y, z, w) quaternion of a rotation matrix."""
+    m = matrix
+    w = math.sqrt(max(0.0, 1.0 + m[0, 0] + m[1, 1] + m[2, 2])) / 2.0
+    x = math.copysign(math.sqrt(max(0.0, 1.0 + m[0, 0] - m[1, 1] - m[2, 2])) / 2.0, m[2, 1] - m[1, 2])
+    y = math.copysign(math.sqrt(max(0.0, 1.0 - m[0, 0] + m[1, 1] - m[2, 2])) / 2.0, m[0, 2] - m[2, 0])
+    z = math.copysign(math.sqrt(max(0.0, 1.0 - m[0, 0] - m[1, 1] + m[2, 2])) / 2.0, m[1, 0] - m[0, 1])
+    return (x, y, z, w)
+
+
+def _tuple(vector: np.ndarray) -> Tuple[float, float, float]:
+    return tuple(float(value) for value in vector)
+
+
+def orbital_elements(r: np.ndarray, v: np.ndarray, mu: float) -> Dict[str, float]:
+    """Keplerian elements of a state vector (angles in radians, as kRPC reports them)."""
+    radius = float(np.linalg.norm(r))
+    speed = float(np.linalg.norm(v))
+    h = np.cross(r, v)
+    h_norm = float(np.linalg.norm(h))
+    node = np.cross((0.0, 0.0, 1.0), h)
+    node_norm = float(np.linalg.norm(node))
+    e_vec = np.cross(v, h) / mu - r / radius
+    e = float(np.linalg.norm(e_vec))
+    energy = speed ** 2 / 2 - mu / radius
+    a = -mu / (2 * energy) if energy != 0 else math.inf
+
+    inclination = math.acos(max(-1.0, min(1.0, h[2] / h_norm))) if h_norm > 0 else 0.0
+    lan = math.atan2(node[1], node[0]) % (2 * math.pi) if node_norm > 1e-9 else 0.0
+    if e > 1e-9:
+        reference = node / node_norm if node_norm > 1e-9 else np.array([1.0, 0.0, 0.0])
+        argument = math.acos(max(-1.0, min(1.0, float(np.dot(reference, e_vec)) / e)))
+        if e_vec[2] < 0 and node_norm > 1e-9:
+            argument = 2 * math.pi - argument
+        true_anomaly = math.acos(max(-1.0, min(1.0, float(np.dot(e_vec, r)) / (e * radius))))
+        if np.dot(r, v) < 0:
+            true_anomaly = 2 * math.pi - true_anomaly
+    else:
+        argument = 0.0
+        reference = node / node_norm if node_norm > 1e-9 else np.array([1.0, 0.0, 0.0])
+        true_anomaly = math.acos(max(-1.0, min(1.0, float(np.dot(reference, r)) / radius)))
+        if r[2] < 0:
+            true_anomaly = 2 * math.pi - true_anomaly
+
+    if e < 1:
+        eccentric = 2 * math.atan2(math.sqrt(1 - e) * math.sin(true_anomaly / 2), math.sqrt(1 + e) * math.cos(true_anomaly / 2))
+        mean = (eccentric - e * math.sin(eccentric)) % (2 * math.pi)
+        eccentric %= 2 * math.pi
+        n = math.sqrt(mu / a ** 3)
+        period = 2 * math.pi / n
+        time_to_periapsis = ((2 * math.pi - mean) % (2 * math.pi)) / n
+        time_to_apoapsis = ((math.pi - mean) % (2 * math.pi)) / n
+        apoapsis = a * (1 + e)
+        semi_minor = a * math.sqrt(1 - e ** 2)
+    else:
+        nu = true_anomaly if true_anomaly <= math.pi else true_anomaly - 2 * math.pi
+        eccentric = 2 * math.atanh(math.sqrt((e - 1) / (e + 1)) * math.tan(nu / 2))
+        mean = e * math.sinh(eccentric) - eccentric
+        n = math.sqrt(mu / -a ** 3) if a < 0 else 0.0
+        period = math.nan
+        time_to_periapsis = -mean / n if n else math.nan
+        time_to_apoapsis = math.nan
+        apoapsis = a * (1 + e)
+        semi_minor = a * math.sqrt(e ** 2 - 1) if a < 0 else math.nan
+
+    return {
+        "semi_major_axis": a,
+        "semi_minor_axis": semi_minor,
+        "eccentricity": e,
+        "inclination": inclination,
+        "longitude_of_ascending_node": lan,
+        "argument_of_periapsis": argument,
+        "mean_anomaly": mean,
+        "eccentric_anomaly": eccentric,
+        "true_anomaly": true_anomaly,
+        "apoapsis": apoapsis,
+        "periapsis": a * (1 - e),
+        "period": period,
+        "time_to_apoapsis": time_to_apoapsis,
+        "time_to_periapsis": time_to_periapsis,
+        "speed": speed,
+        "radius": radius,
+    }
+
+
+class _Part:
+    """Mutable state of one part: its spec, remaining resources and engine state."""
+
+    def __init__(self, spec: PartSpec):
+        self.spec = spec
+        self.amounts = dict(spec.resources)
+        self.thrust_limit = 1.0
+        self.active = False
+
+    @property
+    def mass(self) -> float:
+        return self.spec.mass + sum(RESOURCE_DENSITY.get(name, 0.0) * amount for name, amount in self.amounts.items())
+
+
+class _VesselState:
+    """Physics state of the simulated vessel in the body-centered inertial frame (z = north pole)."""
+
+    def __init__(self, sim: "Simulator", craft: Sequence[PartSpec]):
+        body = sim.body_spec
+        self.r = np.array([body.equatorial_radius, 0.0, 0.0])
+        self.v = np.zeros(3)
+        self.forward = np.array([1.0, 0.0, 0.0])  # nose points up on the pad
+        self.parts = [_Part(spec) for spec in craft]
+        self.current_stage = max(part.stage for part in craft) + 1 if craft else 0
+        self.launched = False
+        self.launch_ut: Optional[float] = None
+        self.throttle = 0.0
+        self.sas = False
+        self.sas_mode = SASMode.stability_assist
+        self.autopilot = False
+        self.target_pitch = 90.0
+        self.target_heading = 90.0
+        self.target_roll = math.nan
+        self.nodes: List["Node"] = []
+        self.thrust = 0.0
+        self.acceleration = np.zeros(3)  # non-gravitational, for g-force
+        self.drag = np.zeros(3)
+        self.flags = {name: False for name in ("rcs", "brakes", "gear", "lights", "abort", "stage_lock")}
+        self.inputs = {name: 0.0 for name in (
+            "pitch", "yaw", "roll", "forward", "up", "right", "wheel_steering", "wheel_throttle",
+            "custom_axis01", "custom_axis02", "custom_axis03", "custom_axis04",
+        )}
+
+    @property
+    def mass(self) -> float:
+        return sum(part.mass for part in self.parts)
+
+
+class _Frame(_Remote):
+    """A reference frame; kind is one of body, vessel, orbital or surface."""
+
+    def __init__(self, sim: "Simulator", kind: str):
+        super().__init__(sim)
+        self.kind = kind
+
+    def basis(self) -> np.ndarray:
+        """Rows are the frame's x, y and z axes in the inertial frame."""
+        return self._sim._basis(self.kind)
+
+    def origin(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Position and velocity of the frame's origin in the inertial frame."""
+        state = self._sim._state
+        if self.kind == "body":
+            return np.zeros(3), np.zeros(3)
+        return state.r, state.v
+
+
+class CelestialBody(_Remote):
+    def __init__(self, sim: "Simulator", spec: BodySpec):
+        super().__init__(sim)
+        self.spec = spec
+        self.reference_frame = _Frame(sim, "body")
+        self.non_rotating_reference_frame = self.reference_frame
+        self.orbit = None
+        self.satellites: List["CelestialBody"] = []
+
+    name = property(lambda self: self.spec.name)
+    gravitational_parameter = property(lambda self: self.spec.gravitational_parameter)
+    mass = property(lambda self: self.spec.gravitational_parameter / 6.67430e-11)
+    equatorial_radius = property(lambda self: self.spec.equatorial_radius)
+    sphere_of_influence = property(lambda self: self.spec.sphere_of_influence)
+    surface_gravity = property(lambda self: self.spec.gravitational_parameter / self.spec.equatorial_radius ** 2)
+    has_atmosphere = property(lambda self: self.spec.atmosphere_depth > 0)
+    atmosphere_depth = property(lambda self: self.spec.atmosphere_depth)
+    has_atmospheric_oxygen = property(lambda self: self.spec.atmosphere_depth > 0)
+    rotational_period = property(lambda self: math.inf)  # The surface does not rotate
+    rotational_speed = property(lambda self: 0.0)
+
+    def pressure_at(self, altitude: float) -> float:
+        return self._sim._atmosphere(altitude)[0]
+
+    def density_at(self, altitude: float) -> float:
+        return self._sim._atmosphere(altitude)[1]
+
+    def surface_height(self, latitude: float, longitude: float) -> float:
+        return 0.0
+
+    bedrock_height = surface_height
+
+
+class Orbit(_Remote):
+    def __init__(self, sim: "Simulator", body: CelestialBody):
+        super().__init__(sim)
+        self.body = body
+        self.next_orbit = None
+
+    def _elements(self) -> Dict[str, float]:
+        return self._sim._elements()
+
+    def __getattr__(self, name):
+        if name in ("semi_major_axis", "semi_minor_axis", "eccentricity", "inclination",
+                    "longitude_of_ascending_node", "argument_of_periapsis", "mean_anomaly",
+                    "eccentric_anomaly", "true_anomaly", "apoapsis", "periapsis", "period",
+                    "time_to_apoapsis", "time_to_periapsis", "speed", "radius"):
+            return self._elements()[name]
+        raise AttributeError(name)
+
+    @property
+    def orbital_speed(self) -> float:
+        return self._elements()["speed"]
+
+    @property
+    def apoapsis_altitude(self) -> float:
+        return self._elements()["apoapsis"] - self.body.spec.equatorial_radius
+
+    @property
+    def periapsis_altitude(self) -> float:
+        return self._elements()["periapsis"] - self.body.spec.equatorial_radius
+
+    @property
+    def time_to_soi_change(self) -> float:
+        return math.nan
+
+    @property
+    def epoch(self) -> float:
+        return self._sim.ut
+
+    @property
+    def mean_anomaly_at_epoch(self) -> float:
+        return self._elements()["mean_anomaly"]
+
+
+class Flight(_Remote):
+    """Flight telemetry in a reference frame (the vessel's surface frame by default)."""
+
+    def __init__(self, sim: "Simulator", frame: _Frame):
+        super().__init__(sim)
+        self.frame = frame
+
+    def _local(self, vector: np.ndarray) -> Tuple[float, float, float]:
+        return _tuple(self.frame.basis() @ vector)
+
+    @property
+    def _altitude(self) -> float:
+        state = self._sim._sync()
+        return float(np.linalg.norm(state.r)) - self._sim.body_spec.equatorial_radius
+
+    mean_altitude = surface_altitude = bedrock_altitude = property(lambda self: self._altitude)
+    elevation = property(lambda self: 0.0)
+
+    @property
+    def latitude(self) -> float:
+        r = self._sim._sync().r
+        return math.degrees(math.asin(r[2] / np.linalg.norm(r)))
+
+    @property
+    def longitude(self) -> float:
+        r = self._sim._sync().r
+        return math.degrees(math.atan2(r[1], r[0]))
+
+    @property
+    def speed(self) -> float:
+        return float(np.linalg.norm(self._sim._sync().v))
+
+    true_air_speed = speed
+
+    @property
+    def vertical_speed(self) -> float:
+        state = self._sim._sync()
+        return float(np.dot(state.v, _unit(state.r)))
+
+    @property
+    def horizontal_speed(self) -> float:
+        return math.sqrt(max(0.0, self.speed ** 2 - self.vertical_speed ** 2))
+
+    @property
+    def velocity(self) -> Tuple[float, float, float]:
+        return self._local(self._sim._sync().v)
+
+    @property
+    def atmosphere_density(self) -> float:
+        return self._sim._atmosphere(self._altitude)[1]
+
+    @property
+    def static_pressure(self) -> float:
+        return self._sim._atmosphere(self._altitude)[0]
+
+    @property
+    def static_pressure_at_msl(self) -> float:
+        return self._sim.body_spec.surface_pressure
+
+    @property
+    def dynamic_pressure(self) -> float:
+        return 0.5 * self.atmosphere_density * self.speed ** 2
+
+    @property
+    def equivalent_air_speed(self) -> float:
+        density = self.atmosphere_density
+        surface = self._sim.body_spec.surface_density
+        return self.speed * math.sqrt(density / surface) if surface else 0.0
+
+    @property
+    def mach(self) -> float:
+        return self.speed / 340.0 if self.atmosphere_density > 0 else 0.0
+
+    @property
+    def terminal_velocity(self) -> float:
+        density = self.atmosphere_density
+        state = self._sim._sync()
+        if density <= 0:
+            return 0.0
+        gravity = self._sim.body_spec.gravitational_parameter / float(np.dot(state.r, state.r))
+        return math.sqrt(2 * state.mass * gravity / (density * self._sim.drag_area))
+
+    @property
+    def drag(self) -> Tuple[float, float, float]:
+        return self._local(self._sim._sync().drag)
+
+    aerodynamic_force = drag
+    lift = property(lambda self: (0.0, 0.0, 0.0))
+    center_of_mass = property(lambda self: (0.0, 0.0, 0.0))
+    sideslip_angle = property(lambda self: 0.0)
+
+    @property
+    def g_force(self) -> float:
+        return float(np.linalg.norm(self._sim._sync().acceleration)) / G0
+
+    @property
+    def direction(self) -> Tuple[float, float, float]:
+        return self._local(self._sim._sync().forward)
+
+    @property
+    def rotation(self) -> Tuple[float, float, float, float]:
+        self._sim._sync()
+        return _quaternion(self.frame.basis() @ self._sim._basis("vessel").T)
+
+    @property
+    def heading(self) -> float:
+        up, north, east = self._sim._basis("surface")
+        forward = self._sim._sync().forward
+        return math.degrees(math.atan2(np.dot(forward, east), np.dot(forward, north))) % 360.0
+
+    @property
+    def pitch(self) -> float:
+        up = self._sim._basis("surface")[0]
+        return math.degrees(math.asin(max(-1.0, min(1.0, float(np.dot(self._sim._sync().forward, up))))))
+
+    @property
+    def roll(self) -> float:
+        return 0.0
+
+    @property
+    def angle_of_attack(self) -> float:
+        state = self._sim._sync()
+        if not np.any(state.v):
+            return 0.0
+        return math.degrees(math.acos(max(-1.0, min(1.0, float(np.dot(state.forward, _unit(state.v)))))))
+
+    def _orbital_axis(self, index: int, sign: float = 1.0) -> Tuple[float, float, float]:
+        return self._local(sign * self._sim._basis("orbital")[index])
+
+    prograde = property(lambda self: self._orbital_axis(1))
+    retrograde = property(lambda self: self._orbital_axis(1, -1.0))
+    normal = property(lambda self: self._orbital_axis(2))
+    anti_normal = property(lambda self: self._orbital_axis(2, -1.0))
+    radial = property(lambda self: self._orbital_axis(0))
+    anti_radial = property(lambda self: self._orbital_axis(0, -1.0))
+
+
+class Engine(_Remote):
+    def __init__(self, sim: "Simulator", part: "Part"):
+        super().__init__(sim)
+        self.part = part
+
+    @property
+    def _state(self) -> _Part:
+        return self.part._state
+
+    @property
+    def active(self) -> bool:
+        self._sim._sync()
+        return self._state.active
+
+    @property
+    def thrust_limit(self) -> float:
+        return self._state.thrust_limit
+
+    @thrust_limit.setter
+    def thrust_limit(self, value: float):
+        self._sim._sync()
+        self._state.thrust_limit = max(0.0, min(1.0, float(value)))
+
+    max_vacuum_thrust = property(lambda self: self._state.spec.max_vacuum_thrust)
+    vacuum_specific_impulse = property(lambda self: self._state.spec.vacuum_isp)
+    kerbin_sea_level_specific_impulse = property(lambda self: self._state.spec.sea_level_isp)
+    propellant_names = property(lambda self: list(self._state.spec.propellants))
+
+    @property
+    def specific_impulse(self) -> float:
+        return self._sim._isp(self._state.spec, self._sim._pressure_ratio())
+
+    @property
+    def max_thrust(self) -> float:
+        spec = self._state.spec
+        return spec.max_vacuum_thrust * self.specific_impulse / spec.vacuum_isp if spec.vacuum_isp else 0.0
+
+    @property
+    def available_thrust(self) -> float:
+        return self.max_thrust * self._state.thrust_limit if self.active and self.has_fuel else 0.0
+
+    @property
+    def thrust(self) -> float:
+        self._sim._sync()
+        return self._sim._engine_thrust.get(id(self._state), 0.0)
+
+    @property
+    def has_fuel(self) -> bool:
+        return self._sim._propellant_fraction(self._state, 1.0) > 0
+
+
+class Part(_Remote):
+    def __init__(self, sim: "Simulator", state: _Part):
+        super().__init__(sim)
+        self._state = state
+        self.engine = Engine(sim, self) if state.spec.max_vacuum_thrust > 0 else None
+        self.resources = Resources(sim, lambda: [state] if state in sim._state.parts else [])
+
+    name = title = property(lambda self: self._state.spec.name)
+    stage = property(lambda self: self._state.spec.stage)
+    decouple_stage = property(lambda self: self._state.spec.decouple_stage)
+    dry_mass = property(lambda self: self._state.spec.mass)
+    parachute = None
+    docking_port = None
+
+    @property
+    def mass(self) -> float:
+        self._sim._sync()
+        return self._state.mass
+
+
+class Parts(_Remote):
+    def __init__(self, sim: "Simulator"):
+        super().__init__(sim)
+        self._parts: Dict[int, Part] = {}
+
+    @property
+    def all(self) -> List[Part]:
+        self._sim._sync()
+        attached = []
+        for state in self._sim._state.parts:
+            part = self._parts.get(id(state))
+            if part is None:
+                part = self._parts[id(state)] = Part(self._sim, state)
+            attached.append(part)
+        return attached
+
+    @property
+    def engines(self):
+        return [part.engine for part in self.all if part.engine is not None]
+
+    @property
+    def root(self) -> Part:
+        return self.all[0]
+
+    parachutes = docking_ports = decouplers = property(lambda self: [])
+
+    def with_name(self, name: str) -> List[Part]:
+        return [part for part in self.all if part.name == name]
+
+    with_title = with_name
+
+    def in_stage(self, stage: int) -> List[Part]:
+        return [part for part in self.all if part.stage == stage]
+
+    def in_decouple_stage(self, stage: int) -> List[Part]:
+        return [part for part in self.all if part.decouple_stage == stage]
+
+
+class Resources(_Remote):
+    """Resources of a set of parts, chosen by a callable so the set follows staging."""
+
+    def __init__(self, sim: "Simulator", parts: Callable[[], List[_Part]]):
+        super().__init__(sim)
+        self._parts = parts
+
+    def _totals(self, attribute: str) -> Dict[str, float]:
+        self._sim._sync()
+        totals: Dict[str, float] = {}
+        for part in self._parts():
+            source = part.amounts if attribute == "amount" else part.spec.resources
+            for name, value in source.items():
+                totals[name] = totals.get(name, 0.0) + value
+        return totals
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._totals("max"))
+
+    def has_resource(self, name: str) -> bool:
+        return name in self._totals("max")
+
+    def amount(self, name: str) -> float:
+        return float(self._totals("amount").get(name, 0.0))
+
+    def max(self, name: str) -> float:
+        return float(self._totals("max").get(name, 0.0))
+
+    def density(self, name: str) -> float:
+        return RESOURCE_DENSITY.get(name, 0.0)
+
+    def flow_mode(self, name: str) -> ResourceFlowMode:
+        return ResourceFlowMode.none if name == "SolidFuel" else ResourceFlowMode.stage
+
+    enabled = True
+
+
+class Node(_Remote):
+    """A maneuver node; its burn vector is fixed in the inertial frame once burning starts."""
+
+    def __init__(self, sim: "Simulator", ut: float, prograde: float, normal: float, radial: float):
+        super().__init__(sim)
+        self.ut = ut
+        self.prograde = prograde
+        self.normal = normal
+        self.radial = radial
+        self.applied = np.zeros(3)  # Delta-v applied by engines since the node was created
+        self._target: Optional[np.ndarray] = None
+
+    @property
+    def delta_v(self) -> float:
+        return math.sqrt(self.prograde ** 2 + self.normal ** 2 + self.radial ** 2)
+
+    def _burn_vector(self) -> np.ndarray:
+        if self._target is not None:
+            return self._target
+        radial, prograde, normal = self._sim._basis("orbital")
+        return self.prograde * prograde + self.normal * normal + self.radial * radial
+
+    def _remaining(self) -> np.ndarray:
+        self._sim._sync()
+        return self._burn_vector() - self.applied
+
+    @property
+    def remaining_delta_v(self) -> float:
+        return float(np.linalg.norm(self._remaining()))
+
+    def burn_vector(self, reference_frame: Optional[_Frame] = None):
+        frame = reference_frame or self._sim.active_vessel.orbital_reference_frame
+        return _tuple(frame.basis() @ self._burn_vector())
+
+    def remaining_burn_vector(self, reference_frame: Optional[_Frame] = None):
+        frame = reference_frame or self._sim.active_vessel.orbital_reference_frame
+        return _tuple(frame.basis() @ self._remaining())
+
+    @property
+    def time_to(self) -> float:
+        return self.ut - self._sim.ut
+
+    def remove(self):
+        with self._sim.lock:
+            if self in self._sim._state.nodes:
+                self._sim._state.nodes.remove(self)
+
+
+def _control_property(name: str, group: str):
+    def getter(self):
+        return getattr(self._sim._sync(), group)[name]
+
+    def setter(self, value):
+        with self._sim.lock:
+            getattr(self._sim._sync(), group)[name] = value
+
+    return property(getter, setter)
+
+
+class Control(_Remote):
+    def __init__(self, sim: "Simulator"):
+        super().__init__(sim)
+        self.state = ControlState.full
+        self.source = ControlSource.kerbal
+        self.input_mode = ControlInputMode.additive
+
+    def _set(self, attribute: str, value):
+        with self._sim.lock:
+            setattr(self._sim._sync(), attribute, value)
+
+    throttle = property(lambda self: self._sim._sync().throttle,
+                        lambda self, value: self._set("throttle", max(0.0, min(1.0, float(value)))))
+    sas = property(lambda self: self._sim._sync().sas, lambda self, value: self._set("sas", bool(value)))
+    sas_mode = property(lambda self: self._sim._sync().sas_mode, lambda self, value: self._set("sas_mode", value))
+    current_stage = property(lambda self: self._sim._sync().current_stage)
+
+    rcs = _control_property("rcs", "flags")
+    brakes = _control_property("brakes", "flags")
+    gear = _control_property("gear", "flags")
+    lights = _control_property("lights", "flags")
+    abort = _control_property("abort", "flags")
+    stage_lock = _control_property("stage_lock", "flags")
+    pitch = _control_property("pitch", "inputs")
+    yaw = _control_property("yaw", "inputs")
+    roll = _control_property("roll", "inputs")
+    forward = _control_property("forward", "inputs")
+    up = _control_property("up", "inputs")
+    right = _control_property("right", "inputs")
+    wheel_steering = _control_property("wheel_steering", "inputs")
+    wheel_throttle = _control_property("wheel_throttle", "inputs")
+    custom_axis01 = _control_property("custom_axis01", "inputs")
+    custom_axis02 = _control_property("custom_axis02", "inputs")
+    custom_axis03 = _control_property("custom_axis03", "inputs")
+    custom_axis04 = _control_property("custom_axis04", "inputs")
+
+    def activate_next_stage(self) -> list:
+        return self._sim._activate_next_stage()
+
+    @property
+    def nodes(self) -> List[Node]:
+        return list(self._sim._sync().nodes)
+
+    def add_node(self, ut: float, prograde: float = 0.0, normal: float = 0.0, radial: float = 0.0) -> Node:
+        with self._sim.lock:
+            node = Node(self._sim, ut, prograde, normal, radial)
+            self._sim._sync().nodes.append(node)
+            return node
+
+    def remove_nodes(self):
+        with self._sim.lock:
+            self._sim._sync().nodes.clear()
+
+
+class AutoPilot(_Remote):
+    """Points the vessel at its target pitch and heading instantly; wait() returns at once."""
+
+    def __init__(self, sim: "Simulator"):
+        super().__init__(sim)
+        self.reference_frame = None
+
+    def engage(self):
+        with self._sim.lock:
+            self._sim._sync().autopilot = True
+
+    def disengage(self):
+        with self._sim.lock:
+            self._sim._sync().autopilot = False
+
+    engaged = property(lambda self: self._sim._sync().autopilot)
+
+    def target_pitch_and_heading(self, pitch: float, heading: float):
+        with self._sim.lock:
+            state = self._sim._sync()
+            state.target_pitch, state.target_heading = float(pitch), float(heading)
+
+    def _target(name: str):
+        def setter(self, value):
+            with self._sim.lock:
+                setattr(self._sim._sync(), name, float(value))
+        return property(lambda self: getattr(self._sim._state, name), setter)
+
+    target_pitch = _target("target_pitch")
+    target_heading = _target("target_heading")
+    target_roll = _target("target_roll")
+    del _target
+
+    def wait(self):
+        return None
+
+    error = property(lambda self: 0.0)
+
+
+class Vessel(_Remote):
+    def __init__(self, sim: "Simulator", name: str, body: CelestialBody):
+        super().__init__(sim)
+        self.name = name
+        self.type = VesselType.ship
+        self.reference_frame = _Frame(sim, "vessel")
+        self.orbital_reference_frame = _Frame(sim, "orbital")
+        self.surface_reference_frame = _Frame(sim, "surface")
+        self.surface_velocity_reference_frame = self.surface_reference_frame
+        self.orbit = Orbit(sim, body)
+        self.control = Control(sim)
+        self.auto_pilot = AutoPilot(sim)
+        self.parts = Parts(sim)
+        self.resources = Resources(sim, lambda: sim._state.parts)
+        self._flights: Dict[int, Flight] = {}
+        self.crew_count = 1
+        self.crew_capacity = 1
+        self.recoverable = True
+        self.biome = ""
+
+    def flight(self, reference_frame: Optional[_Frame] = None) -> Flight:
+        frame = reference_frame or self.surface_reference_frame
+        flight = self._flights.get(frame._object_id)
+        if flight is None:
+            flight = self._flights[frame._object_id] = Flight(self._sim, frame)
+        return flight
+
+    def position(self, reference_frame: _Frame) -> Tuple[float, float, float]:
+        state = self._sim._sync()
+        origin, _ = reference_frame.origin()
+        return _tuple(reference_frame.basis() @ (state.r - origin))
+
+    def velocity(self, reference_frame: _Frame) -> Tuple[float, float, float]:
+        state = self._sim._sync()
+        _, origin_velocity = reference_frame.origin()
+        return _tuple(reference_frame.basis() @ (state.v - origin_velocity))
+
+    def direction(self, reference_frame: _Frame) -> Tuple[float, float, float]:
+        return _tuple(reference_frame.basis() @ self._sim._sync().forward)
+
+    def rotation(self, reference_frame: _Frame) -> Tuple[float, float, float, float]:
+        self._sim._sync()
+        return _quaternion(reference_frame.basis() @ self._sim._basis("vessel").T)
+
+    def resources_in_decouple_stage(self, stage: int, cumulative: bool = True) -> Resources:
+        def parts():
+            return [
+                part for part in self._sim._state.parts
+                if (part.spec.decouple_stage <= stage if cumulative else part.spec.decouple_stage == stage)
+            ]
+        return Resources(self._sim, parts)
+
+    @property
+    def situation(self) -> VesselSituation:
+        return self._sim._situation()
+
+    @property
+    def met(self) -> float:
+        state = self._sim._sync()
+        return self._sim.ut - state.launch_ut if state.launch_ut is not None else 0.0
+
+    @property
+    def mass(self) -> float:
+        return self._sim._sync().mass
+
+    @property
+    def dry_mass(self) -> float:
+        return sum(part.spec.mass for part in self._sim._sync().parts)
+
+    def _engines(self) -> List[Engine]:
+        return self.parts.engines
+
+    thrust = property(lambda self: self._sim._sync().thrust)
+    max_thrust = property(lambda self: sum(engine.max_thrust for engine in self._engines() if engine.active))
+    available_thrust = property(lambda self: sum(engine.available_thrust for engine in self._engines()))
+    max_vacuum_thrust = property(lambda self: sum(engine.max_vacuum_thrust for engine in self._engines() if engine.active))
+
+    def _isp(self, vacuum: Optional[bool] = None) -> float:
+        engines = [engine for engine in self._engines() if engine.active]
+        if vacuum is None:
+            thrust = sum(engine.max_thrust for engine in engines)
+            flow = sum(engine.max_thrust / engine.specific_impulse for engine in engines if engine.specific_impulse)
+        else:
+            attribute = "vacuum_specific_impulse" if vacuum else "kerbin_sea_level_specific_impulse"
+            thrust = sum(engine.max_vacuum_thrust for engine in engines)
+            flow = sum(engine.max_vacuum_thrust / getattr(engine, attribute) for engine in engines)
+        return thrust / flow if flow else 0.0
+
+    specific_impulse = property(lambda self: self._isp())
+    vacuum_specific_impulse = property(lambda self: self._isp(vacuum=True))
+    kerbin_sea_level_specific_impulse = property(lambda self: self._isp(vacuum=False))
+
+    _NO_TORQUE = ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+    _WHEEL_TORQUE = ((5000.0, 5000.0, 5000.0), (-5000.0, -5000.0, -5000.0))
+    available_control_surface_torque = property(lambda self: self._NO_TORQUE)
+    available_engine_torque = property(lambda self: self._NO_TORQUE)
+    available_rcs_torque = property(lambda self: self._NO_TORQUE)
+    available_reaction_wheel_torque = property(lambda self: self._WHEEL_TORQUE)
+    available_torque = property(lambda self: self._WHEEL_TORQUE)
+
+
+class SpaceCenter(_Remote):
+    VesselSituation = VesselSituation
+    VesselType = VesselType
+    SASMode = SASMode
+    ControlState = ControlState
+    ControlSource = ControlSource
+    ControlInputMode = ControlInputMode
+    ResourceFlowMode = ResourceFlowMode
+
+    def __init__(self, sim: "Simulator"):
+        super().__init__(sim)
+        self.target_vessel = None
+        self.physics_warp_factor = 0
+        self.rails_warp_factor = 0
+        self.g = 6.67430e-11
+
+    active_vessel = property(lambda self: self._sim.active_vessel)
+    vessels = property(lambda self: [self._sim.active_vessel])
+    bodies = property(lambda self: {self._sim.body.name: self._sim.body})
+    ut = property(lambda self: self._sim.ut)
+    warp_factor = property(lambda self: 0.0)
+    warp_rate = property(lambda self: self._sim.time_scale)  # Game seconds per wall-clock second
+
+    def warp_to(self, ut: float, max_rails_rate: float = 100000.0, max_physics_rate: float = 2.0):
+        self._sim.warp_to(ut)
+
+    def load_space_center(self):
+        """Put a fresh vessel on the launch pad (the simulator has no space center scene)."""
+        self._sim.reset()
+
+    def launch_vessel_from_vab(self, name: str, launch_site: str = "LaunchPad", recover: bool = True, crew=None, flag_url=""):
+        self._sim.reset()
+
+    launch_vessel_from_sph = launch_vessel_from_vab
+
+    def quicksave(self):
+        self._sim.save("quicksave")
+
+    def quickload(self):
+        self._sim.load("quicksave")
+
+    def save(self, name: str):
+        self._sim.save(name)
+
+    def load(self, name: str):
+        self._sim.load(name)
+
+    def clear_target(self):
+        self.target_vessel = None
+
+    def transform_position(self, position, from_frame: _Frame, to_frame: _Frame):
+        self._sim._sync()
+        origin_from, _ = from_frame.origin()
+        origin_to, _ = to_frame.origin()
+        inertial = from_frame.basis().T @ np.asarray(position, dtype=float) + origin_from
+        return _tuple(to_frame.basis() @ (inertial - origin_to))
+
+    def transform_direction(self, direction, from_frame: _Frame, to_frame: _Frame):
+        self._sim._sync()
+        return _tuple(to_frame.basis() @ (from_frame.basis().T @ np.asarray(direction, dtype=float)))
+
+    def transform_velocity(self, position, velocity, from_frame: _Frame, to_frame: _Frame):
+        self._sim._sync()
+        _, velocity_from = from_frame.origin()
+        _, velocity_to = to_frame.origin()
+        inertial = from_frame.basis().T @ np.asarray(velocity, dtype=float) + velocity_from
+        return _tuple(to_frame.basis() @ (inertial - velocity_to))
+
+
+class KRPCService(_Remote):
+    GameScene = GameScene
+    current_game_scene = GameScene.flight
+    paused = False
+
+
+class SimulatedStream:
+    """A stream of a simulated call; values are computed on read, callbacks fire from the client's pump thread."""
+
+    def __init__(self, client: "SimulatedClient", func: Callable, args: Tuple, kwargs: Dict[str, Any]):
+        self._client = client
+        self._call = lambda: func(*args, **kwargs)
+        self._callbacks: List[Callable] = []
+        self._last_value = None
+        self._last_update = 0.0
+        self.condition = threading.Condition()
+        self.started = False
+        self.rate = 0.0
+        self.removed = False
+
+    def start(self, wait: bool = True):
+        if self.started:
+            return
+        self.started = True
+        self._client._pump_start()
+        if wait:
+            self._update(force=True)
+
+    def __call__(self):
+        if not self.started:
+            self.start()
+        return self._call()
+
+    def _update(self, force: bool = False):
+        """Fire callbacks if the value changed; called by the pump thread."""
+        now = time.monotonic()
+        if not force and self.rate and now - self._last_update < 1.0 / self.rate:
+            return
+        try:
+            value = self._call()
+        except Exception as e:
+            value = e
+        self._last_update = now
+        if not force and _same(value, self._last_value):
+            return
+        self._last_value = value
+        for callback in list(self._callbacks):
+            try:
+                callback(value)
+            except Exception:
+                pass
+        with self.condition:
+            self.condition.notify_all()
+
+    def wait(self, timeout: Optional[float] = None):
+        self.condition.wait(timeout)
+
+    def add_callback(self, callback: Callable):
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable):
+        self._callbacks = [existing for existing in self._callbacks if existing != callback]
+
+    def remove(self):
+        self.removed = True
+        self._client._streams.discard(self)
+
+
+def _same(a, b) -> bool:
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
+class SimulatedClient:
+    """A connection to the simulator, with the kRPC client surface KSPEnv and the collector use."""
+
+    PUMP_RATE = 50.0  # Hz at which stream callbacks are checked
+
+    def __init__(self, sim: "Simulator", name: Optional[str] = None):
+        self._sim = sim
+        self.name = name
+        self.space_center = sim.space_center
+        self.krpc = sim.krpc_service
+        self._streams = set()
+        self._pump: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stream_update_condition = threading.Condition()
+
+    def add_stream(self, func: Callable, *args, **kwargs) -> SimulatedStream:
+        if func is setattr:
+            raise ValueError("Cannot stream a property setter")
+        stream = SimulatedStream(self, func, args, kwargs)
+        self._streams.add(stream)
+        return stream
+
+    @contextlib.contextmanager
+    def stream(self, func: Callable, *args, **kwargs):
+        stream = self.add_stream(func, *args, **kwargs)
+        try:
+            yield stream
+        finally:
+            stream.remove()
+
+    def wait_for_stream_update(self, timeout: Optional[float] = None):
+        with self.stream_update_condition:
+            self.stream_update_condition.wait(timeout)
+
+    def _pump_start(self):
+        if self._pump is None and not self._stop.is_set():
+            self._pump = threading.Thread(target=self._run_pump, name="SimulatedStreams", daemon=True)
+            self._pump.start()
+
+    def _run_pump(self):
+        while not self._stop.wait(1.0 / self.PUMP_RATE):
+            for stream in list(self._streams):
+                if stream.started and stream._callbacks:
+                    stream._update()
+            with self.stream_update_condition:
+                self.stream_update_condition.notify_all()
+
+    def close(self):
+        self._stop.set()
+        if self._pump is not None:
+            self._pump.join(1.0)
+        self._streams.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Simulator:
+    """
+    A simulated KSP universe shared by every connection made with connect().
+
+    Args:
+        craft: Parts of the vessel, see DEFAULT_CRAFT
+        body: The body the vessel launches from
+        time_scale: Simulated seconds per wall-clock second
+        drag_area: Drag coefficient times reference area of the vessel (m^2)
+        vessel_name: Name of the simulated vessel
+    """
+
+    def __init__(
+        self,
+        craft: Sequence[PartSpec] = DEFAULT_CRAFT,
+        body: BodySpec = KERBIN,
+        time_scale: float = 1.0,
+        drag_area: float = 1.0,
+        vessel_name: str = "Kosmos Simulated Rocket",
+    ):
+        if time_scale <= 0:
+            raise ValueError("time_scale must be positive")
+        self.craft = tuple(craft)
+        self.body_spec = body
+        self.time_scale = time_scale
+        self.drag_area = drag_area
+        self.vessel_name = vessel_name
+        self.lock = threading.RLock()
+        self.body = CelestialBody(self, body)
+        self.space_center = SpaceCenter(self)
+        self.krpc_service = KRPCService(self)
+        self._saves: Dict[str, Tuple[float, _VesselState]] = {}
+        self._ut = 0.0
+        self._wall = time.monotonic()
+        self._engine_thrust: Dict[int, float] = {}
+        self._elements_cache: Tuple[Optional[float], Dict[str, float]] = (None, {})
+        self.steps = 0
+        self._state: Optional[_VesselState] = None
+        self.reset()
+
+    def connect(self, name: Optional[str] = None, address: str = "127.0.0.1",
+                rpc_port: int = 50000, stream_port: int = 50001) -> SimulatedClient:
+        """Connection factory with the signature of krpc.connect."""
+        return SimulatedClient(self, name)
+
+    def reset(self):
+        """Put a fresh vessel on the launch pad."""
+        with self.lock:
+            if self._state is not None:
+                self._sync()
+            self._state = _VesselState(self, self.craft)
+            self.active_vessel = Vessel(self, self.vessel_name, self.body)
+            self._engine_thrust = {}
+            self._elements_cache = (None, {})
+
+    def save(self, name: str):
+        with self.lock:
+            self._sync()
+            self._saves[name] = (self._ut, copy.deepcopy(self._state, {id(self): self}))
+
+    def load(self, name: str):
+        with self.lock:
+            if name not in self._saves:
+                raise ValueError(f"No save named '{name}'")
+            ut, state = self._saves[name]
+            self._ut, self._wall = ut, time.monotonic()
+            self._state = copy.deepcopy(state, {id(self): self})
+            self.active_vessel = Vessel(self, self.vessel_name, self.body)
+            self._elements_cache = (None, {})
+
+    @property
+    def ut(self) -> float:
+        with self.lock:
+            self._sync()
+            return self._ut
+
+    def warp_to(self, ut: float):
+        """Advance the simulation to ut immediately."""
+        with self.lock:
+            self._sync()
+            self._advance(ut)
+            self._wall = time.monotonic()  # Time spent integrating is not simulated again
+
+    def _sync(self) -> _VesselState:
+        """Advance the simulation to the current wall-clock time and return the vessel state."""
+        with self.lock:
+            now = time.monotonic()
+            target = self._ut + (now - self._wall) * self.time_scale
+            self._advance(target, deadline=now + MAX_SYNC_TIME)
+            self._wall = time.monotonic()
+            return self._state
+
+    def _advance(self, target: float, deadline: Optional[float] = None):
+        """Integrate up to target; past the wall-clock deadline, the rest of the interval is dropped."""
+        state = self._state
+        while self._ut < target - 1e-9:
+            powered = state.throttle > 0 and any(part.active for part in state.parts)
+            if not powered and not np.any(state.v) and self._altitude() <= 1e-6:
+                self._ut = target  # Resting on the ground, nothing moves
+                break
+            in_air = self._altitude() < self.body_spec.atmosphere_depth
+            step = POWERED_STEP if powered or in_air else COAST_STEP
+            self._step(min(step, target - self._ut))
+            if deadline is not None and time.monotonic() > deadline:
+                break
+
+    # Physics
+
+    def _altitude(self, r: Optional[np.ndarray] = None) -> float:
+        r = self._state.r if r is None else r
+        return float(np.linalg.norm(r)) - self.body_spec.equatorial_radius
+
+    def _atmosphere(self, altitude: float) -> Tuple[float, float]:
+        """Static pressure (Pa) and density (kg/m^3) at an altitude."""
+        spec = self.body_spec
+        if altitude >= spec.atmosphere_depth:
+            return 0.0, 0.0
+        factor = math.exp(-max(altitude, 0.0) / spec.scale_height)
+        return spec.surface_pressure * factor, spec.surface_density * factor
+
+    def _pressure_ratio(self) -> float:
+        pressure = self._atmosphere(self._altitude())[0]
+        return pressure / 101325.0
+
+    @staticmethod
+    def _isp(spec: PartSpec, pressure_ratio: float) -> float:
+        return spec.vacuum_isp + (spec.sea_level_isp - spec.vacuum_isp) * min(pressure_ratio, 1.0)
+
+    def _tanks(self, engine: _Part) -> List[_Part]:
+        """Parts an engine draws from: those dropped together with it."""
+        return [part for part in self._state.parts if part.spec.decouple_stage == engine.spec.decouple_stage]
+
+    def _propellant_fraction(self, engine: _Part, mass: float) -> float:
+        """Fraction of mass (kg of propellant) the engine's tanks can supply."""
+        if mass <= 0:
+            return 1.0 if self._propellant_fraction(engine, 1e-6) > 0 else 0.0
+        fraction = 1.0
+        tanks = self._tanks(engine)
+        for resource, share in engine.spec.propellants.items():
+            density = RESOURCE_DENSITY.get(resource, 1.0)
+            available = sum(tank.amounts.get(resource, 0.0) for tank in tanks) * density
+            fraction = min(fraction, available / (mass * share))
+        return max(0.0, min(1.0, fraction))
+
+    def _draw(self, engine: _Part, mass: float):
+        tanks = self._tanks(engine)
+        for resource, share in engine.spec.propellants.items():
+            units = mass * share / RESOURCE_DENSITY.get(resource, 1.0)
+            for tank in tanks:
+                if units <= 0:
+                    break
+                taken = min(tank.amounts.get(resource, 0.0), units)
+                if taken:
+                    tank.amounts[resource] -= taken
+                    units -= taken
+
+    def _basis(self, kind: str) -> np.ndarray:
+        state = self._state
+        if kind == "body":
+            return np.eye(3)
+        up = _unit(state.r)
+        if kind == "surface":
+            east = _unit(np.cross((0.0, 0.0, 1.0), up))
+            if not np.any(east):
+                east = np.array([0.0, 1.0, 0.0])
+            north = np.cross(up, east)
+            return np.array([up, north, east])
+        if kind == "orbital":
+            prograde = _unit(state.v) if np.any(state.v) else self._basis("surface")[2]
+            normal = _unit(np.cross(state.r, state.v)) if np.any(np.cross(state.r, state.v)) else np.array([0.0, 0.0, 1.0])
+            return np.array([np.cross(prograde, normal), prograde, normal])
+        # Vessel frame: y out of the nose, x to the right, z down
+        forward = state.forward
+        right = np.cross(forward, up)
+        if np.linalg.norm(right) < 1e-6:
+            right = self._basis("surface")[1]
+        right = _unit(right)
+        return np.array([right, forward, np.cross(right, forward)])
+
+    def _update_attitude(self):
+        """Point the vessel where the autopilot or SAS wants it."""
+        state = self._state
+        if state.autopilot:
+            up, north, east = self._basis("surface")
+            pitch, heading = math.radians(state.target_pitch), math.radians(state.target_heading)
+            state.forward = _unit(
+                math.sin(pitch) * up + math.cos(pitch) * (math.cos(heading) * north + math.sin(heading) * east)
+            )
+        elif state.sas and state.sas_mode != SASMode.stability_assist:
+            radial, prograde, normal = self._basis("orbital")
+            directions = {
+                SASMode.prograde: prograde, SASMode.retrograde: -prograde,
+                SASMode.normal: normal, SASMode.anti_normal: -normal,
+                SASMode.radial: radial, SASMode.anti_radial: -radial,
+            }
+            if state.sas_mode == SASMode.maneuver and state.nodes:
+                remaining = state.nodes[0]._burn_vector() - state.nodes[0].applied
+                if np.any(remaining):
+                    state.forward = _unit(remaining)
+            elif state.sas_mode in directions and np.any(state.v):
+                state.forward = directions[state.sas_mode]
+
+    def _step(self, dt: float):
+        state = self._state
+        self._update_attitude()
+        mu = self.body_spec.gravitational_parameter
+        mass = state.mass
+        pressure_ratio = self._pressure_ratio()
+
+        # Engine thrust and propellant use over the step
+        thrust = 0.0
+        burns = []
+        self._engine_thrust = {}
+        for part in state.parts:
+            if not part.active or state.throttle <= 0:
+                continue
+            spec = part.spec
+            flow = state.throttle * part.thrust_limit * spec.max_vacuum_thrust / (spec.vacuum_isp * G0)
+            fraction = self._propellant_fraction(part, flow * dt)
+            if fraction <= 0:
+                continue
+            engine_thrust = fraction * flow * self._isp(spec, pressure_ratio) * G0
+            self._engine_thrust[id(part)] = engine_thrust
+            thrust += engine_thrust
+            burns.append((part, fraction * flow * dt))
+        state.thrust = thrust
+        forward = state.forward.copy()
+        drag_area = self.drag_area
+
+        thrust_acceleration = forward * thrust / mass
+        radius = self.body_spec.equatorial_radius
+
+        def acceleration(r, v):
+            distance = math.sqrt(r @ r)
+            gravity = -mu / distance ** 3 * r
+            density = self._atmosphere(distance - radius)[1]
+            drag = -0.5 * density * math.sqrt(v @ v) * drag_area / mass * v
+            return gravity + drag + thrust_acceleration, drag
+
+        r, v = state.r, state.v
+        k1v, drag = acceleration(r, v)
+        k1r = v
+        k2v, _ = acceleration(r + 0.5 * dt * k1r, v + 0.5 * dt * k1v)
+        k2r = v + 0.5 * dt * k1v
+        k3v, _ = acceleration(r + 0.5 * dt * k2r, v + 0.5 * dt * k2v)
+        k3r = v + 0.5 * dt * k2v
+        k4v, _ = acceleration(r + dt * k3r, v + dt * k3v)
+        k4r = v + dt * k3v
+        new_r = r + dt / 6 * (k1r + 2 * k2r + 2 * k3r + k4r)
+        new_v = v + dt / 6 * (k1v + 2 * k2v + 2 * k3v + k4v)
+
+        for part, burnt in burns:
+            self._draw(part, burnt)
+        if state.nodes:
+            state.nodes[0]._target = state.nodes[0]._burn_vector() if thrust else state.nodes[0]._target
+            state.nodes[0].applied = state.nodes[0].applied + thrust_acceleration * dt
+        state.drag = drag * mass
+        state.acceleration = thrust_acceleration + drag
+
+        # Ground contact: the surface is flat and does not rotate
+        if math.sqrt(new_r @ new_r) < radius:
+            new_r = _unit(new_r) * radius
+            if np.dot(new_v, new_r) <= 0:
+                new_v = np.zeros(3)
+        state.r, state.v = new_r, new_v
+        self._ut += dt
+        self.steps += 1
+
+    def _activate_next_stage(self) -> list:
+        with self.lock:
+            state = self._sync()
+            if state.current_stage <= 0:
+                return []
+            state.current_stage -= 1
+            stage = state.current_stage
+            state.parts = [part for part in state.parts if part.spec.decouple_stage != stage]
+            for part in state.parts:
+                if part.spec.stage == stage and part.spec.max_vacuum_thrust > 0:
+                    part.active = True
+            if not state.launched:
+                state.launched = True
+                state.launch_ut = self._ut
+            return []
+
+    def _elements(self) -> Dict[str, float]:
+        with self.lock:
+            state = self._sync()
+            ut, elements = self._elements_cache
+            if ut != self._ut:
+                elements = orbital_elements(state.r, state.v, self.body_spec.gravitational_parameter)
+                self._elements_cache = (self._ut, elements)
+            return elements
+
+    def _situation(self) -> VesselSituation:
+        with self.lock:
+            state = self._sync()
+            altitude = self._altitude()
+            if not state.launched:
+                return VesselSituation.pre_launch
+            if altitude < 1.0 and not np.any(state.v):
+                return VesselSituation.landed
+            if altitude < self.body_spec.atmosphere_depth:
+                return VesselSituation.flying
+            elements = self._elements()
+            if elements["eccentricity"] >= 1:
+                return VesselSituation.escaping
+            if elements["periapsis"] < self.body_spec.equatorial_radius:
+                return VesselSituation.sub_orbital
+            return VesselSituation.orbiting
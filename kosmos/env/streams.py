@@ -0,0 +1,258 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+def _key_part(value) -> Hashable:
+    """Hashable identity of a stream argument; remote objects are identified by their server id."""
+    object_id = getattr(value, "_object_id", None)
+    if object_id is not None:
+        return (type(value).__name__, object_id)
+    if isinstance(value, (list, tuple)):
+        return tuple(_key_part(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def stream_key(conn, func: Callable, args: Tuple, kwargs: Dict[str, Any]) -> Hashable:
+    """
+    Identity of a streamed call: connection, remote object, attribute or procedure, and arguments.
+
+    Remote objects are keyed by their server object id, so getattr(flight, "speed")
+    read twice through the same Flight object maps to one key, as do
+    position(frame) calls with the same frame object. Every vessel.flight() call
+    returns a new Flight object with its own id, so holders only share flight
+    streams if they share the Flight object.
+    """
+    owner = getattr(func, "__self__", None)
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__", None) or repr(func)
+    owner_key = _key_part(owner) if getattr(owner, "_object_id", None) is not None else None
+    return (
+        id(conn),
+        owner_key,
+        name,
+        tuple(_key_part(arg) for arg in args),
+        tuple(sorted((key, _key_part(value)) for key, value in kwargs.items())),
+    )
+
+
+class _SharedStream:
+    """One server-side stream and the handles holding it."""
+
+    def __init__(self, key: Hashable, stream):
+        self.key = key
+        self.stream = stream
+        self.handles: List["StreamHandle"] = []
+
+
+class StreamHandle:
+    """
+    A holder's reference to a shared stream, usable like a krpc Stream.
+
+    remove() releases this reference only; the server-side stream is removed
+    once its last handle is released. Callbacks added through the handle are
+    removed with it. The stream's update rate is the highest any holder asked
+    for, unlimited if any holder asked for no limit.
+    """
+
+    def __init__(self, registry: "StreamRegistry", shared: _SharedStream, owner: str):
+        self._registry = registry
+        self._shared = shared
+        self.owner = owner
+        self.released = False
+        self._rate: Optional[float] = None
+        self._callbacks: List[Callable] = []
+
+    @property
+    def key(self) -> Hashable:
+        return self._shared.key
+
+    def __call__(self):
+        if self.released:
+            raise RuntimeError("Stream handle has been released")
+        return self._shared.stream()
+
+    def start(self, wait: bool = True):
+        self._shared.stream.start(wait=wait)
+
+    @property
+    def rate(self) -> float:
+        return self._shared.stream.rate
+
+    @rate.setter
+    def rate(self, value: float):
+        self._rate = value
+        self._registry._apply_rate(self._shared)
+
+    @property
+    def condition(self) -> threading.Condition:
+        return self._shared.stream.condition
+
+    def wait(self, timeout: Optional[float] = None):
+        self._shared.stream.wait(timeout)
+
+    def add_callback(self, callback: Callable):
+        self._callbacks.append(callback)
+        self._shared.stream.add_callback(callback)
+
+    def remove_callback(self, callback: Callable):
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+        self._shared.stream.remove_callback(callback)
+
+    def remove(self):
+        """Release this handle."""
+        self._registry.release(self)
+
+    release = remove
+
+    def __enter__(self) -> "StreamHandle":
+        return self
+
+    def __exit__(self, *exc):
+        self.remove()
+
+
+class StreamRegistry:
+    """
+    Shared, reference-counted kRPC streams of one environment.
+
+    kRPC identifies a stream by its call, so two holders that stream the same
+    value get the same server-side stream, and the first one to remove it
+    silently breaks the other. Holders that never remove their streams (flight
+    code streaming altitude in a loop) leave them running on the server for
+    the rest of the session. The registry dedupes streams by (connection,
+    remote object, attribute or procedure, arguments such as the reference
+    frame), hands each holder its own handle and removes a stream when its
+    last handle is released. Handles are tagged with an owner ("env",
+    "collector", "exec", ...), so everything one owner holds can be released
+    at once, e.g. the streams flight code opened once its step is over.
+
+    Example:
+        registry = StreamRegistry()
+        altitude = registry.acquire(conn, getattr, flight, "mean_altitude", owner="env")
+        altitude()
+        altitude.remove()  # The server-side stream goes away with its last handle
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._shared: Dict[Hashable, _SharedStream] = {}
+        self.stats = {"created": 0, "shared": 0, "removed": 0}
+
+    def acquire(self, conn, func: Callable, *args, owner: str = "env", **kwargs) -> StreamHandle:
+        """Return a handle to the stream of func(*args, **kwargs), adding the stream on first use."""
+        key = stream_key(conn, func, args, kwargs)
+        with self._lock:
+            shared = self._shared.get(key)
+            if shared is None:
+                shared = _SharedStream(key, conn.add_stream(func, *args, **kwargs))
+                self._shared[key] = shared
+                self.stats["created"] += 1
+            else:
+                self.stats["shared"] += 1
+            handle = StreamHandle(self, shared, owner)
+            shared.handles.append(handle)
+            return handle
+
+    def release(self, handle: StreamHandle):
+        """Release a handle, removing its stream if no other handle holds it."""
+        with self._lock:
+            if handle.released:
+                return
+            handle.released = True
+            shared = handle._shared
+            for callback in handle._callbacks:
+                try:
+                    shared.stream.remove_callback(callback)
+                except Exception:
+                    pass
+            handle._callbacks = []
+            shared.handles.remove(handle)
+            if shared.handles:
+                if handle._rate is not None:
+                    self._apply_rate(shared)
+                return
+            del self._shared[shared.key]
+            self.stats["removed"] += 1
+        try:
+            shared.stream.remove()
+        except Exception:
+            pass
+
+    def release_owner(self, owner: str):
+        """Release every handle held by an owner."""
+        self._release_where(lambda handle: handle.owner == owner)
+
+    def clear(self, keep: Iterable[str] = ()):
+        """Release every handle except those of the owners in keep, e.g. on a vessel switch."""
+        keep = set(keep)
+        self._release_where(lambda handle: handle.owner not in keep)
+
+    def _release_where(self, predicate: Callable[[StreamHandle], bool]):
+        with self._lock:
+            handles = [
+                handle for shared in self._shared.values() for handle in shared.handles if predicate(handle)
+            ]
+        for handle in handles:
+            self.release(handle)
+
+    def _apply_rate(self, shared: _SharedStream):
+        """Set the stream's rate to the highest its holders asked for; 0 (unlimited) wins."""
+        rates = [handle._rate for handle in shared.handles if handle._rate is not None]
+        if not rates:
+            return
+        rate = 0.0 if 0 in rates else max(rates)
+        if shared.stream.rate != rate:
+            shared.stream.rate = rate
+
+    def summary(self) -> Dict[str, Any]:
+        """Open streams and handles, per owner, for telemetry["perf"]."""
+        with self._lock:
+            owners = Counter(handle.owner for shared in self._shared.values() for handle in shared.handles)
+            return {
+                "streams": len(self._shared),
+                "handles": sum(owners.values()),
+                "owners": dict(owners),
+                **self.stats,
+            }
+
+    def connection(self, conn, owner: str) -> "ScopedConnection":
+        """A view of conn whose add_stream and stream go through the registry as owner."""
+        return ScopedConnection(conn, self, owner)
+
+
+class ScopedConnection:
+    """
+    A kRPC connection whose streams are registry handles of one owner.
+
+    Everything but add_stream and stream is forwarded to the connection, so
+    flight code uses it like the connection itself.
+    """
+
+    def __init__(self, conn, registry: StreamRegistry, owner: str):
+        self._conn = conn
+        self._registry = registry
+        self._owner = owner
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def add_stream(self, func: Callable, *args, **kwargs) -> StreamHandle:
+        return self._registry.acquire(self._conn, func, *args, owner=self._owner, **kwargs)
+
+    @contextmanager
+    def stream(self, func: Callable, *args, **kwargs):
+        handle = self.add_stream(func, *args, **kwargs)
+        try:
+            yield handle
+        finally:
+            handle.remove()
+
+    def release_streams(self):
+        """Release every stream opened through this connection's owner."""
+        self._registry.release_owner(self._owner)
@@ -21,6 +21,10 @@ class Kosmos:
         anthropic_api_key: str = None,
         env_wait_time: float = 1.0,
         env_request_timeout: float = 120,
+        env_telemetry_mode: str = "stream",
+        env_trajectory_rate: float = 10.0,
+        env_execution_backend: str = "inline",
+        env_execution_cpu_limit: float = None,
         max_iterations: int = 160,
         reset_vessel_if_failed: bool = False,
         initial_mission: str = None,
@@ -44,6 +48,7 @@ class Kosmos:
         maneuver_agent_retrieval_top_k: int = 5,
         openai_api_request_timeout: int = 300,
         checkpoint_dir: str = "checkpoint",
+        recorder_delta_encoding: bool = False,
         maneuver_library_dir: str = None,
         resume: bool = False,
     ):
@@ -53,6 +58,11 @@ class Kosmos:
             krpc_address=krpc_address,
             krpc_rpc_port=krpc_rpc_port,
             krpc_stream_port=krpc_stream_port,
+            telemetry_mode=env_telemetry_mode,
+            trajectory_rate=env_trajectory_rate,
+            execution_backend=env_execution_backend,
+            execution_timeout=env_request_timeout,
+            execution_cpu_limit=env_execution_cpu_limit,
         )
         print("🔍 DEBUG: KSPEnv initialized")
         self.env_wait_time = env_wait_time
@@ -118,7 +128,10 @@ class Kosmos:
         )
         print("🔍 DEBUG: ManeuverAgent initialized")
 
-        self.recorder = U.EventRecorder(checkpoint_dir=checkpoint_dir)
+        self.recorder = U.EventRecorder(
+            checkpoint_dir=checkpoint_dir,
+            delta_encoding=recorder_delta_encoding,
+        )
         self.resume = resume
         
         # Initialize debug logger
@@ -135,6 +148,7 @@ class Kosmos:
         self.flight_agent_rollout_num_iterations = 0
         self.mission = mission
         self.context = context
+        self.recorder.begin_rollout()
         if reset_env:
             self.env.reset(
                 options={
@@ -193,7 +207,7 @@ class Kosmos:
             
             telemetry = self.env.step(
                 code,
-                programs=self.maneuver_agent.programs,
+                programs=self.maneuver_agent.program_sources,
             )
             self.recorder.record(telemetry, self.mission)
             self.flight_agent.update_vessel_memory(telemetry[-1][1]["vessel_status"])
@@ -218,7 +232,7 @@ class Kosmos:
                 if vessel_state:
                     new_telemetry = self.env.step(
                         f"revert_vessel_state(conn, vessel, {U.json_dumps(vessel_state[-1])})",
-                        programs=self.maneuver_agent.programs,
+                        programs=self.maneuver_agent.program_sources,
                     )
                     telemetry[-1][1]["vessel_status"] = new_telemetry[-1][1]["vessel_status"]
                     telemetry[-1][1]["orbit_parameters"] = new_telemetry[-1][1]["orbit_parameters"]
@@ -0,0 +1,259 @@
+"""
+Asyncio telemetry API backed by kRPC stream callbacks.
+
+Control coroutines used to wait by polling: sleep, read a field over RPC,
+compare, repeat. AsyncTelemetry keeps one kRPC stream per field and wakes
+waiting coroutines from the streams' update callbacks. Any number of until()
+waiters and watch() loops share the same streams, and none of them issues
+RPCs while waiting.
+
+Example:
+    telemetry = AsyncTelemetry(conn, vessel)
+    await telemetry.until(lambda s: s.apoapsis_altitude > 80000, timeout=300)
+    async for sample in telemetry.watch(["altitude", "speed"], rate=2):
+        print(sample.altitude, sample.speed)
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Tuple
+
+from krpc.error import StreamError
+
+from kosmos.utils.telemetry_sampler import SAMPLED_FIELDS
+from kosmos.utils.waits import LoopWakeup
+
+
+# Fields available by name: name -> (remote object the field is read from, attribute)
+WATCH_FIELDS: Dict[str, Tuple[str, str]] = {
+    **{column: (source, attribute) for column, source, attribute in SAMPLED_FIELDS},
+    'latitude': ('flight', 'latitude'),
+    'longitude': ('flight', 'longitude'),
+    'pitch': ('flight', 'pitch'),
+    'heading': ('flight', 'heading'),
+    'g_force': ('flight', 'g_force'),
+    'dynamic_pressure': ('flight', 'dynamic_pressure'),
+    'time_to_apoapsis': ('orbit', 'time_to_apoapsis'),
+    'time_to_periapsis': ('orbit', 'time_to_periapsis'),
+    'eccentricity': ('orbit', 'eccentricity'),
+    'inclination': ('orbit', 'inclination'),
+    'available_thrust': ('vessel', 'available_thrust'),
+    'situation': ('vessel', 'situation'),
+    'current_stage': ('control', 'current_stage'),
+}
+
+
+class TelemetrySample:
+    """Field values at one moment, readable as attributes (sample.altitude) or items."""
+
+    def __init__(self, values: Dict[str, Any], t: float):
+        self._values = values
+        self.t = t
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(f"Sample has no field '{name}'") from None
+
+    def __getitem__(self, name: str):
+        return self._values[name]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self._values)
+
+    def __repr__(self) -> str:
+        return f"TelemetrySample({self._values})"
+
+
+class _LiveView:
+    """Latest stream values, registering the stream of a field the first time it is read."""
+
+    def __init__(self, telemetry: "AsyncTelemetry"):
+        self._telemetry = telemetry
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self._telemetry.value(name)
+
+    def __getitem__(self, name: str):
+        return self._telemetry.value(name)
+
+
+class AsyncTelemetry:
+    """
+    Awaitable telemetry conditions and sample streams for one vessel.
+
+    Streams are registered the first time a field is used and kept until
+    close(). Stream callbacks run on the kRPC stream thread; they only
+    schedule a wake-up on the event loop that is waiting, coalescing bursts of
+    updates into one.
+    """
+
+    def __init__(self, conn, vessel, rate: float = 10.0, streams=None):
+        """
+        Args:
+            conn: kRPC connection the vessel belongs to
+            vessel: Vessel to watch
+            rate: Update rate in Hz of the streams (0 = every frame)
+            streams: Optional StreamRegistry the streams are shared through
+        """
+        self.conn = conn
+        self.vessel = vessel
+        self.rate = rate
+        self.streams = streams
+
+        self._sources: Optional[Dict[str, Any]] = None
+        self._streams: Dict[str, Any] = {}
+        self._callbacks: Dict[str, Callable] = {}
+        self._stream_rates: Dict[str, float] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._wakeup = LoopWakeup()
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Fields with a registered stream."""
+        return tuple(self._streams)
+
+    def _source(self, name: str):
+        if self._sources is None:
+            self._sources = {
+                'space_center': self.conn.space_center,
+                'vessel': self.vessel,
+                'flight': self.vessel.flight(),
+                'orbit': self.vessel.orbit,
+                'control': self.vessel.control,
+            }
+        return self._sources[name]
+
+    def add_field(self, name: str, func: Callable, *args):
+        """
+        Watch a field that is not in WATCH_FIELDS, e.g.
+        add_field('liquid_fuel', vessel.resources.amount, 'LiquidFuel').
+        """
+        with self._lock:
+            if name not in self._streams:
+                self._register(name, self._add_stream(func, *args))
+
+    def _ensure(self, name: str, rate: Optional[float] = None):
+        """Register the stream of a named field if needed, raising its rate to at least rate."""
+        with self._lock:
+            stream = self._streams.get(name)
+            if stream is None:
+                if name not in WATCH_FIELDS:
+                    raise AttributeError(
+                        f"Unknown telemetry field '{name}', expected one of {sorted(WATCH_FIELDS)} "
+                        f"or a field added with add_field()"
+                    )
+                source, attribute = WATCH_FIELDS[name]
+                stream = self._register(name, self._add_stream(getattr, self._source(source), attribute))
+            if rate and self._stream_rates.get(name) and rate > self._stream_rates[name]:
+                stream.rate = rate
+                self._stream_rates[name] = rate
+            return stream
+
+    def _add_stream(self, func: Callable, *args):
+        if self.streams is not None:
+            return self.streams.acquire(self.conn, func, *args, owner="telemetry")
+        return self.conn.add_stream(func, *args)
+
+    def _register(self, name: str, stream):
+        if self.rate:
+            stream.rate = self.rate
+        self._stream_rates[name] = self.rate
+
+        def on_update(_value, name=name):
+            self._versions[name] = self._versions.get(name, 0) + 1
+            self._wakeup.notify()
+
+        stream.add_callback(on_update)
+        # Block until the first value arrives so predicates never see a missing field
+        stream.start()
+        self._streams[name] = stream
+        self._callbacks[name] = on_update
+        return stream
+
+    def value(self, name: str):
+        """Latest value of a field, registering its stream on first use. Costs no RPC afterwards."""
+        stream = self._ensure(name)
+        try:
+            return stream()
+        except StreamError:
+            return None
+
+    def sample(self, fields: Optional[Iterable[str]] = None) -> TelemetrySample:
+        """Latest values of the given fields, or of every registered field."""
+        fields = self.fields if fields is None else tuple(fields)
+        return TelemetrySample({name: self.value(name) for name in fields}, time.monotonic())
+
+    async def until(self, predicate: Callable[[Any], bool], timeout: Optional[float] = None) -> TelemetrySample:
+        """
+        Wait until predicate(view) is true.
+
+        The view exposes the latest value of every field as an attribute
+        (view.altitude, view.apoapsis_altitude, ...). The predicate is checked
+        again whenever one of the streams updates, not on a polling interval.
+
+        Returns:
+            Sample of the registered fields once the predicate holds
+
+        Raises:
+            asyncio.TimeoutError: If the predicate does not hold within timeout seconds
+        """
+        self._wakeup.bind()
+        view = _LiveView(self)
+
+        async def wait():
+            while True:
+                changed = self._wakeup.event
+                if predicate(view):
+                    return self.sample()
+                await changed.wait()
+
+        return await asyncio.wait_for(wait(), timeout)
+
+    async def watch(self, fields: Iterable[str], rate: Optional[float] = None) -> AsyncIterator[TelemetrySample]:
+        """
+        Yield a sample of fields each time one of them changes, at most rate times per second.
+
+        Example:
+            async for sample in telemetry.watch(["altitude", "vertical_speed"], rate=5):
+                if sample.altitude < 1000:
+                    break
+        """
+        self._wakeup.bind()
+        fields = tuple(fields)
+        for name in fields:
+            self._ensure(name, rate)
+        period = 1.0 / rate if rate else 0.0
+
+        while True:
+            versions = [self._versions.get(name, 0) for name in fields]
+            yielded_at = time.monotonic()
+            yield self.sample(fields)
+            if period:
+                await asyncio.sleep(max(period - (time.monotonic() - yielded_at), 0.0))
+            while True:
+                changed = self._wakeup.event
+                if [self._versions.get(name, 0) for name in fields] != versions:
+                    break
+                await changed.wait()
+
+    def close(self):
+        """Remove the streams."""
+        with self._lock:
+            for name, stream in self._streams.items():
+                try:
+                    stream.remove_callback(self._callbacks[name])
+                    stream.remove()
+                except Exception:
+                    pass
+            self._streams.clear()
+            self._callbacks.clear()
+            self._stream_rates.clear()
+            self._sources = None
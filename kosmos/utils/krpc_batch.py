@@ -0,0 +1,100 @@
+"""
+Batched kRPC requests.
+
+The kRPC wire protocol accepts several ProcedureCalls in a single Request
+message. These helpers build such a request from ordinary property reads and
+method calls on remote objects, so a group of getters costs one network
+round trip instead of one per getter.
+"""
+
+from typing import Any, List, Sequence, Tuple
+
+import krpc.schema.KRPC_pb2 as KRPC
+from krpc.decoder import Decoder
+
+
+# A single read: (remote object, attribute name, method args). Empty args
+# means a property read, otherwise the attribute is called with the args.
+Read = Tuple[Any, str, Tuple]
+
+
+def supports_batching(conn) -> bool:
+    """Check whether a client exposes the internals needed for batched requests."""
+    return all(
+        hasattr(conn, name)
+        for name in ("get_call", "_get_return_type", "_rpc_connection", "_rpc_connection_lock")
+    )
+
+
+def read_one(source, attribute: str, args: Tuple = ()):
+    """Read a single field with its own blocking RPC."""
+    value = getattr(source, attribute)
+    return value(*args) if args else value
+
+
+def build_call(conn, source, attribute: str, args: Tuple = ()):
+    """Build the ProcedureCall message and return type for one read."""
+    if args:
+        func = getattr(source, attribute)
+        return conn.get_call(func, *args), conn._get_return_type(func, *args)
+    return (
+        conn.get_call(getattr, source, attribute),
+        conn._get_return_type(getattr, source, attribute),
+    )
+
+
+def batch_read(conn, reads: Sequence[Read]) -> List[Any]:
+    """
+    Read many fields in one request/response exchange.
+
+    Args:
+        conn: kRPC client the remote objects belong to
+        reads: Sequence of (remote object, attribute, args) tuples
+
+    Returns:
+        Values in the same order as reads. A read that failed, either while
+        building the call or on the server, is returned as the exception
+        instance instead of being raised, so one missing field (e.g. a
+        FAR-only property) does not fail the whole batch.
+    """
+    if not reads:
+        return []
+
+    # Clients without the protocol internals (wrappers, stand-ins) fall back to one RPC per read
+    if not supports_batching(conn):
+        values = []
+        for source, attribute, args in reads:
+            try:
+                values.append(read_one(source, attribute, args))
+            except Exception as e:
+                values.append(e)
+        return values
+
+    request = KRPC.Request()
+    values: List[Any] = [None] * len(reads)
+    pending = []  # (index in reads, return type) for calls included in the request
+    for index, (source, attribute, args) in enumerate(reads):
+        try:
+            call, return_type = build_call(conn, source, attribute, args)
+        except Exception as e:
+            values[index] = e
+            continue
+        request.calls.extend([call])
+        pending.append((index, return_type))
+
+    if not pending:
+        return values
+
+    with conn._rpc_connection_lock:
+        conn._rpc_connection.send_message(request)
+        response = conn._rpc_connection.receive_message(KRPC.Response)
+
+    if response.HasField('error'):
+        raise conn._build_error(response.error)
+
+    for (index, return_type), result in zip(pending, response.results):
+        if result.HasField('error'):
+            values[index] = conn._build_error(result.error)
+        else:
+            values[index] = Decoder.decode(conn, result.value, return_type)
+    return values
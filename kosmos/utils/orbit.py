@@ -0,0 +1,287 @@
+"""
+Local Keplerian orbit prediction.
+
+Between burns a vessel follows a conic fixed by six elements, so quantities
+such as time to apoapsis, altitude at a given time or the time the vessel
+leaves its body's sphere of influence follow from one snapshot of the
+elements. read_orbit() takes that snapshot in two batched requests;
+KeplerOrbit answers the questions with NumPy, vectorized over any number of
+times, without further RPCs. sleep_until() then waits for a predicted event
+in game time and confirms it with a single request.
+
+Angles are in radians and times in seconds of universal time, as kRPC
+reports them. Predictions ignore drag, thrust and SOI changes, so they only
+hold for coasting arcs above the atmosphere.
+
+Example:
+    orbit = read_orbit(conn, vessel.orbit)
+    await sleep_until(conn, orbit.next_apoapsis() - 60)
+    orbit.altitude(orbit.ut + np.arange(0, 600, 10))
+"""
+
+import asyncio
+import math
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
+
+from kosmos.utils.krpc_batch import batch_read
+
+
+_ORBIT_ATTRIBUTES = ('semi_major_axis', 'eccentricity', 'mean_anomaly_at_epoch', 'epoch', 'body')
+_BODY_ATTRIBUTES = ('gravitational_parameter', 'equatorial_radius', 'sphere_of_influence')
+
+# Newton iterations on Kepler's equation stop once every correction is below this (rad)
+KEPLER_TOLERANCE = 1e-12
+KEPLER_MAX_ITERATIONS = 50
+
+Times = Union[float, np.ndarray]
+
+
+def _scalar(value: Times) -> Times:
+    """Plain floats for scalar inputs, arrays for array inputs."""
+    return value if np.ndim(value) else float(value)
+
+
+@dataclass(frozen=True)
+class KeplerOrbit:
+    """Two-body orbit from one snapshot of kRPC orbit elements; elliptic or hyperbolic."""
+    semi_major_axis: float  # m, negative for hyperbolic orbits
+    eccentricity: float
+    mean_anomaly_at_epoch: float  # rad
+    epoch: float  # UT the mean anomaly refers to
+    gravitational_parameter: float  # m^3/s^2 of the body orbited
+    body_radius: float  # m
+    sphere_of_influence: float = math.inf  # m
+    ut: float = 0.0  # UT the snapshot was taken at, the default start of predictions
+
+    @property
+    def hyperbolic(self) -> bool:
+        return self.eccentricity >= 1.0
+
+    @property
+    def mean_motion(self) -> float:
+        """rad/s"""
+        return math.sqrt(self.gravitational_parameter / abs(self.semi_major_axis) ** 3)
+
+    @property
+    def period(self) -> float:
+        return math.inf if self.hyperbolic else 2 * math.pi / self.mean_motion
+
+    @property
+    def periapsis(self) -> float:
+        return self.semi_major_axis * (1 - self.eccentricity)
+
+    @property
+    def apoapsis(self) -> float:
+        """Apoapsis radius (m), infinite for hyperbolic orbits."""
+        return math.inf if self.hyperbolic else self.semi_major_axis * (1 + self.eccentricity)
+
+    @property
+    def semi_latus_rectum(self) -> float:
+        return self.semi_major_axis * (1 - self.eccentricity ** 2)
+
+    def mean_anomaly(self, ut: Times) -> Times:
+        """Mean anomaly at ut; wrapped to [0, 2pi) on elliptic orbits."""
+        mean = self.mean_anomaly_at_epoch + self.mean_motion * (np.asarray(ut, dtype=float) - self.epoch)
+        return mean if self.hyperbolic else np.mod(mean, 2 * np.pi)
+
+    def eccentric_anomaly(self, ut: Times) -> Times:
+        """Solve Kepler's equation for all times at once (hyperbolic anomaly on hyperbolic orbits)."""
+        return solve_kepler(self.mean_anomaly(ut), self.eccentricity)
+
+    def true_anomaly(self, ut: Times) -> Times:
+        anomaly = self.eccentric_anomaly(ut)
+        e = self.eccentricity
+        if self.hyperbolic:
+            return 2 * np.arctan(np.sqrt((e + 1) / (e - 1)) * np.tanh(anomaly / 2))
+        return 2 * np.arctan2(np.sqrt(1 + e) * np.sin(anomaly / 2), np.sqrt(1 - e) * np.cos(anomaly / 2))
+
+    def radius(self, ut: Times) -> Times:
+        """Distance from the body's center (m)."""
+        anomaly = self.eccentric_anomaly(ut)
+        if self.hyperbolic:
+            return self.semi_major_axis * (1 - self.eccentricity * np.cosh(anomaly))
+        return self.semi_major_axis * (1 - self.eccentricity * np.cos(anomaly))
+
+    def altitude(self, ut: Times) -> Times:
+        """Altitude above the body's equatorial radius (m)."""
+        return self.radius(ut) - self.body_radius
+
+    def speed(self, ut: Times) -> Times:
+        """Orbital speed (m/s), by the vis-viva equation."""
+        return np.sqrt(self.gravitational_parameter * (2 / self.radius(ut) - 1 / self.semi_major_axis))
+
+    def _time_to_mean_anomaly(self, target: Times, ut: Times) -> Times:
+        """Time from ut until the mean anomaly next reaches target."""
+        mean = self.mean_anomaly(ut)
+        if self.hyperbolic:
+            # Each mean anomaly occurs once; events in the past are NaN
+            delta = (np.asarray(target, dtype=float) - mean) / self.mean_motion
+            return _scalar(np.where(delta >= 0, delta, np.nan))
+        return _scalar(np.mod(np.asarray(target, dtype=float) - mean, 2 * np.pi) / self.mean_motion)
+
+    def time_to_periapsis(self, ut: Optional[Times] = None) -> Times:
+        return self._time_to_mean_anomaly(0.0, self.ut if ut is None else ut)
+
+    def time_to_apoapsis(self, ut: Optional[Times] = None) -> Times:
+        """Time until the next apoapsis; NaN on hyperbolic orbits."""
+        ut = self.ut if ut is None else ut
+        if self.hyperbolic:
+            return np.full(np.shape(ut), np.nan) if np.ndim(ut) else math.nan
+        return self._time_to_mean_anomaly(np.pi, ut)
+
+    def next_periapsis(self, ut: Optional[Times] = None) -> Times:
+        """UT of the next periapsis passage."""
+        ut = self.ut if ut is None else ut
+        return ut + self.time_to_periapsis(ut)
+
+    def next_apoapsis(self, ut: Optional[Times] = None) -> Times:
+        """UT of the next apoapsis passage."""
+        ut = self.ut if ut is None else ut
+        return ut + self.time_to_apoapsis(ut)
+
+    def time_to_radius(self, radius: float, ut: Optional[Times] = None, ascending: Optional[bool] = None) -> Times:
+        """
+        Time until the vessel is next at a distance from the body's center.
+
+        Args:
+            radius: Distance from the center (m)
+            ut: Start time(s), the snapshot time by default
+            ascending: Only count crossings going outward (True) or inward (False)
+
+        Returns:
+            Seconds from ut, NaN where the orbit never reaches radius
+        """
+        ut = self.ut if ut is None else ut
+        e = self.eccentricity
+        nan = np.full(np.shape(ut), np.nan) if np.ndim(ut) else math.nan
+        if e < 1e-12:
+            return nan  # A circular orbit stays at one radius
+        cos_nu = (self.semi_latus_rectum / radius - 1) / e
+        if not -1.0 <= cos_nu <= 1.0:
+            return nan
+        nu = math.acos(cos_nu)  # Outbound crossing; the inbound one is at -nu
+        if self.hyperbolic:
+            anomaly = 2 * math.atanh(math.sqrt((e - 1) / (e + 1)) * math.tan(nu / 2))
+            outbound = e * math.sinh(anomaly) - anomaly
+        else:
+            anomaly = 2 * math.atan2(math.sqrt(1 - e) * math.sin(nu / 2), math.sqrt(1 + e) * math.cos(nu / 2))
+            outbound = anomaly - e * math.sin(anomaly)
+        inbound = -outbound if self.hyperbolic else 2 * math.pi - outbound
+
+        out_time = self._time_to_mean_anomaly(outbound, ut)
+        in_time = self._time_to_mean_anomaly(inbound, ut)
+        if ascending is True:
+            return out_time
+        if ascending is False:
+            return in_time
+        return _scalar(np.fmin(out_time, in_time))
+
+    def time_to_altitude(self, altitude: float, ut: Optional[Times] = None, ascending: Optional[bool] = None) -> Times:
+        """Time until the vessel is next at an altitude, see time_to_radius."""
+        return self.time_to_radius(self.body_radius + altitude, ut, ascending)
+
+    def time_to_soi_exit(self, ut: Optional[Times] = None) -> Times:
+        """Time until the vessel leaves the body's sphere of influence; NaN if it never does."""
+        return self.time_to_radius(self.sphere_of_influence, ut, ascending=True)
+
+    def time_to_impact(self, ut: Optional[Times] = None) -> Times:
+        """Time until the orbit meets the body's equatorial radius on the way down; NaN if it never does."""
+        return self.time_to_radius(self.body_radius, ut, ascending=False)
+
+
+def solve_kepler(mean_anomaly: Times, eccentricity: float) -> Times:
+    """
+    Eccentric anomaly E with M = E - e sin E, or hyperbolic anomaly H with M = e sinh H - H.
+
+    Newton's method runs on the whole array at once until every element has
+    converged.
+    """
+    mean = np.asarray(mean_anomaly, dtype=float)
+    e = eccentricity
+    if e >= 1.0:
+        anomaly = np.arcsinh(mean / e)
+        for _ in range(KEPLER_MAX_ITERATIONS):
+            step = (e * np.sinh(anomaly) - anomaly - mean) / (e * np.cosh(anomaly) - 1)
+            anomaly = anomaly - step
+            if np.all(np.abs(step) < KEPLER_TOLERANCE):
+                break
+    else:
+        # Solve on [0, 2pi), where E = pi is a safe start for any eccentricity, then restore the revolutions
+        wrapped = np.mod(mean, 2 * np.pi)
+        anomaly = wrapped + e * np.sin(wrapped) if e < 0.8 else np.full_like(wrapped, np.pi)
+        for _ in range(KEPLER_MAX_ITERATIONS):
+            step = (anomaly - e * np.sin(anomaly) - wrapped) / (1 - e * np.cos(anomaly))
+            anomaly = anomaly - step
+            if np.all(np.abs(step) < KEPLER_TOLERANCE):
+                break
+        anomaly = anomaly + (mean - wrapped)
+    return _scalar(anomaly)
+
+
+def read_orbit(conn, orbit) -> KeplerOrbit:
+    """
+    Snapshot a kRPC orbit in two batched requests.
+
+    Args:
+        conn: kRPC connection the orbit belongs to
+        orbit: The remote orbit, e.g. vessel.orbit
+    """
+    values = batch_read(conn, [(orbit, attribute, ()) for attribute in _ORBIT_ATTRIBUTES]
+                        + [(conn.space_center, 'ut', ())])
+    for value in values:
+        if isinstance(value, Exception):
+            raise value
+    semi_major_axis, eccentricity, mean_anomaly, epoch, body, ut = values
+
+    body_values = batch_read(conn, [(body, attribute, ()) for attribute in _BODY_ATTRIBUTES])
+    for value in body_values[:2]:
+        if isinstance(value, Exception):
+            raise value
+    mu, radius, soi = body_values
+    if isinstance(soi, Exception) or soi is None or not math.isfinite(soi):
+        soi = math.inf  # The Sun has no sphere of influence
+
+    return KeplerOrbit(
+        semi_major_axis=semi_major_axis,
+        eccentricity=eccentricity,
+        mean_anomaly_at_epoch=mean_anomaly,
+        epoch=epoch,
+        gravitational_parameter=mu,
+        body_radius=radius,
+        sphere_of_influence=soi,
+        ut=ut,
+    )
+
+
+async def sleep_until(conn, ut: float, tolerance: float = 0.05, max_sleep: Optional[float] = None) -> float:
+    """
+    Sleep until universal time ut, without polling.
+
+    The game clock runs warp_rate times faster than the wall clock, so the
+    remaining game time is slept at that rate, then the clock is read once
+    to confirm. The confirmation read and warp rate share one request.
+
+    Args:
+        conn: kRPC connection
+        ut: Universal time to wake at
+        tolerance: Game seconds early that count as arrived
+        max_sleep: Longest wall-clock sleep between confirmations, None for no limit
+
+    Returns:
+        The universal time on waking
+    """
+    space_center = conn.space_center
+    while True:
+        now, rate = batch_read(conn, [(space_center, 'ut', ()), (space_center, 'warp_rate', ())])
+        if isinstance(now, Exception):
+            raise now
+        remaining = ut - now
+        if remaining <= tolerance:
+            return now
+        if isinstance(rate, Exception) or not rate or rate <= 0:
+            rate = 1.0
+        delay = remaining / rate
+        await asyncio.sleep(delay if max_sleep is None else min(delay, max_sleep))
@@ -0,0 +1,212 @@
+"""
+Per-stage delta-v, TWR and burn times from a cached part model.
+
+The part tree (activation and decouple stage, masses and engine performance
+of every part) is read once per stage change. After that, delta-v and
+burn-time queries are NumPy arithmetic over the cached arrays and cost no
+RPCs; only the vessel's current mass, which telemetry reads anyway, is needed
+to account for the propellant burnt since.
+
+Stages follow KSP's numbering and burn from the current stage down to 0.
+Stage s is the phase of flight after stage s is activated and before stage
+s - 1 is. During it, a part is still attached while its decouple stage is
+below s and an engine burns if its activation stage is s or higher. Engines
+draw from the tanks dropped together with them (same decouple stage), so a
+tank's propellant is booked to the first stage in burn order in which an
+engine of its group burns; tanks without an engine of their own, e.g. drop
+tanks feeding the core through fuel lines, go to the first stage in which
+any engine burns while they are attached. Engines run at full thrust
+(after the thrust limiter) with their vacuum Isp, and staging takes no time.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from kosmos.utils.krpc_batch import batch_read
+
+
+# Standard gravity used by KSP to convert Isp to exhaust velocity (m/s^2)
+G0 = 9.80665
+
+_PART_ATTRIBUTES = ('stage', 'decouple_stage', 'mass', 'dry_mass', 'engine')
+_ENGINE_ATTRIBUTES = ('max_vacuum_thrust', 'vacuum_specific_impulse', 'thrust_limit')
+
+
+@dataclass(frozen=True)
+class PartModel:
+    """One entry per part: stages, masses (kg) and vacuum engine performance."""
+    stage: np.ndarray
+    decouple_stage: np.ndarray
+    mass: np.ndarray
+    dry_mass: np.ndarray
+    thrust: np.ndarray  # N, 0 for parts without an engine
+    isp: np.ndarray  # s, 0 for parts without an engine
+
+
+def read_part_model(conn, parts: Sequence[Any]) -> PartModel:
+    """
+    Read the part tree of a vessel in two batched requests.
+
+    Args:
+        conn: kRPC connection the parts belong to
+        parts: The vessel's parts (vessel.parts.all)
+    """
+    parts = list(parts)
+    values = batch_read(conn, [(part, attribute, ()) for part in parts for attribute in _PART_ATTRIBUTES])
+    for value in values:
+        if isinstance(value, Exception):
+            raise value
+    rows = [values[i:i + len(_PART_ATTRIBUTES)] for i in range(0, len(values), len(_PART_ATTRIBUTES))]
+
+    engines = [(index, row[4]) for index, row in enumerate(rows) if row[4] is not None]
+    engine_values = batch_read(conn, [
+        (engine, attribute, ()) for _, engine in engines for attribute in _ENGINE_ATTRIBUTES
+    ])
+    thrust = np.zeros(len(parts))
+    isp = np.zeros(len(parts))
+    for offset, (index, _) in enumerate(engines):
+        max_thrust, vacuum_isp, limit = engine_values[3 * offset:3 * offset + 3]
+        # An engine whose performance cannot be read is treated as producing no thrust
+        if any(isinstance(value, Exception) for value in (max_thrust, vacuum_isp, limit)):
+            continue
+        if vacuum_isp > 0:
+            thrust[index] = max_thrust * limit
+            isp[index] = vacuum_isp
+
+    return PartModel(
+        stage=np.array([row[0] for row in rows], dtype=int),
+        decouple_stage=np.array([row[1] for row in rows], dtype=int),
+        mass=np.array([row[2] for row in rows], dtype=float),
+        dry_mass=np.array([row[3] for row in rows], dtype=float),
+        thrust=thrust,
+        isp=isp,
+    )
+
+
+class PropulsionModel:
+    """
+    Per-stage propulsion figures of a vessel, ordered by burn order.
+
+    Example:
+        model = PropulsionModel(read_part_model(conn, vessel.parts.all), vessel.control.current_stage)
+        model.update_mass(vessel.mass)
+        model.total_delta_v, model.burn_time(node.delta_v)
+    """
+
+    def __init__(self, parts: PartModel, current_stage: int, gravity: float = G0):
+        """
+        Args:
+            parts: Part model read at the current stage
+            current_stage: The vessel's current stage (control.current_stage)
+            gravity: Surface gravity TWR is measured against (m/s^2)
+        """
+        self.gravity = gravity
+        self.stages = np.arange(current_stage, -1, -1)
+
+        phase = self.stages[:, None]
+        attached = parts.decouple_stage[None, :] < phase
+        burning = attached & (parts.stage[None, :] >= phase) & (parts.thrust > 0)
+        # Which stage burns each tank: the first in burn order with an engine of its group burning
+        engine = parts.thrust > 0
+        group_engine = engine[:, None] & (parts.decouple_stage[:, None] == parts.decouple_stage[None, :])
+        group_burning = (burning.astype(float) @ group_engine.astype(float)) > 0
+        any_burning = np.repeat(burning.any(axis=1)[:, None], len(parts.thrust), axis=1)
+        feeds = attached & np.where(group_engine.any(axis=0)[None, :], group_burning, any_burning)
+        burnt_in = np.zeros_like(feeds)
+        fed = feeds.any(axis=0)
+        burnt_in[feeds.argmax(axis=0)[fed], np.flatnonzero(fed)] = True
+        part_flow = np.divide(parts.thrust, parts.isp * G0, out=np.zeros_like(parts.thrust), where=parts.isp > 0)
+
+        self.thrust = (burning * parts.thrust).sum(axis=1)
+        self.mass_flow = (burning * part_flow).sum(axis=1)
+        # Figures as read; update_mass derives the current ones from them
+        self._start_mass = (attached * parts.mass).sum(axis=1)
+        self._propellant = (burnt_in * (parts.mass - parts.dry_mass)).sum(axis=1)
+        # Propellant of the tanks burnt in stage j that is still on board in stage i, [i, j]
+        self._carried = (attached * (parts.mass - parts.dry_mass)) @ burnt_in.T.astype(float)
+        self.start_mass = self._start_mass.copy()
+        self.propellant = self._propellant.copy()
+
+    def update_mass(self, mass: float):
+        """
+        Account for the propellant burnt since the part model was read.
+
+        The mass lost is taken from the stages with engines in burn order, and
+        every stage still carrying the drained tanks gets lighter by it too.
+        """
+        if not len(self.stages) or mass is None:
+            return
+        burnt = max(self._start_mass[0] - mass, 0.0)
+        burnable = np.where(self.mass_flow > 0, self._propellant, 0.0)
+        taken = np.clip(burnt - (np.cumsum(burnable) - burnable), 0.0, burnable)
+        self.propellant = self._propellant - taken
+        # Drain each stage's tanks in proportion, wherever they are still attached
+        drained = np.divide(taken, self._propellant, out=np.zeros_like(taken), where=self._propellant > 0)
+        self.start_mass = self._start_mass - self._carried @ drained
+
+    @property
+    def exhaust_velocity(self) -> np.ndarray:
+        """Combined effective exhaust velocity per stage (m/s)."""
+        return np.divide(self.thrust, self.mass_flow, out=np.zeros_like(self.thrust), where=self.mass_flow > 0)
+
+    @property
+    def delta_v(self) -> np.ndarray:
+        """Delta-v per stage (m/s), by the Tsiolkovsky rocket equation."""
+        end_mass = self.start_mass - self.propellant
+        burns = (self.mass_flow > 0) & (self.propellant > 0) & (end_mass > 0)
+        ratio = np.divide(self.start_mass, end_mass, out=np.ones_like(end_mass), where=burns)
+        return self.exhaust_velocity * np.log(ratio)
+
+    @property
+    def burn_times(self) -> np.ndarray:
+        """Time to burn each stage's propellant at full thrust (s)."""
+        return np.divide(self.propellant, self.mass_flow, out=np.zeros_like(self.propellant), where=self.mass_flow > 0)
+
+    @property
+    def twr(self) -> np.ndarray:
+        """Thrust-to-weight ratio at the start of each stage."""
+        weight = self.start_mass * self.gravity
+        return np.divide(self.thrust, weight, out=np.zeros_like(self.thrust), where=weight > 0)
+
+    @property
+    def total_delta_v(self) -> float:
+        return float(self.delta_v.sum())
+
+    def burn_time(self, delta_v: float) -> Optional[float]:
+        """
+        Time to gain delta_v at full thrust, burning through stages as needed.
+
+        Returns:
+            Burn time in seconds, or None if the vessel does not have the delta-v
+        """
+        if delta_v is None or delta_v <= 0:
+            return 0.0
+        stage_dv = self.delta_v
+        cumulative = np.cumsum(stage_dv)
+        if not len(cumulative) or cumulative[-1] < delta_v:
+            return None
+
+        # Burn whole stages up to the one that completes the maneuver, then part of it
+        last = int(np.searchsorted(cumulative, delta_v, side='left'))
+        remaining = delta_v - (cumulative[last] - stage_dv[last])
+        end_mass = self.start_mass[last] * np.exp(-remaining / self.exhaust_velocity[last])
+        partial = (self.start_mass[last] - end_mass) / self.mass_flow[last]
+        return float(self.burn_times[:last].sum() + partial)
+
+    def stage_table(self) -> List[Dict[str, float]]:
+        """Per-stage figures in a JSON-serializable form, in burn order."""
+        return [
+            {
+                'stage': int(stage),
+                'delta_v': float(delta_v),
+                'twr': float(twr),
+                'burn_time': float(burn_time),
+                'start_mass': float(start_mass),
+                'thrust': float(thrust),
+            }
+            for stage, delta_v, twr, burn_time, start_mass, thrust in zip(
+                self.stages, self.delta_v, self.twr, self.burn_times, self.start_mass, self.thrust
+            )
+        ]
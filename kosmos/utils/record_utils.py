@@ -2,6 +2,8 @@ import time
 import re
 from .file_utils import *
 from .json_utils import *
+from .telemetry_store import TelemetryStore, flatten_telemetry
+from .telemetry_delta import DeltaDecoder, DeltaEncoder, is_delta
 
 class EventRecorder:
     def __init__(
@@ -9,8 +11,13 @@ class EventRecorder:
         checkpoint_dir="checkpoint",
         resume=False,
         init_position=None,
+        delta_encoding=False,
+        delta_epsilons=None,
     ):
         self.checkpoint_dir = checkpoint_dir
+        # Store events after the first of a rollout as deltas (see telemetry_delta)
+        self.delta_encoding = delta_encoding
+        self.delta_encoder = DeltaEncoder(epsilons=delta_epsilons) if delta_encoding else None
         self.resource_history = set()
         self.resource_vs_time = {}
         self.resource_vs_iterations = {}
@@ -22,15 +29,26 @@ class EventRecorder:
         self.mission_time = 0.0 # Mission elapsed time in seconds
         self.universal_time_start = None # KSP universal time at mission start
         self.iteration = 0
+        self.telemetry_store = TelemetryStore() # Columnar time series of every recorded event, indexed by UT
+        self.telemetry_saved = 0 # Samples of the store already written to telemetry/ chunks
         f_mkdir(self.checkpoint_dir, "events")
+        f_mkdir(self.checkpoint_dir, "telemetry")
+        # Number of the next chunk; continues after the chunks of earlier sessions in the same checkpoint dir
+        chunks = self.telemetry_chunks()
+        self.telemetry_chunk = int(last_part_in_path(chunks[-1])[:-4]) + 1 if chunks else 0
         if resume:
             self.resume()
         
     def record(self, telemetry, mission):
-        mission = re.sub(f'[\\/:"*<>| ]', "_", mission)
-        mission = mission.replace(" ", "_") + time.strftime(
-            "_%Y%m%d_%H%M%S", time.localtime()
-        )
+        # Truncate the mission name before the timestamp, so long names keep it
+        name = re.sub(f'[\\/:"*<>| \n]', "_", mission)[:100]
+        timestamp = time.strftime("_%Y%m%d_%H%M%S", time.localtime())
+        mission = name + timestamp
+        # Two records of a mission within one second must not overwrite each other
+        copy = 1
+        while f_exists(self.checkpoint_dir, "events", mission):
+            copy += 1
+            mission = f"{name}_{copy}{timestamp}"
         self.iteration += 1
 
         if not self.init_position and telemetry:
@@ -52,6 +70,7 @@ class EventRecorder:
         for event_type, event in telemetry:
             self.update_resource(event)
             self.update_orbital_state(event)
+            self.update_telemetry_store(event)
             if event_type == "observe":
                 self.update_mission_time(event)
 
@@ -59,9 +78,89 @@ class EventRecorder:
             f"Recorder message: {self.mission_time:.1f} seconds mission time\n"
             f"Recorder message: {self.iteration} iteration passed"
         )
-        # Truncate mission name to avoid filename too long error
-        safe_mission_name = mission.replace('\n', '_').replace(' ', '_')[:100]
-        dump_json(telemetry, f_join(self.checkpoint_dir, "events", safe_mission_name))
+        if self.delta_encoder:
+            # Deltas run across the records of a rollout; the encoder stores a keyframe every keyframe_interval events
+            telemetry = [(event_type, self.delta_encoder.encode(event)) for event_type, event in telemetry]
+
+        dump_json(telemetry, f_join(self.checkpoint_dir, "events", mission))
+        self.save_telemetry()
+
+    def save_telemetry(self):
+        """
+        Write the samples recorded since the last save as a new chunk.
+
+        Only new rows are written, so saving costs the same on every record
+        however long the mission; TelemetryStore.load(*self.telemetry_chunks())
+        reads the whole store back.
+        """
+        if len(self.telemetry_store) <= self.telemetry_saved:
+            return
+        chunk = f_join(self.checkpoint_dir, "telemetry", f"{self.telemetry_chunk:06d}.npz")
+        self.telemetry_store.save(chunk, start=self.telemetry_saved)
+        self.telemetry_saved = len(self.telemetry_store)
+        self.telemetry_chunk += 1
+
+    def telemetry_chunks(self):
+        """Paths of the saved telemetry chunks, in recording order."""
+        names = [name for name in f_listdir(self.checkpoint_dir, "telemetry") if re.fullmatch(r"\d+\.npz", name)]
+        return [f_join(self.checkpoint_dir, "telemetry", name) for name in sorted(names, key=lambda name: int(name[:-4]))]
+
+    def begin_rollout(self):
+        """Start a new rollout; with delta encoding its first event is stored in full."""
+        if self.delta_encoder:
+            self.delta_encoder.reset()
+
+    def sorted_records(self):
+        def get_timestamp(string):
+            timestamp = "_".join(string.split("_")[-2:])
+            return time.mktime(time.strptime(timestamp, "%Y%m%d_%H%M%S"))
+
+        records = f_listdir(self.checkpoint_dir, "events")
+        # Records written within the same second are ordered by when they were written
+        return sorted(records, key=lambda record: (
+            get_timestamp(record), float(f_time(self.checkpoint_dir, "events", record))
+        ))
+
+    def iter_events(self, records=None):
+        """
+        Yield (record, event_type, event) for every recorded event in order,
+        rebuilding delta-encoded events into full snapshots. Deltas that
+        cannot be rebuilt because an earlier record is missing are skipped.
+        """
+        decoder = DeltaDecoder()
+        for record in records if records is not None else self.sorted_records():
+            telemetry = load_json(f_join(self.checkpoint_dir, "events", record))
+            for event_type, event in telemetry or []:
+                event = decoder.decode(event)
+                if event is not None:
+                    yield record, event_type, event
+
+    def reconstruct(self, record, index=-1):
+        """
+        Rebuild a full event of a record file.
+
+        Delta events depend on earlier files, so decoding starts at the
+        closest earlier record that begins with a keyframe.
+
+        Args:
+            record: Record file name in the events directory
+            index: Position of the event within the record
+        """
+        records = self.sorted_records()
+        position = records.index(record)
+        start = position
+        while start > 0:
+            telemetry = load_json(f_join(self.checkpoint_dir, "events", records[start]))
+            if telemetry and not is_delta(telemetry[0][1]):
+                break
+            start -= 1
+
+        events = [
+            (event_type, event)
+            for name, event_type, event in self.iter_events(records[start:position + 1])
+            if name == record
+        ]
+        return events[index]
 
     def resume(self, cutoff=None):
         self.resource_history = set()
@@ -72,20 +171,22 @@ class EventRecorder:
         self.position_history = [[0, 0, 0]]
         self.celestial_body_history = set()
         self.vessel_situation_history = set()
+        self.telemetry_store = TelemetryStore()
 
-        def get_timestamp(string):
-            timestamp = "_".join(string.split("_")[-2:])
-            return time.mktime(time.strptime(timestamp, "%Y%m%d_%H%M%S"))
-
-        records = f_listdir(self.checkpoint_dir, "events")
-        sorted_records = sorted(records, key=get_timestamp)
+        sorted_records = self.sorted_records()
+        decoder = DeltaDecoder()
 
         for record in sorted_records:
             self.iteration += 1
             if cutoff and self.iteration > cutoff:
                 break
 
-            telemetry = load_json(f_join(self.checkpoint_dir, "events", record))
+            telemetry = [
+                (event_type, decoder.decode(event))
+                for event_type, event in load_json(f_join(self.checkpoint_dir, "events", record)) or []
+            ]
+            # Drop deltas that lost their keyframe, e.g. in checkpoints written before every record started with one
+            telemetry = [(event_type, event) for event_type, event in telemetry if event is not None]
 
             if not self.init_position and telemetry:
                 first_event = telemetry[0][1]
@@ -114,9 +215,13 @@ class EventRecorder:
                 self.update_resource(event)
                 self.update_position(event)
                 self.update_orbital_state(event)
+                self.update_telemetry_store(event)
                 if event_type == "observe":
                     self.update_mission_time(event)
 
+        # The rebuilt samples are already in the saved chunks
+        self.telemetry_saved = len(self.telemetry_store)
+
     def update_resource(self, event):
         if "resources" not in event:
             return
@@ -187,6 +292,20 @@ class EventRecorder:
             self.orbital_history[-1]["current_body"] != orbit_data["current_body"]):
             self.orbital_history.append(orbit_data)
 
+    def update_telemetry_store(self, event):
+        if not isinstance(event, dict) or "universal_time" not in event:
+            return
+
+        # Samples taken while the step ran precede the snapshot taken after it
+        trajectory = event.get("trajectory") or {}
+        columns = trajectory.get("columns", {})
+        if columns.get("ut"):
+            self.telemetry_store.extend(columns["ut"], {
+                f"trajectory.{name}": values for name, values in columns.items() if name != "ut"
+            })
+
+        self.telemetry_store.append(event["universal_time"], flatten_telemetry(event))
+
     def get_exploration_summary(self):
         return {
             "resources_discovered": len(self.resource_history),
@@ -220,6 +339,9 @@ class EventRecorder:
     def get_resource_timeline(self):
         return self.resource_vs_time
 
+    def get_telemetry_store(self):
+        return self.telemetry_store
+
     def get_orbital_progression(self):
         return self.orbital_history
 
@@ -0,0 +1,302 @@
+"""
+Spatial queries over all vessels in the game: nearest neighbours, vessels
+within a radius and closest approaches.
+
+Reading every vessel's position one RPC at a time costs a round trip per
+vessel, which adds up with the debris and asteroids of a long career. The
+index reads the vessel list with one RPC and the positions, velocities and
+situations of all vessels with one batched request, keeps them in NumPy
+arrays and answers queries with vectorized distance computations. Names and
+types never change, so they are only read for vessels the index has not
+seen before. Between full refreshes, update() re-reads the state of a few
+vessels only, e.g. those near the active vessel.
+
+Example:
+    index = VesselIndex(conn)
+    index.refresh()
+    for neighbour in index.nearest(vessel, k=3):
+        print(neighbour.name, neighbour.distance)
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from kosmos.utils.krpc_batch import batch_read
+
+
+class Neighbour(NamedTuple):
+    vessel: Any
+    name: str
+    type: str
+    situation: str
+    distance: float  # m
+    relative_speed: float  # m/s
+
+
+class Approach(NamedTuple):
+    vessel: Any
+    name: str
+    type: str
+    time: float  # s from the refresh until closest approach
+    distance: float  # m at closest approach
+
+
+def _name(value) -> str:
+    return getattr(value, "name", str(value))
+
+
+class VesselIndex:
+    """
+    Positions and velocities of all vessels in one reference frame.
+
+    Queries answer from the last refresh() and cost no RPCs. Positions are
+    taken in the non-rotating frame of the active vessel's body unless a
+    frame is given, so distances to vessels around other bodies are correct
+    as well.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.vessels: List[Any] = []
+        self.names: List[str] = []
+        self.types: List[str] = []
+        self.situations: List[str] = []
+        self.positions = np.zeros((0, 3))
+        self.velocities = np.zeros((0, 3))
+        self.ut: Optional[float] = None
+        self.reference_frame = None  # Frame of the last refresh
+        self._static: Dict[Any, tuple] = {}  # vessel -> (name, type)
+
+    def __len__(self) -> int:
+        return len(self.vessels)
+
+    def refresh(self, reference_frame=None) -> int:
+        """
+        Re-read the vessel list and every vessel's state.
+
+        Args:
+            reference_frame: Frame for positions and velocities, by default the
+                non-rotating frame of the active vessel's body
+
+        Returns:
+            Number of vessels in the index
+        """
+        space_center = self.conn.space_center
+        vessels = list(space_center.vessels)
+        if reference_frame is None:
+            reference_frame = space_center.active_vessel.orbit.body.non_rotating_reference_frame
+        self.reference_frame = reference_frame
+
+        # Names and types only for vessels seen for the first time
+        new = [vessel for vessel in vessels if vessel not in self._static]
+        if new:
+            values = batch_read(self.conn, [read for vessel in new for read in (
+                (vessel, "name", ()),
+                (vessel, "type", ()),
+            )])
+            for i, vessel in enumerate(new):
+                name, vessel_type = values[2 * i:2 * i + 2]
+                if not isinstance(name, Exception) and not isinstance(vessel_type, Exception):
+                    self._static[vessel] = (name, _name(vessel_type))
+        # Forget vessels that were recovered or destroyed
+        current = set(vessels)
+        for vessel in [vessel for vessel in self._static if vessel not in current]:
+            del self._static[vessel]
+
+        reads = [(space_center, "ut", ())]
+        for vessel in vessels:
+            reads.extend([
+                (vessel, "position", (reference_frame,)),
+                (vessel, "velocity", (reference_frame,)),
+                (vessel, "situation", ()),
+            ])
+        values = batch_read(self.conn, reads)
+        ut, values = values[0], values[1:]
+
+        kept, positions, velocities, situations = [], [], [], []
+        for i, vessel in enumerate(vessels):
+            position, velocity, situation = values[3 * i:3 * i + 3]
+            # A vessel can disappear between the two requests
+            if vessel not in self._static or any(isinstance(v, Exception) for v in (position, velocity, situation)):
+                continue
+            kept.append(vessel)
+            positions.append(position)
+            velocities.append(velocity)
+            situations.append(_name(situation))
+
+        self.vessels = kept
+        self.names = [self._static[vessel][0] for vessel in kept]
+        self.types = [self._static[vessel][1] for vessel in kept]
+        self.situations = situations
+        self.positions = np.array(positions, dtype=float).reshape(-1, 3)
+        self.velocities = np.array(velocities, dtype=float).reshape(-1, 3)
+        self.ut = None if isinstance(ut, Exception) else ut
+        return len(kept)
+
+    def update(self, vessels: Sequence[Any]) -> int:
+        """
+        Re-read the state of some indexed vessels in one batched request.
+
+        The vessel list is not read, so vessels launched or destroyed since the
+        last refresh() are only picked up by the next one; the other vessels
+        keep their last state.
+
+        Args:
+            vessels: Vessels of the index to update; others are ignored
+
+        Returns:
+            Number of vessels updated
+        """
+        rows = [self.vessels.index(vessel) for vessel in dict.fromkeys(vessels) if vessel in self.vessels]
+        if not rows:
+            return 0
+        reads = [(self.conn.space_center, "ut", ())]
+        for row in rows:
+            reads.extend([
+                (self.vessels[row], "position", (self.reference_frame,)),
+                (self.vessels[row], "velocity", (self.reference_frame,)),
+                (self.vessels[row], "situation", ()),
+            ])
+        values = batch_read(self.conn, reads)
+        ut, values = values[0], values[1:]
+
+        updated = 0
+        for i, row in enumerate(rows):
+            position, velocity, situation = values[3 * i:3 * i + 3]
+            if any(isinstance(v, Exception) for v in (position, velocity, situation)):
+                continue
+            self.positions[row] = position
+            self.velocities[row] = velocity
+            self.situations[row] = _name(situation)
+            updated += 1
+        if not isinstance(ut, Exception):
+            self.ut = ut
+        return updated
+
+    def _state(self, origin):
+        """Position and velocity of a vessel in the index, or a position given as (x, y, z)."""
+        if isinstance(origin, (tuple, list, np.ndarray)):
+            return np.asarray(origin, dtype=float), np.zeros(3)
+        try:
+            row = self.vessels.index(origin)
+        except ValueError:
+            raise KeyError("Vessel is not in the index, refresh() it first") from None
+        return self.positions[row], self.velocities[row]
+
+    def _candidates(self, origin, types: Optional[Sequence[str]]) -> np.ndarray:
+        """Rows to consider: all vessels except the origin, optionally of the given types."""
+        mask = np.ones(len(self.vessels), dtype=bool)
+        if not isinstance(origin, (tuple, list, np.ndarray)):
+            mask &= np.array([vessel != origin for vessel in self.vessels], dtype=bool)
+        if types is not None:
+            mask &= np.isin(np.array(self.types, dtype=object), list(types))
+        return np.flatnonzero(mask)
+
+    def _neighbours(self, rows: np.ndarray, distances: np.ndarray, speeds: np.ndarray) -> List[Neighbour]:
+        order = np.argsort(distances, kind="stable")
+        return [
+            Neighbour(
+                self.vessels[rows[i]], self.names[rows[i]], self.types[rows[i]],
+                self.situations[rows[i]], float(distances[i]), float(speeds[i]),
+            )
+            for i in order
+        ]
+
+    def _distances(self, origin, rows: np.ndarray):
+        position, velocity = self._state(origin)
+        distances = np.linalg.norm(self.positions[rows] - position, axis=1)
+        speeds = np.linalg.norm(self.velocities[rows] - velocity, axis=1)
+        return distances, speeds
+
+    def nearest(self, origin, k: int = 1, types: Optional[Sequence[str]] = None) -> List[Neighbour]:
+        """
+        The k vessels closest to origin, nearest first.
+
+        Args:
+            origin: A vessel in the index, or a position (x, y, z) in the index's frame
+            k: Number of vessels to return
+            types: Only consider vessels of these type names, e.g. ("space_object",)
+        """
+        rows = self._candidates(origin, types)
+        distances, speeds = self._distances(origin, rows)
+        if k < len(rows):
+            nearest = np.argpartition(distances, k)[:k]
+            rows, distances, speeds = rows[nearest], distances[nearest], speeds[nearest]
+        return self._neighbours(rows, distances, speeds)
+
+    def within(self, origin, radius: float, types: Optional[Sequence[str]] = None) -> List[Neighbour]:
+        """Vessels within radius metres of origin, nearest first."""
+        rows = self._candidates(origin, types)
+        distances, speeds = self._distances(origin, rows)
+        inside = distances <= radius
+        return self._neighbours(rows[inside], distances[inside], speeds[inside])
+
+    def closest_approach(
+        self,
+        origin,
+        horizon: float = 600.0,
+        radius: Optional[float] = None,
+        types: Optional[Sequence[str]] = None,
+    ) -> List[Approach]:
+        """
+        Closest approach of each vessel to origin within horizon seconds, closest first.
+
+        Relative motion is taken as a straight line, which holds for vessels
+        close to each other over a fraction of an orbit; use kosmos.utils.orbit
+        for encounters further out.
+
+        Args:
+            origin: A vessel in the index, or a fixed position (x, y, z)
+            horizon: Look-ahead from the refresh in seconds
+            radius: Only return approaches closer than this many metres
+            types: Only consider vessels of these type names
+        """
+        rows = self._candidates(origin, types)
+        position, velocity = self._state(origin)
+        dr = self.positions[rows] - position
+        dv = self.velocities[rows] - velocity
+        closing = np.einsum("ij,ij->i", dv, dv)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            times = np.where(closing > 0, -np.einsum("ij,ij->i", dr, dv) / closing, 0.0)
+        times = np.clip(times, 0.0, horizon)
+        distances = np.linalg.norm(dr + dv * times[:, None], axis=1)
+        order = np.argsort(distances, kind="stable")
+        if radius is not None:
+            order = order[distances[order] <= radius]
+        return [
+            Approach(
+                self.vessels[rows[i]], self.names[rows[i]], self.types[rows[i]],
+                float(times[i]), float(distances[i]),
+            )
+            for i in order
+        ]
+
+    def nearby(
+        self,
+        vessel,
+        limit: int = 10,
+        radius: Optional[float] = None,
+        types: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Vessels near vessel as telemetry dictionaries, nearest first.
+
+        Returns:
+            Up to limit dictionaries with name, type, situation, distance (m)
+            and relative_speed (m/s)
+        """
+        if radius is None:
+            neighbours = self.nearest(vessel, k=limit, types=types)
+        else:
+            neighbours = self.within(vessel, radius, types=types)[:limit]
+        return [
+            {
+                "name": n.name,
+                "type": n.type,
+                "situation": n.situation,
+                "distance": n.distance,
+                "relative_speed": n.relative_speed,
+            }
+            for n in neighbours
+        ]
@@ -6,10 +6,69 @@ This module provides a simple interface to collect all available telemetry
 data from Kerbal Space Program via kRPC for AI agent decision making.
 """
 
+import functools
+from contextlib import contextmanager
 import krpc
-from typing import Dict, Any, Optional, Tuple
+from krpc.error import StreamError
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
 import time
 
+from kosmos.utils.krpc_batch import Read, batch_read, read_one
+from kosmos.utils.propulsion import PropulsionModel, read_part_model
+from kosmos.utils.telemetry_fields import CONTINUOUS, TelemetryField, field_named, fields_for
+from kosmos.utils.vessel_cache import VesselPropertyCache
+
+
+# How field values are read from the server:
+#   direct - one blocking RPC per field on every snapshot
+#   stream - one persistent kRPC stream per field, registered on first use
+#   batch  - all fields of the requested categories sent as one kRPC request
+TELEMETRY_MODES = ("direct", "stream", "batch")
+
+# Seconds between part count reads while the stage is unchanged (docking, undocking, lost parts)
+PART_COUNT_PERIOD = 10.0
+
+# Categories returned by get_comprehensive_telemetry, in order
+COMPREHENSIVE_CATEGORIES = (
+    'basic_vessel',
+    'performance',
+    'torque',
+    'position_velocity',
+    'altitude_location',
+    'aerodynamics',
+    'orientation',
+    'flight_dynamics',
+    'reference_vectors',
+    'reference_frames',
+    'orbital',
+    'control',
+    'resources',
+)
+
+# Category name -> undecorated getter, filled in by the telemetry_category decorator
+_CATEGORY_GETTERS = {}
+
+
+def telemetry_category(name: str):
+    """
+    Register a getter as the collector for a telemetry category.
+
+    In batch mode, calling the getter on its own sends the whole category as
+    one batched request (see TelemetryCollector.collect). Otherwise the getter
+    runs inside a snapshot, so repeated reads within it are memoized.
+    """
+    def decorator(func):
+        _CATEGORY_GETTERS[name] = func
+
+        @functools.wraps(func)
+        def wrapper(self):
+            if self.mode == "batch":
+                return self.collect([name])[name]
+            with self.snapshot(), self._rpc_phase(f"telemetry:{name}"):
+                return func(self)
+        return wrapper
+    return decorator
+
 
 class TelemetryCollector:
     """
@@ -20,20 +79,71 @@ class TelemetryCollector:
     easy access by AI agents.
     """
     
-    def __init__(self, connection_name: str = "AI_Agent"):
+    def __init__(
+        self,
+        connection_name: str = "AI_Agent",
+        mode: str = "direct",
+        stream_rate: float = 10.0,
+        conn=None,
+    ):
         """
         Initialize the telemetry collector.
         
         Args:
             connection_name: Name for the kRPC connection
+            mode: Field read mode, one of TELEMETRY_MODES
+            stream_rate: Update rate in Hz for snapshot streams (0 = every frame)
+            conn: Existing kRPC connection to borrow (e.g. from a ConnectionPool).
+                A borrowed connection is left open by close(); without one the
+                collector opens its own connection with default address and ports.
         """
-        self.conn = krpc.connect(name=connection_name)
+        if mode not in TELEMETRY_MODES:
+            raise ValueError(f"Unknown telemetry mode '{mode}', expected one of {TELEMETRY_MODES}")
+
+        self._owns_conn = conn is None
+        self.conn = krpc.connect(name=connection_name) if conn is None else conn
         self.space_center = self.conn.space_center
+        self.mode = mode
+        self.stream_rate = stream_rate
         self.vessel = None
         self.flight = None
         self.orbit = None
         self.control = None
         self.resources = None
+        self.parts = None
+
+        # Static and per-stage properties, kept per vessel across set_vessel calls
+        self.vessel_cache = VesselPropertyCache()
+        # Resource name -> (density, flow mode); fixed by the game's resource definitions
+        self._resource_properties = {}
+
+        # Snapshot streams keyed by (remote object, attribute, args)
+        self._streams = {}
+        self._stream_errors = {}
+
+        # Batch mode: reads seen per category, and the results of the request in flight
+        self._batch_keys = {}
+        self._batch_values = {}
+        self._batch_category = None
+
+        # Continuous registry fields: field -> (value, monotonic fetch time)
+        self._field_values = {}
+        # Read key -> static or per-stage registry field, to leave cached fields out of batches
+        self._cached_field_keys = {}
+
+        # Snapshot memo: (remote object, attribute, args) -> value read in the current snapshot
+        self._snapshot_memo = {}
+        self._snapshot_depth = 0
+        self._schedule_time = None
+        # (schedule time, signature) of the last vessel cache validation
+        self._signature = None
+        # (stage, monotonic time, count) of the last part count read
+        self._part_count = (None, 0.0, None)
+
+        # Optional RPC instrumentation (kosmos.env.instrumentation.RPCInstrumentation)
+        self.instrumentation = None
+        # Optional shared stream registry (kosmos.env.streams.StreamRegistry); streams are added directly without one
+        self.stream_registry = None
         
     def set_vessel(self, vessel_name: Optional[str] = None):
         """
@@ -52,217 +162,415 @@ class TelemetryCollector:
             
         if not self.vessel:
             raise ValueError("No active vessel available")
+
+        # Streams and batched reads belong to the previously bound vessel
+        self.clear_streams()
+        self._batch_keys.clear()
+        self._field_values.clear()
+        self._cached_field_keys.clear()
+        self._signature = None
+        # (stage, monotonic time, count) of the last part count read
+        self._part_count = (None, 0.0, None)
             
         # Initialize related objects
         self.flight = self.vessel.flight()
         self.orbit = self.vessel.orbit
         self.control = self.vessel.control
         self.resources = self.vessel.resources
+        self.parts = self.vessel.parts
         
+    def _read(self, source, attribute: str, *args, rate: Optional[float] = None):
+        """
+        Read a property of a remote object, or call one of its methods when args are given.
+
+        In stream mode the value comes from a persistent stream that is registered
+        the first time the field is read and reused for every later snapshot, so
+        steady-state snapshots cost no RPCs regardless of how many fields they hold.
+        The stream updates at rate Hz (stream_rate by default); a rate of 0 reads
+        the field directly instead, for values that are not worth streaming, and
+        keeps it out of the reads batch mode learns for later snapshots.
+
+        Inside a snapshot each distinct read hits the server at most once; later
+        reads of the same (object, attribute, args) return the memoized value.
+        """
+        if not self._snapshot_depth:
+            return self._read_uncached(source, attribute, args, rate)
+
+        key = (source, attribute, args)
+        if key in self._snapshot_memo:
+            value = self._snapshot_memo[key]
+            if isinstance(value, Exception):
+                raise value
+            return value
+        try:
+            value = self._read_uncached(source, attribute, args, rate)
+        except Exception as e:
+            self._snapshot_memo[key] = e
+            raise
+        self._snapshot_memo[key] = value
+        return value
+
+    def _read_uncached(self, source, attribute: str, args: Tuple, rate: Optional[float]):
+        """Read a field according to the collector mode, bypassing the snapshot memo."""
+        if self.mode == "stream":
+            if rate == 0:
+                return self._fetch(source, attribute, args)
+            return self._read_stream(source, attribute, args, rate)
+        if self.mode == "batch":
+            return self._read_batched(source, attribute, args, learn=rate != 0)
+        return self._fetch(source, attribute, args)
+
+    def _read_many(self, reads: Sequence[Read], rate: Optional[float] = None) -> List[Any]:
+        """
+        Read several fields at once, returning failures as exception instances.
+
+        Reads that would hit the server directly (every read in direct mode,
+        rate 0 reads otherwise) are sent as one batched request instead of one
+        RPC each; the rest are served as _read serves them.
+        """
+        values: List[Any] = [None] * len(reads)
+        pending = []
+        for index, (source, attribute, args) in enumerate(reads):
+            key = (source, attribute, tuple(args))
+            if self._snapshot_depth and key in self._snapshot_memo:
+                values[index] = self._snapshot_memo[key]
+            elif self.mode == "direct" or (rate == 0 and key not in self._batch_values):
+                pending.append(index)
+            else:
+                try:
+                    values[index] = self._read(source, attribute, *args, rate=rate)
+                except Exception as e:
+                    values[index] = e
+
+        if pending:
+            fetched = batch_read(self.conn, [reads[index] for index in pending])
+            for index, value in zip(pending, fetched):
+                values[index] = value
+                if self._snapshot_depth:
+                    source, attribute, args = reads[index]
+                    self._snapshot_memo[(source, attribute, tuple(args))] = value
+        return values
+
+    @staticmethod
+    def _fetch(source, attribute: str, args: Tuple = ()):
+        """Read a field with a blocking RPC."""
+        return read_one(source, attribute, args)
+
+    def _read_batched(self, source, attribute: str, args: Tuple, learn: bool = True):
+        """Read a field from the batched response, falling back to a direct RPC."""
+        key = (source, attribute, args)
+        if key in self._batch_values:
+            value = self._batch_values[key]
+            if isinstance(value, Exception):
+                raise value
+            return value
+
+        # First time this category reads the field: remember it for the next batch
+        if learn and self._batch_category is not None:
+            self._batch_keys.setdefault(self._batch_category, {})[key] = None
+        return self._fetch(source, attribute, args)
+
+    def _read_stream(self, source, attribute: str, args: Tuple, rate: Optional[float] = None):
+        """Read a field from its snapshot stream, registering the stream on first use."""
+        key = (source, attribute, args)
+        if key in self._stream_errors:
+            raise self._stream_errors[key]
+
+        stream = self._streams.get(key)
+        if stream is None:
+            try:
+                if args:
+                    stream = self._add_stream(getattr(source, attribute), *args)
+                else:
+                    stream = self._add_stream(getattr, source, attribute)
+                rate = self.stream_rate if rate is None else rate
+                if rate:
+                    stream.rate = rate
+                stream.start(wait=False)
+            except Exception as e:
+                # Remember fields the server cannot stream (e.g. FAR-only properties)
+                self._stream_errors[key] = e
+                raise
+            self._streams[key] = stream
+
+        try:
+            return stream()
+        except StreamError:
+            # Stream registered but its first update has not arrived yet
+            return self._fetch(source, attribute, args)
+
+    @contextmanager
+    def snapshot(self):
+        """
+        Group reads into one telemetry snapshot.
+
+        Within the block every (object, attribute, args) read, such as a
+        reference frame or a position in it, hits the server at most once and
+        all categories see the same values. Snapshots nest; the memo is dropped
+        when the outermost one exits.
+
+        Example:
+            with collector.snapshot():
+                ai_data = collector.get_ai_decision_data()
+                telemetry = collector.get_comprehensive_telemetry()
+        """
+        outermost = self._snapshot_depth == 0
+        if outermost:
+            self._schedule_time = time.monotonic()
+        self._snapshot_depth += 1
+        try:
+            yield self
+        finally:
+            self._snapshot_depth -= 1
+            if outermost:
+                self._snapshot_memo.clear()
+                self._schedule_time = None
+
+    @contextmanager
+    def _rpc_phase(self, name: str):
+        """Attribute the RPCs made inside the block to a phase, if the collector is instrumented."""
+        if self.instrumentation is None:
+            yield
+        else:
+            with self.instrumentation.phase(name):
+                yield
+
+    def _reference_frames(self) -> Dict[str, Any]:
+        """The vessel, orbital and surface reference frames of the vessel."""
+        return {
+            'vessel': self._read(self.vessel, 'reference_frame'),
+            'orbital': self._read(self.vessel, 'orbital_reference_frame'),
+            'surface': self._read(self.vessel, 'surface_reference_frame'),
+        }
+
+    def _field_key(self, field: TelemetryField):
+        """The (remote object, attribute, args) read behind a registry field."""
+        return (getattr(self, field.source), field.attribute, ())
+
+    def _field_is_fresh(self, field: TelemetryField, now: float) -> bool:
+        """Check whether the cached value of a registry field can be reused."""
+        if field.volatility != CONTINUOUS:
+            return self.vessel_cache.contains(self.vessel, field)
+        entry = self._field_values.get(field)
+        return entry is not None and now - entry[1] < field.period
+
+    def _read_field(self, field: TelemetryField, now: float):
+        """Read a registry field, reusing its cached value until it is due."""
+        if self._field_is_fresh(field, now):
+            if field.volatility != CONTINUOUS:
+                return self.vessel_cache.get(self.vessel, field)
+            return self._field_values[field][0]
+
+        key = self._field_key(field)
+        source, attribute, _ = key
+        try:
+            value = self._read(source, attribute, rate=field.rate)
+            if field.transform is not None:
+                value = field.transform(value)
+        except Exception:
+            if not field.optional:
+                raise
+            value = None
+
+        if field.volatility == CONTINUOUS:
+            self._field_values[field] = (value, now)
+        else:
+            self.vessel_cache.put(self.vessel, field, value)
+            self._cached_field_keys[key] = field
+        return value
+
+    def _now(self) -> float:
+        """Schedule time of the current collection, or the current time outside one."""
+        return self._schedule_time if self._schedule_time is not None else time.monotonic()
+
+    def _vessel_signature(self) -> Tuple[int, int]:
+        """
+        Read the vessel's (current stage, part count) and validate the vessel cache against it.
+
+        Staging changes the stage; docking, undocking and losing parts change the
+        part count. Either drops the cached static and per-stage properties. The
+        signature is read at most once per collection. Counting parts means
+        fetching the whole part list, so it is only recounted when the stage
+        changes or every PART_COUNT_PERIOD seconds, and never streamed.
+        """
+        now = self._schedule_time
+        if now is not None and self._signature is not None and self._signature[0] == now:
+            return self._signature[1]
+
+        stage = self._read(self.control, 'current_stage')
+        counted_stage, counted_at, part_count = self._part_count
+        clock = self._now()
+        if part_count is None or stage != counted_stage or clock - counted_at >= PART_COUNT_PERIOD:
+            part_count = len(self._read(self.parts, 'all', rate=0))
+            self._part_count = (stage, clock, part_count)
+        signature = (stage, part_count)
+        self.vessel_cache.validate(self.vessel, signature)
+        self._signature = (now, signature)
+        return signature
+
+    def _collect_fields(self, category: str) -> Dict[str, Any]:
+        """
+        Read the registry fields of a category (see telemetry_fields).
+
+        Static and per-stage fields come from the vessel cache, which is
+        refilled after the vessel stages, docks or loses parts; continuous
+        fields are refetched once their refresh period has elapsed. Everything
+        else is served from the field cache.
+        """
+        fields = fields_for(category)
+        if any(field.volatility != CONTINUOUS for field in fields):
+            self._vessel_signature()
+        now = self._now()
+        return {field.key: self._read_field(field, now) for field in fields}
+
+    def _cached_field(self, category: str, key: str):
+        """Read a single registry field, e.g. for the AI decision dataset."""
+        field = field_named(category, key)
+        if field.volatility != CONTINUOUS:
+            self._vessel_signature()
+        return self._read_field(field, self._now())
+
+    def _due_batch_keys(self, category: str, now: float):
+        """Reads a category needs in the next batch: learned reads plus registry fields that are due."""
+        registry_keys = set()
+        for field in fields_for(category):
+            key = self._field_key(field)
+            registry_keys.add(key)
+            if not self._field_is_fresh(field, now):
+                yield key
+        for key in self._batch_keys.get(category, ()):
+            if key in registry_keys:
+                continue
+            field = self._cached_field_keys.get(key)
+            if field is not None and self._field_is_fresh(field, now):
+                continue
+            yield key
+
+    def _add_stream(self, func, *args):
+        if self.stream_registry is not None:
+            return self.stream_registry.acquire(self.conn, func, *args, owner="collector")
+        return self.conn.add_stream(func, *args)
+
+    def clear_streams(self):
+        """Remove all snapshot streams from the server."""
+        for stream in self._streams.values():
+            try:
+                stream.remove()
+            except Exception:
+                pass
+        self._streams.clear()
+        self._stream_errors.clear()
+
+    @telemetry_category('basic_vessel')
     def get_basic_vessel_data(self) -> Dict[str, Any]:
         """Get basic vessel information."""
         if not self.vessel:
             return {}
-            
-        return {
-            'name': self.vessel.name,
-            'type': str(self.vessel.type),
-            'situation': str(self.vessel.situation),
-            'mass': self.vessel.mass,
-            'dry_mass': self.vessel.dry_mass,
-            'crew_count': self.vessel.crew_count,
-            'crew_capacity': self.vessel.crew_capacity,
-            'biome': self.vessel.biome,
-            'recoverable': self.vessel.recoverable,
-            'met': self.vessel.met,  # Mission Elapsed Time
-        }
+
+        return self._collect_fields('basic_vessel')
     
+    @telemetry_category('performance')
     def get_performance_data(self) -> Dict[str, Any]:
         """Get vessel performance metrics."""
         if not self.vessel:
             return {}
-            
-        return {
-            'thrust': self.vessel.thrust,
-            'max_thrust': self.vessel.max_thrust,
-            'max_vacuum_thrust': self.vessel.max_vacuum_thrust,
-            'specific_impulse': self.vessel.specific_impulse,
-            'kerbin_sea_level_specific_impulse': self.vessel.kerbin_sea_level_specific_impulse,
-            'vacuum_specific_impulse': self.vessel.vacuum_specific_impulse,
-        }
+
+        return self._collect_fields('performance')
     
+    @telemetry_category('torque')
     def get_torque_data(self) -> Dict[str, Any]:
         """Get available torque and control capabilities."""
         if not self.vessel:
             return {}
-            
-        return {
-            'available_control_surface_torque': self.vessel.available_control_surface_torque,
-            'available_engine_torque': self.vessel.available_engine_torque,
-            'available_rcs_torque': self.vessel.available_rcs_torque,
-            'available_reaction_wheel_torque': self.vessel.available_reaction_wheel_torque,
-            'available_thrust': self.vessel.available_thrust,
-            'available_torque': self.vessel.available_torque,
-        }
+
+        return self._collect_fields('torque')
     
+    @telemetry_category('position_velocity')
     def get_position_velocity_data(self) -> Dict[str, Any]:
         """Get position and velocity information in multiple reference frames."""
         if not self.flight or not self.vessel:
             return {}
             
         # Get reference frames
-        vessel_rf = self.vessel.reference_frame
-        orbital_rf = self.vessel.orbital_reference_frame
-        surface_rf = self.vessel.surface_reference_frame
+        frames = self._reference_frames()
+        vessel_rf, orbital_rf, surface_rf = frames['vessel'], frames['orbital'], frames['surface']
         
         return {
             # Vessel-relative position and velocity
-            'position_vessel': self.vessel.position(vessel_rf),
-            'velocity_vessel': self.vessel.velocity(vessel_rf),
+            'position_vessel': self._read(self.vessel, 'position', vessel_rf),
+            'velocity_vessel': self._read(self.vessel, 'velocity', vessel_rf),
             
             # Orbital-relative position and velocity
-            'position_orbital': self.vessel.position(orbital_rf),
-            'velocity_orbital': self.vessel.velocity(orbital_rf),
+            'position_orbital': self._read(self.vessel, 'position', orbital_rf),
+            'velocity_orbital': self._read(self.vessel, 'velocity', orbital_rf),
             
             # Surface-relative position and velocity
-            'position_surface': self.vessel.position(surface_rf),
-            'velocity_surface': self.vessel.velocity(surface_rf),
+            'position_surface': self._read(self.vessel, 'position', surface_rf),
+            'velocity_surface': self._read(self.vessel, 'velocity', surface_rf),
             
             # Flight data (uses default reference frame)
-            'speed': self.flight.speed,
-            'horizontal_speed': self.flight.horizontal_speed,
-            'vertical_speed': self.flight.vertical_speed,
-            'equivalent_air_speed': self.flight.equivalent_air_speed,
-            'true_air_speed': self.flight.true_air_speed,
-            'terminal_velocity': self.flight.terminal_velocity,
+            **self._collect_fields('position_velocity'),
         }
     
+    @telemetry_category('altitude_location')
     def get_altitude_location_data(self) -> Dict[str, Any]:
         """Get altitude and location information."""
         if not self.flight:
             return {}
-            
-        return {
-            'mean_altitude': self.flight.mean_altitude,
-            'surface_altitude': self.flight.surface_altitude,
-            'bedrock_altitude': self.flight.bedrock_altitude,
-            'latitude': self.flight.latitude,
-            'longitude': self.flight.longitude,
-            'elevation': self.flight.elevation,
-        }
+
+        return self._collect_fields('altitude_location')
     
+    @telemetry_category('aerodynamics')
     def get_aerodynamics_data(self) -> Dict[str, Any]:
         """Get aerodynamic information (stock KSP + FAR if available)."""
         if not self.flight:
             return {}
-        
-        # Basic aerodynamics (available in stock KSP)
-        aero_data = {
-            'atmosphere_density': self.flight.atmosphere_density,
-            'dynamic_pressure': self.flight.dynamic_pressure,
-            'static_pressure': self.flight.static_pressure,
-            'static_pressure_at_msl': self.flight.static_pressure_at_msl,
-            'drag': self.flight.drag,
-            'lift': self.flight.lift,
-            'mach': self.flight.mach,
-        }
-        
-        # FAR-specific properties (optional - only if FAR mod is installed)
-        # These will be None if FAR is not available
-        try:
-            aero_data['drag_coefficient'] = self.flight.drag_coefficient
-        except:
-            aero_data['drag_coefficient'] = None
-        
-        try:
-            aero_data['lift_coefficient'] = self.flight.lift_coefficient
-        except:
-            aero_data['lift_coefficient'] = None
-        
-        try:
-            aero_data['ballistic_coefficient'] = self.flight.ballistic_coefficient
-        except:
-            aero_data['ballistic_coefficient'] = None
-        
-        try:
-            aero_data['reynolds_number'] = self.flight.reynolds_number
-        except:
-            aero_data['reynolds_number'] = None
-        
-        return aero_data
+
+        return self._collect_fields('aerodynamics')
     
+    @telemetry_category('orientation')
     def get_orientation_data(self) -> Dict[str, Any]:
         """Get vessel orientation information."""
         if not self.flight:
             return {}
-            
-        return {
-            'heading': self.flight.heading,
-            'pitch': self.flight.pitch,
-            'roll': self.flight.roll,
-            'direction': self.flight.direction,
-            'rotation': self.flight.rotation,
-            'angle_of_attack': self.flight.angle_of_attack,
-            'sideslip_angle': self.flight.sideslip_angle,
-        }
+
+        return self._collect_fields('orientation')
     
+    @telemetry_category('flight_dynamics')
     def get_flight_dynamics_data(self) -> Dict[str, Any]:
         """Get flight dynamics information (stock KSP + FAR if available)."""
         if not self.flight:
             return {}
-        
-        dynamics_data = {
-            'g_force': self.flight.g_force,
-            'center_of_mass': self.flight.center_of_mass,
-            'aerodynamic_force': self.flight.aerodynamic_force,
-        }
-        
-        # FAR-specific properties (optional - only if FAR mod is installed)
-        try:
-            dynamics_data['thrust_specific_fuel_consumption'] = self.flight.thrust_specific_fuel_consumption
-        except:
-            dynamics_data['thrust_specific_fuel_consumption'] = None
-        
-        try:
-            dynamics_data['stall_fraction'] = self.flight.stall_fraction
-        except:
-            dynamics_data['stall_fraction'] = None
-        
-        return dynamics_data
+
+        return self._collect_fields('flight_dynamics')
     
+    @telemetry_category('reference_vectors')
     def get_reference_vectors(self) -> Dict[str, Any]:
         """Get reference direction vectors."""
         if not self.flight:
             return {}
-            
-        return {
-            'prograde': self.flight.prograde,
-            'retrograde': self.flight.retrograde,
-            'normal': self.flight.normal,
-            'anti_normal': self.flight.anti_normal,
-            'radial': self.flight.radial,
-            'anti_radial': self.flight.anti_radial,
-        }
+
+        return self._collect_fields('reference_vectors')
     
+    @telemetry_category('reference_frames')
     def get_reference_frame_data(self) -> Dict[str, Any]:
         """Get reference frame information and positions in different coordinate systems."""
         if not self.vessel:
             return {}
             
         # Get reference frames
-        vessel_rf = self.vessel.reference_frame
-        orbital_rf = self.vessel.orbital_reference_frame
-        surface_rf = self.vessel.surface_reference_frame
+        frames = self._reference_frames()
+        vessel_rf, orbital_rf, surface_rf = frames['vessel'], frames['orbital'], frames['surface']
         
         # Get positions in different reference frames
-        vessel_pos = self.vessel.position(vessel_rf)
-        orbital_pos = self.vessel.position(orbital_rf)
-        surface_pos = self.vessel.position(surface_rf)
+        vessel_pos = self._read(self.vessel, 'position', vessel_rf)
+        orbital_pos = self._read(self.vessel, 'position', orbital_rf)
+        surface_pos = self._read(self.vessel, 'position', surface_rf)
         
         # Get velocities in different reference frames
-        vessel_vel = self.vessel.velocity(vessel_rf)
-        orbital_vel = self.vessel.velocity(orbital_rf)
-        surface_vel = self.vessel.velocity(surface_rf)
+        vessel_vel = self._read(self.vessel, 'velocity', vessel_rf)
+        orbital_vel = self._read(self.vessel, 'velocity', orbital_rf)
+        surface_vel = self._read(self.vessel, 'velocity', surface_rf)
         
         return {
             'reference_frames': {
@@ -289,112 +597,109 @@ class TelemetryCollector:
             }
         }
     
+    @telemetry_category('orbital')
     def get_orbital_data(self) -> Dict[str, Any]:
         """Get orbital information."""
         if not self.orbit:
             return {}
+
+        body = self._read(self.orbit, 'body')
             
         return {
-            # Orbital elements
-            'semi_major_axis': self.orbit.semi_major_axis,
-            'semi_minor_axis': self.orbit.semi_minor_axis,
-            'eccentricity': self.orbit.eccentricity,
-            'inclination': self.orbit.inclination,
-            'longitude_of_ascending_node': self.orbit.longitude_of_ascending_node,
-            'argument_of_periapsis': self.orbit.argument_of_periapsis,
-            'mean_anomaly': self.orbit.mean_anomaly,
-            'eccentric_anomaly': self.orbit.eccentric_anomaly,
-            'true_anomaly': self.orbit.true_anomaly,
-            
-            # Orbital characteristics
-            'apoapsis': self.orbit.apoapsis,
-            'periapsis': self.orbit.periapsis,
-            'apoapsis_altitude': self.orbit.apoapsis_altitude,
-            'periapsis_altitude': self.orbit.periapsis_altitude,
-            'period': self.orbit.period,
-            'orbital_speed': self.orbit.orbital_speed,
-            'speed': self.orbit.speed,
-            'radius': self.orbit.radius,
-            
-            # Timing
-            'time_to_apoapsis': self.orbit.time_to_apoapsis,
-            'time_to_periapsis': self.orbit.time_to_periapsis,
-            'time_to_soi_change': self.orbit.time_to_soi_change,
-            'epoch': self.orbit.epoch,
-            'mean_anomaly_at_epoch': self.orbit.mean_anomaly_at_epoch,
+            **self._collect_fields('orbital'),
             
             # Body information
-            'body_name': self.orbit.body.name if self.orbit.body else None,
+            'body_name': self._read(body, 'name') if body else None,
         }
     
+    @telemetry_category('control')
     def get_control_data(self) -> Dict[str, Any]:
         """Get current control inputs and system status."""
         if not self.control:
             return {}
-            
-        return {
-            # Flight controls
-            'pitch': self.control.pitch,
-            'yaw': self.control.yaw,
-            'roll': self.control.roll,
-            'throttle': self.control.throttle,
-            'forward': self.control.forward,
-            'up': self.control.up,
-            'right': self.control.right,
-            
-            # System controls
-            'sas': self.control.sas,
-            'rcs': self.control.rcs,
-            'brakes': self.control.brakes,
-            'gear': self.control.gear,
-            'lights': self.control.lights,
-            'abort': self.control.abort,
-            
-            # Advanced controls
-            'custom_axis01': self.control.custom_axis01,
-            'custom_axis02': self.control.custom_axis02,
-            'custom_axis03': self.control.custom_axis03,
-            'custom_axis04': self.control.custom_axis04,
-            'wheel_steering': self.control.wheel_steering,
-            'wheel_throttle': self.control.wheel_throttle,
-            
-            # System status
-            'state': str(self.control.state),
-            'source': str(self.control.source),
-            'current_stage': self.control.current_stage,
-            'stage_lock': self.control.stage_lock,
-            'sas_mode': str(self.control.sas_mode),
-            'input_mode': str(self.control.input_mode),
-        }
+
+        return self._collect_fields('control')
     
+    @telemetry_category('resources')
     def get_resource_data(self) -> Dict[str, Any]:
-        """Get vessel resource information."""
+        """
+        Get vessel resource information.
+
+        Resource names and capacities only change with staging or part
+        changes and come from the vessel cache; density and flow mode are
+        fixed per resource and cached by name. A steady-state snapshot only
+        reads the current amounts, all in one exchange.
+        """
         if not self.resources:
             return {}
-            
-        # Get all available resources
+
+        self._vessel_signature()
+        if not self.vessel_cache.contains(self.vessel, 'resource_names'):
+            self.vessel_cache.put(self.vessel, 'resource_names', tuple(self._read(self.resources, 'names', rate=0)))
+        names = self.vessel_cache.get(self.vessel, 'resource_names')
+        capacities = self.vessel_cache.get(self.vessel, 'resource_max')
+        unknown = [name for name in names if name not in self._resource_properties]
+
+        reads = [(self.resources, 'amount', (name,)) for name in names]
+        if capacities is None:
+            reads += [(self.resources, 'max', (name,)) for name in names]
+        for name in unknown:
+            reads += [(self.resources, 'density', (name,)), (self.resources, 'flow_mode', (name,))]
+        values = self._read_many(reads[:len(names)]) + self._read_many(reads[len(names):], rate=0)
+
+        amounts = values[:len(names)]
+        offset = len(names)
+        if capacities is None:
+            capacities = dict(zip(names, values[offset:offset + len(names)]))
+            self.vessel_cache.put(self.vessel, 'resource_max', capacities)
+            offset += len(names)
+        for index, name in enumerate(unknown):
+            # These properties may not be available for all resources or configurations
+            density, flow_mode = values[offset + 2 * index:offset + 2 * index + 2]
+            self._resource_properties[name] = (
+                None if isinstance(density, Exception) else density,
+                None if isinstance(flow_mode, Exception) else str(flow_mode),
+            )
+
         resource_data = {}
-        for resource in self.resources.names:
-            res_info = {
-                'amount': self.resources.amount(resource),
-                'max': self.resources.max(resource),
+        for name, amount in zip(names, amounts):
+            if isinstance(amount, Exception):
+                raise amount
+            capacity = capacities[name]
+            if isinstance(capacity, Exception):
+                raise capacity
+            density, flow_mode = self._resource_properties[name]
+            resource_data[name] = {
+                'amount': amount,
+                'max': capacity,
+                'flow_mode': flow_mode,
+                'density': density,
             }
-            
-            # These properties may not be available for all resources or configurations
-            try:
-                res_info['flow_mode'] = str(self.resources.flow_mode(resource))
-            except:
-                res_info['flow_mode'] = None
-            
-            try:
-                res_info['density'] = self.resources.density(resource)
-            except:
-                res_info['density'] = None
-            
-            resource_data[resource] = res_info
         
         return resource_data
-    
+
+    def get_propulsion_model(self) -> Optional[PropulsionModel]:
+        """
+        Get the per-stage delta-v, TWR and burn-time model of the vessel.
+
+        The part tree is read once per stage change and kept in the vessel
+        cache; later calls only bring the current stage's propellant up to
+        date from the vessel mass, which a telemetry snapshot has read already.
+        """
+        if not self.vessel:
+            return None
+
+        with self.snapshot():
+            current_stage, _ = self._vessel_signature()
+            model = self.vessel_cache.get(self.vessel, 'propulsion')
+            if model is None:
+                parts = read_part_model(self.conn, self._read(self.parts, 'all', rate=0))
+                body = self._read(self.orbit, 'body', rate=0)
+                model = PropulsionModel(parts, current_stage, self._read(body, 'surface_gravity', rate=0))
+                self.vessel_cache.put(self.vessel, 'propulsion', model)
+            model.update_mass(self._read(self.vessel, 'mass'))
+        return model
+
     def get_comprehensive_telemetry(self) -> Dict[str, Any]:
         """
         Get all available telemetry data in one comprehensive dictionary.
@@ -404,21 +709,62 @@ class TelemetryCollector:
         """
         return {
             'timestamp': time.time(),
-            'basic_vessel': self.get_basic_vessel_data(),
-            'performance': self.get_performance_data(),
-            'torque': self.get_torque_data(),
-            'position_velocity': self.get_position_velocity_data(),
-            'altitude_location': self.get_altitude_location_data(),
-            'aerodynamics': self.get_aerodynamics_data(),
-            'orientation': self.get_orientation_data(),
-            'flight_dynamics': self.get_flight_dynamics_data(),
-            'reference_vectors': self.get_reference_vectors(),
-            'reference_frames': self.get_reference_frame_data(),
-            'orbital': self.get_orbital_data(),
-            'control': self.get_control_data(),
-            'resources': self.get_resource_data(),
+            **self.collect(COMPREHENSIVE_CATEGORIES),
         }
+
+    def collect(self, categories: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Collect several telemetry categories at once.
+
+        In batch mode every field the categories read is sent to the server as a
+        single kRPC request and each category dict is built from the decoded
+        results. The field list of a category is learned on its first
+        collection (which reads fields directly), so later snapshots cost one
+        network round trip no matter how many categories are requested.
+        Registry fields that are not yet due for a refresh are left out of
+        the request and served from the field cache.
+        
+        Args:
+            categories: Category names, defaults to COMPREHENSIVE_CATEGORIES
+            
+        Returns:
+            Dictionary mapping each category name to its data
+        """
+        categories = list(categories) if categories else list(COMPREHENSIVE_CATEGORIES)
+        for category in categories:
+            if category not in _CATEGORY_GETTERS:
+                raise ValueError(f"Unknown telemetry category '{category}'")
+
+        # All categories of one collection share a snapshot, so shared reads are
+        # made once and a field that is due when the batch is built is still due
+        # when it is read
+        with self.snapshot():
+            if self.mode != "batch":
+                data = {}
+                for category in categories:
+                    with self._rpc_phase(f"telemetry:{category}"):
+                        data[category] = _CATEGORY_GETTERS[category](self)
+                return data
+
+            keys = list(dict.fromkeys(
+                key for category in categories
+                for key in self._due_batch_keys(category, self._schedule_time)
+                if key not in self._snapshot_memo
+            ))
+            with self._rpc_phase("telemetry:batch"):
+                self._batch_values = dict(zip(keys, batch_read(self.conn, keys)))
+            try:
+                data = {}
+                for category in categories:
+                    self._batch_category = category
+                    with self._rpc_phase(f"telemetry:{category}"):
+                        data[category] = _CATEGORY_GETTERS[category](self)
+                return data
+            finally:
+                self._batch_category = None
+                self._batch_values = {}
     
+    @telemetry_category('ai_decision')
     def get_ai_decision_data(self) -> Dict[str, Any]:
         """
         Get a simplified dataset optimized for AI decision making.
@@ -428,60 +774,63 @@ class TelemetryCollector:
         """
         if not self.vessel or not self.flight or not self.orbit:
             return {}
+
+        current_stage, part_count = self._vessel_signature() if self.control else (0, 0)
+        frames = self._reference_frames()
             
         return {
             'timestamp': time.time(),
             
             # Critical vessel state
-            'name': self.vessel.name,
-            'situation': str(self.vessel.situation),
-            'mass': self.vessel.mass,
-            'thrust': self.vessel.thrust,
-            'max_thrust': self.vessel.max_thrust,
+            'name': self._cached_field('basic_vessel', 'name'),
+            'situation': str(self._read(self.vessel, 'situation')),
+            'mass': self._read(self.vessel, 'mass'),
+            'thrust': self._read(self.vessel, 'thrust'),
+            'max_thrust': self._read(self.vessel, 'max_thrust'),
             
             # Position and motion (in different reference frames)
-            'position_vessel': self.vessel.position(self.vessel.reference_frame),
-            'velocity_vessel': self.vessel.velocity(self.vessel.reference_frame),
-            'position_orbital': self.vessel.position(self.vessel.orbital_reference_frame),
-            'velocity_orbital': self.vessel.velocity(self.vessel.orbital_reference_frame),
-            'position_surface': self.vessel.position(self.vessel.surface_reference_frame),
-            'velocity_surface': self.vessel.velocity(self.vessel.surface_reference_frame),
-            'speed': self.flight.speed,
-            'altitude': self.flight.mean_altitude,
-            'surface_altitude': self.flight.surface_altitude,
+            'position_vessel': self._read(self.vessel, 'position', frames['vessel']),
+            'velocity_vessel': self._read(self.vessel, 'velocity', frames['vessel']),
+            'position_orbital': self._read(self.vessel, 'position', frames['orbital']),
+            'velocity_orbital': self._read(self.vessel, 'velocity', frames['orbital']),
+            'position_surface': self._read(self.vessel, 'position', frames['surface']),
+            'velocity_surface': self._read(self.vessel, 'velocity', frames['surface']),
+            'speed': self._read(self.flight, 'speed'),
+            'altitude': self._read(self.flight, 'mean_altitude'),
+            'surface_altitude': self._read(self.flight, 'surface_altitude'),
             
             # Orientation
-            'heading': self.flight.heading,
-            'pitch': self.flight.pitch,
-            'roll': self.flight.roll,
+            'heading': self._read(self.flight, 'heading'),
+            'pitch': self._read(self.flight, 'pitch'),
+            'roll': self._read(self.flight, 'roll'),
             
             # Orbital state
-            'apoapsis_altitude': self.orbit.apoapsis_altitude,
-            'periapsis_altitude': self.orbit.periapsis_altitude,
-            'eccentricity': self.orbit.eccentricity,
-            'inclination': self.orbit.inclination,
-            'orbital_speed': self.orbit.orbital_speed,
+            'apoapsis_altitude': self._read(self.orbit, 'apoapsis_altitude'),
+            'periapsis_altitude': self._read(self.orbit, 'periapsis_altitude'),
+            'eccentricity': self._read(self.orbit, 'eccentricity'),
+            'inclination': self._read(self.orbit, 'inclination'),
+            'orbital_speed': self._read(self.orbit, 'orbital_speed'),
             
             # Control inputs
-            'throttle': self.control.throttle if self.control else 0,
-            'pitch_input': self.control.pitch if self.control else 0,
-            'yaw_input': self.control.yaw if self.control else 0,
-            'roll_input': self.control.roll if self.control else 0,
+            'throttle': self._read(self.control, 'throttle') if self.control else 0,
+            'pitch_input': self._read(self.control, 'pitch') if self.control else 0,
+            'yaw_input': self._read(self.control, 'yaw') if self.control else 0,
+            'roll_input': self._read(self.control, 'roll') if self.control else 0,
             
             # System status
-            'sas_enabled': self.control.sas if self.control else False,
-            'rcs_enabled': self.control.rcs if self.control else False,
-            'gear_deployed': self.control.gear if self.control else False,
+            'sas_enabled': self._read(self.control, 'sas') if self.control else False,
+            'rcs_enabled': self._read(self.control, 'rcs') if self.control else False,
+            'gear_deployed': self._read(self.control, 'gear') if self.control else False,
             
             # Resources (key ones only)
-            'fuel_amount': self.resources.amount('LiquidFuel') if self.resources else 0,
-            'fuel_max': self.resources.max('LiquidFuel') if self.resources else 0,
-            'electric_charge': self.resources.amount('ElectricCharge') if self.resources else 0,
-            'electric_charge_max': self.resources.max('ElectricCharge') if self.resources else 0,
+            'fuel_amount': self._read(self.resources, 'amount', 'LiquidFuel') if self.resources else 0,
+            'fuel_max': self._read(self.resources, 'max', 'LiquidFuel') if self.resources else 0,
+            'electric_charge': self._read(self.resources, 'amount', 'ElectricCharge') if self.resources else 0,
+            'electric_charge_max': self._read(self.resources, 'max', 'ElectricCharge') if self.resources else 0,
             
             # Parts information
-            'part_count': len(self.vessel.parts.all) if hasattr(self.vessel, 'parts') else 0,
-            'current_stage': self.vessel.control.current_stage if self.vessel.control else 0,
+            'part_count': part_count,
+            'current_stage': current_stage,
         }
     
     def get_reference_frame_for_mission(self, mission_type: str) -> Dict[str, Any]:
@@ -494,15 +843,19 @@ class TelemetryCollector:
         Returns:
             Dictionary with reference frame data relevant to the mission type
         """
+        with self.snapshot():
+            return self._reference_frame_for_mission(mission_type)
+
+    def _reference_frame_for_mission(self, mission_type: str) -> Dict[str, Any]:
         if not self.vessel:
             return {}
             
         base_data = {
             'mission_type': mission_type,
             'reference_frames_available': {
-                'vessel': self.vessel.reference_frame is not None,
-                'orbital': self.vessel.orbital_reference_frame is not None,
-                'surface': self.vessel.surface_reference_frame is not None,
+                'vessel': self._read(self.vessel, 'reference_frame') is not None,
+                'orbital': self._read(self.vessel, 'orbital_reference_frame') is not None,
+                'surface': self._read(self.vessel, 'surface_reference_frame') is not None,
             }
         }
         
@@ -510,47 +863,47 @@ class TelemetryCollector:
             # For launch, we need surface and vessel reference frames
             return {
                 **base_data,
-                'surface_position': self.vessel.position(self.vessel.surface_reference_frame),
-                'surface_velocity': self.vessel.velocity(self.vessel.surface_reference_frame),
-                'vessel_position': self.vessel.position(self.vessel.reference_frame),
-                'vessel_velocity': self.vessel.velocity(self.vessel.reference_frame),
-                'altitude': self.flight.mean_altitude,
-                'vertical_speed': self.flight.vertical_speed,
+                'surface_position': self._read(self.vessel, 'position', self._read(self.vessel, 'surface_reference_frame')),
+                'surface_velocity': self._read(self.vessel, 'velocity', self._read(self.vessel, 'surface_reference_frame')),
+                'vessel_position': self._read(self.vessel, 'position', self._read(self.vessel, 'reference_frame')),
+                'vessel_velocity': self._read(self.vessel, 'velocity', self._read(self.vessel, 'reference_frame')),
+                'altitude': self._read(self.flight, 'mean_altitude'),
+                'vertical_speed': self._read(self.flight, 'vertical_speed'),
             }
             
         elif mission_type == 'orbital':
             # For orbital operations, we need orbital reference frame
             return {
                 **base_data,
-                'orbital_position': self.vessel.position(self.vessel.orbital_reference_frame),
-                'orbital_velocity': self.vessel.velocity(self.vessel.orbital_reference_frame),
-                'prograde': self.flight.prograde,
-                'retrograde': self.flight.retrograde,
-                'normal': self.flight.normal,
-                'radial': self.flight.radial,
+                'orbital_position': self._read(self.vessel, 'position', self._read(self.vessel, 'orbital_reference_frame')),
+                'orbital_velocity': self._read(self.vessel, 'velocity', self._read(self.vessel, 'orbital_reference_frame')),
+                'prograde': self._read(self.flight, 'prograde'),
+                'retrograde': self._read(self.flight, 'retrograde'),
+                'normal': self._read(self.flight, 'normal'),
+                'radial': self._read(self.flight, 'radial'),
             }
             
         elif mission_type == 'landing':
             # For landing, we need surface reference frame
             return {
                 **base_data,
-                'surface_position': self.vessel.position(self.vessel.surface_reference_frame),
-                'surface_velocity': self.vessel.velocity(self.vessel.surface_reference_frame),
-                'surface_altitude': self.flight.surface_altitude,
-                'vertical_speed': self.flight.vertical_speed,
-                'horizontal_speed': self.flight.horizontal_speed,
+                'surface_position': self._read(self.vessel, 'position', self._read(self.vessel, 'surface_reference_frame')),
+                'surface_velocity': self._read(self.vessel, 'velocity', self._read(self.vessel, 'surface_reference_frame')),
+                'surface_altitude': self._read(self.flight, 'surface_altitude'),
+                'vertical_speed': self._read(self.flight, 'vertical_speed'),
+                'horizontal_speed': self._read(self.flight, 'horizontal_speed'),
             }
             
         elif mission_type == 'docking':
             # For docking, we need vessel reference frame
             return {
                 **base_data,
-                'vessel_position': self.vessel.position(self.vessel.reference_frame),
-                'vessel_velocity': self.vessel.velocity(self.vessel.reference_frame),
+                'vessel_position': self._read(self.vessel, 'position', self._read(self.vessel, 'reference_frame')),
+                'vessel_velocity': self._read(self.vessel, 'velocity', self._read(self.vessel, 'reference_frame')),
                 'vessel_orientation': {
-                    'heading': self.flight.heading,
-                    'pitch': self.flight.pitch,
-                    'roll': self.flight.roll,
+                    'heading': self._read(self.flight, 'heading'),
+                    'pitch': self._read(self.flight, 'pitch'),
+                    'roll': self._read(self.flight, 'roll'),
                 }
             }
             
@@ -558,11 +911,11 @@ class TelemetryCollector:
             # For surface operations, we need surface reference frame
             return {
                 **base_data,
-                'surface_position': self.vessel.position(self.vessel.surface_reference_frame),
-                'surface_velocity': self.vessel.velocity(self.vessel.surface_reference_frame),
-                'latitude': self.flight.latitude,
-                'longitude': self.flight.longitude,
-                'heading': self.flight.heading,
+                'surface_position': self._read(self.vessel, 'position', self._read(self.vessel, 'surface_reference_frame')),
+                'surface_velocity': self._read(self.vessel, 'velocity', self._read(self.vessel, 'surface_reference_frame')),
+                'latitude': self._read(self.flight, 'latitude'),
+                'longitude': self._read(self.flight, 'longitude'),
+                'heading': self._read(self.flight, 'heading'),
             }
             
         else:
@@ -573,8 +926,9 @@ class TelemetryCollector:
             }
     
     def close(self):
-        """Close the kRPC connection."""
-        if self.conn:
+        """Remove snapshot streams and close the kRPC connection unless it was borrowed."""
+        self.clear_streams()
+        if self.conn and self._owns_conn:
             self.conn.close()
 
 
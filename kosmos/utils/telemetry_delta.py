@@ -0,0 +1,193 @@
+"""
+Delta encoding of telemetry events.
+
+Consecutive snapshots of a rollout differ in a handful of fields, yet each
+("observe", telemetry) event stores the whole comprehensive_telemetry tree
+again. The encoder stores the first event of a rollout (and every
+keyframe_interval-th one after it) in full and later events as the list of
+leaves that changed by more than their epsilon. Changes are measured against
+the last *stored* value of a field, not the last observed one, so slow drift
+below epsilon still gets recorded once it accumulates and a reconstructed
+field is never off by more than its epsilon.
+
+Delta events have the form:
+    {"_delta": {"n": <events since keyframe>, "set": [[path, value], ...], "unset": [path, ...]}}
+where path is the list of dict keys leading to the field. Any other value
+is a keyframe, so files written without delta encoding decode unchanged.
+"""
+
+import copy
+from numbers import Number
+from typing import Any, Dict, List, Mapping, Optional
+
+DELTA_KEY = "_delta"
+
+# Change thresholds by field name (leaf key) or dotted path; fields not listed must match exactly
+DEFAULT_EPSILONS: Dict[str, float] = {
+    # Altitudes and distances (m)
+    'altitude': 0.1,
+    'surface_altitude': 0.1,
+    'mean_altitude': 0.1,
+    'bedrock_altitude': 0.1,
+    'elevation': 0.1,
+    'apoapsis': 0.1,
+    'periapsis': 0.1,
+    'apoapsis_altitude': 0.1,
+    'periapsis_altitude': 0.1,
+    'semi_major_axis': 0.1,
+    'semi_minor_axis': 0.1,
+    'radius': 0.1,
+    # Speeds (m/s)
+    'speed': 0.01,
+    'vertical_speed': 0.01,
+    'horizontal_speed': 0.01,
+    'orbital_speed': 0.01,
+    'equivalent_air_speed': 0.01,
+    'true_air_speed': 0.01,
+    # Angles (degrees)
+    'heading': 0.01,
+    'pitch': 0.01,
+    'roll': 0.01,
+    'angle_of_attack': 0.01,
+    'sideslip_angle': 0.01,
+    # Times (s)
+    'time_to_apoapsis': 0.01,
+    'time_to_periapsis': 0.01,
+    # Masses (kg) and resource amounts (units)
+    'mass': 0.1,
+    'amount': 1e-3,
+}
+
+
+def is_delta(payload) -> bool:
+    return isinstance(payload, dict) and len(payload) == 1 and DELTA_KEY in payload
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, Number) and not isinstance(value, bool)
+
+
+class DeltaEncoder:
+    """
+    Encodes a stream of telemetry events as keyframes and deltas.
+
+    Example:
+        encoder = DeltaEncoder()
+        stored = [(event_type, encoder.encode(event)) for event_type, event in events]
+    """
+
+    def __init__(
+        self,
+        epsilons: Optional[Mapping[str, float]] = None,
+        default_epsilon: float = 0.0,
+        keyframe_interval: int = 50,
+    ):
+        """
+        Args:
+            epsilons: Change thresholds by leaf key or dotted path, defaults to DEFAULT_EPSILONS
+            default_epsilon: Threshold for numeric fields not in epsilons
+            keyframe_interval: Store every n-th event in full to bound reconstruction cost
+        """
+        self.epsilons = dict(DEFAULT_EPSILONS if epsilons is None else epsilons)
+        self.default_epsilon = default_epsilon
+        self.keyframe_interval = keyframe_interval
+        self._state: Optional[Dict[str, Any]] = None
+        self._count = 0
+
+    def reset(self):
+        """Start a new rollout: the next event is stored in full."""
+        self._state = None
+        self._count = 0
+
+    def encode(self, event):
+        """Return the event itself for a keyframe, or its delta against the stored state."""
+        if not isinstance(event, dict):
+            return event
+        if self._state is None or self._count + 1 >= self.keyframe_interval:
+            self._state = copy.deepcopy(event)
+            self._count = 0
+            return event
+
+        changed: List[list] = []
+        removed: List[list] = []
+        self._diff(self._state, event, [], changed, removed)
+        self._count += 1
+        return {DELTA_KEY: {"n": self._count, "set": changed, "unset": removed}}
+
+    def _epsilon(self, path: List[str]) -> float:
+        dotted = ".".join(path)
+        if dotted in self.epsilons:
+            return self.epsilons[dotted]
+        return self.epsilons.get(path[-1], self.default_epsilon)
+
+    def _unchanged(self, old, new, path: List[str]) -> bool:
+        if _is_number(old) and _is_number(new):
+            return abs(new - old) <= self._epsilon(path)
+        if (
+            isinstance(old, (list, tuple)) and isinstance(new, (list, tuple))
+            and len(old) == len(new) and all(_is_number(v) for v in old) and all(_is_number(v) for v in new)
+        ):
+            epsilon = self._epsilon(path)
+            return all(abs(b - a) <= epsilon for a, b in zip(old, new))
+        return old == new
+
+    def _diff(self, old: Dict[str, Any], new: Mapping[str, Any], path: List[str], changed, removed):
+        """Record fields of new that differ from old, updating old to the stored values."""
+        for key, value in new.items():
+            key_path = path + [key]
+            if key not in old:
+                changed.append([key_path, value])
+                old[key] = copy.deepcopy(value)
+            elif isinstance(value, Mapping) and isinstance(old[key], dict):
+                self._diff(old[key], value, key_path, changed, removed)
+            elif not self._unchanged(old[key], value, key_path):
+                changed.append([key_path, value])
+                old[key] = copy.deepcopy(value)
+        for key in [key for key in old if key not in new]:
+            removed.append(path + [key])
+            del old[key]
+
+
+class DeltaDecoder:
+    """
+    Rebuilds full events from a sequence of keyframes and deltas, in recording order.
+
+    A delta that does not follow the events decoded so far, e.g. because an
+    earlier record file is missing, cannot be rebuilt; decode() returns None
+    for it and every later delta until the next keyframe.
+    """
+
+    def __init__(self):
+        self._state: Optional[Dict[str, Any]] = None
+        self._count = 0
+
+    def reset(self):
+        self._state = None
+        self._count = 0
+
+    def decode(self, payload):
+        """Return the full event for a stored payload, or None for a delta that is out of sequence."""
+        if not is_delta(payload):
+            if isinstance(payload, dict):
+                self._state = copy.deepcopy(payload)
+                self._count = 0
+            return payload
+
+        delta = payload[DELTA_KEY]
+        if self._state is None or delta.get("n") != self._count + 1:
+            # Out of sync; skip deltas until the next keyframe
+            self._state = None
+            return None
+
+        for path, value in delta.get("set", []):
+            target = self._state
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = copy.deepcopy(value)
+        for path in delta.get("unset", []):
+            target = self._state
+            for key in path[:-1]:
+                target = target.get(key, {})
+            target.pop(path[-1], None)
+        self._count = delta["n"]
+        return copy.deepcopy(self._state)
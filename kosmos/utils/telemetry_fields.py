@@ -0,0 +1,234 @@
+"""
+Declarative registry of the telemetry fields read by TelemetryCollector.
+
+Each field names the remote object it is read from, the category it is
+reported under, how often its value can change and the rate at which the
+collector should refresh it. The collector schedules its reads from this
+registry instead of refetching every field on every snapshot.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+
+# Volatility classes
+STATIC = "static"          # fixed for the lifetime of a vessel
+PER_STAGE = "per_stage"    # changes only when the vessel stages
+CONTINUOUS = "continuous"  # changes every physics frame
+
+VOLATILITIES = (STATIC, PER_STAGE, CONTINUOUS)
+
+# Target refresh rates in Hz for continuous fields
+FAST = 10.0
+MEDIUM = 2.0
+SLOW = 0.5
+
+
+@dataclass(frozen=True)
+class TelemetryField:
+    """A single telemetry value and how to fetch it."""
+
+    category: str
+    key: str
+    source: str            # collector attribute holding the remote object: vessel, flight, orbit, control
+    attribute: str
+    volatility: str = CONTINUOUS
+    rate: float = MEDIUM   # target refresh rate in Hz, 0 for static and per-stage fields
+    transform: Optional[Callable] = None
+    optional: bool = False  # only available with mods such as FAR, reported as None otherwise
+
+    def __post_init__(self):
+        if self.volatility not in VOLATILITIES:
+            raise ValueError(f"Unknown volatility '{self.volatility}' for field '{self.key}'")
+        if self.volatility == CONTINUOUS and self.rate <= 0:
+            raise ValueError(f"Continuous field '{self.key}' needs a positive refresh rate")
+
+    @property
+    def period(self) -> float:
+        """Seconds a fetched value stays fresh."""
+        return 1.0 / self.rate if self.rate > 0 else float("inf")
+
+
+def _static(category, key, source, attribute, transform=None):
+    return TelemetryField(category, key, source, attribute, STATIC, 0.0, transform)
+
+
+def _per_stage(category, key, source, attribute, transform=None):
+    return TelemetryField(category, key, source, attribute, PER_STAGE, 0.0, transform)
+
+
+def _continuous(category, key, source, attribute, rate=MEDIUM, transform=None, optional=False):
+    return TelemetryField(category, key, source, attribute, CONTINUOUS, rate, transform, optional)
+
+
+TELEMETRY_FIELDS: Tuple[TelemetryField, ...] = (
+    # Basic vessel information
+    _static('basic_vessel', 'name', 'vessel', 'name'),
+    _static('basic_vessel', 'type', 'vessel', 'type', transform=str),
+    _continuous('basic_vessel', 'situation', 'vessel', 'situation', MEDIUM, transform=str),
+    _continuous('basic_vessel', 'mass', 'vessel', 'mass', MEDIUM),
+    _per_stage('basic_vessel', 'dry_mass', 'vessel', 'dry_mass'),
+    _continuous('basic_vessel', 'crew_count', 'vessel', 'crew_count', SLOW),
+    _static('basic_vessel', 'crew_capacity', 'vessel', 'crew_capacity'),
+    _continuous('basic_vessel', 'biome', 'vessel', 'biome', SLOW),
+    _static('basic_vessel', 'recoverable', 'vessel', 'recoverable'),
+    _continuous('basic_vessel', 'met', 'vessel', 'met', MEDIUM),  # Mission Elapsed Time
+
+    # Performance
+    _continuous('performance', 'thrust', 'vessel', 'thrust', FAST),
+    _continuous('performance', 'max_thrust', 'vessel', 'max_thrust', MEDIUM),
+    _per_stage('performance', 'max_vacuum_thrust', 'vessel', 'max_vacuum_thrust'),
+    _continuous('performance', 'specific_impulse', 'vessel', 'specific_impulse', MEDIUM),
+    _per_stage('performance', 'kerbin_sea_level_specific_impulse', 'vessel', 'kerbin_sea_level_specific_impulse'),
+    _per_stage('performance', 'vacuum_specific_impulse', 'vessel', 'vacuum_specific_impulse'),
+
+    # Torque and control capabilities
+    _continuous('torque', 'available_control_surface_torque', 'vessel', 'available_control_surface_torque', SLOW),
+    _continuous('torque', 'available_engine_torque', 'vessel', 'available_engine_torque', SLOW),
+    _continuous('torque', 'available_rcs_torque', 'vessel', 'available_rcs_torque', SLOW),
+    _continuous('torque', 'available_reaction_wheel_torque', 'vessel', 'available_reaction_wheel_torque', SLOW),
+    _continuous('torque', 'available_thrust', 'vessel', 'available_thrust', MEDIUM),
+    _continuous('torque', 'available_torque', 'vessel', 'available_torque', SLOW),
+
+    # Flight speeds (positions and velocities per reference frame are read by the collector)
+    _continuous('position_velocity', 'speed', 'flight', 'speed', FAST),
+    _continuous('position_velocity', 'horizontal_speed', 'flight', 'horizontal_speed', FAST),
+    _continuous('position_velocity', 'vertical_speed', 'flight', 'vertical_speed', FAST),
+    _continuous('position_velocity', 'equivalent_air_speed', 'flight', 'equivalent_air_speed', MEDIUM),
+    _continuous('position_velocity', 'true_air_speed', 'flight', 'true_air_speed', MEDIUM),
+    _continuous('position_velocity', 'terminal_velocity', 'flight', 'terminal_velocity', SLOW),
+
+    # Altitude and location
+    _continuous('altitude_location', 'mean_altitude', 'flight', 'mean_altitude', FAST),
+    _continuous('altitude_location', 'surface_altitude', 'flight', 'surface_altitude', FAST),
+    _continuous('altitude_location', 'bedrock_altitude', 'flight', 'bedrock_altitude', MEDIUM),
+    _continuous('altitude_location', 'latitude', 'flight', 'latitude', MEDIUM),
+    _continuous('altitude_location', 'longitude', 'flight', 'longitude', MEDIUM),
+    _continuous('altitude_location', 'elevation', 'flight', 'elevation', MEDIUM),
+
+    # Aerodynamics (stock KSP + FAR if available)
+    _continuous('aerodynamics', 'atmosphere_density', 'flight', 'atmosphere_density', MEDIUM),
+    _continuous('aerodynamics', 'dynamic_pressure', 'flight', 'dynamic_pressure', MEDIUM),
+    _continuous('aerodynamics', 'static_pressure', 'flight', 'static_pressure', MEDIUM),
+    _continuous('aerodynamics', 'static_pressure_at_msl', 'flight', 'static_pressure_at_msl', SLOW),
+    _continuous('aerodynamics', 'drag', 'flight', 'drag', MEDIUM),
+    _continuous('aerodynamics', 'lift', 'flight', 'lift', MEDIUM),
+    _continuous('aerodynamics', 'mach', 'flight', 'mach', MEDIUM),
+    _continuous('aerodynamics', 'drag_coefficient', 'flight', 'drag_coefficient', SLOW, optional=True),
+    _continuous('aerodynamics', 'lift_coefficient', 'flight', 'lift_coefficient', SLOW, optional=True),
+    _continuous('aerodynamics', 'ballistic_coefficient', 'flight', 'ballistic_coefficient', SLOW, optional=True),
+    _continuous('aerodynamics', 'reynolds_number', 'flight', 'reynolds_number', SLOW, optional=True),
+
+    # Orientation
+    _continuous('orientation', 'heading', 'flight', 'heading', FAST),
+    _continuous('orientation', 'pitch', 'flight', 'pitch', FAST),
+    _continuous('orientation', 'roll', 'flight', 'roll', FAST),
+    _continuous('orientation', 'direction', 'flight', 'direction', MEDIUM),
+    _continuous('orientation', 'rotation', 'flight', 'rotation', MEDIUM),
+    _continuous('orientation', 'angle_of_attack', 'flight', 'angle_of_attack', MEDIUM),
+    _continuous('orientation', 'sideslip_angle', 'flight', 'sideslip_angle', MEDIUM),
+
+    # Flight dynamics (stock KSP + FAR if available)
+    _continuous('flight_dynamics', 'g_force', 'flight', 'g_force', FAST),
+    _continuous('flight_dynamics', 'center_of_mass', 'flight', 'center_of_mass', MEDIUM),
+    _continuous('flight_dynamics', 'aerodynamic_force', 'flight', 'aerodynamic_force', MEDIUM),
+    _continuous('flight_dynamics', 'thrust_specific_fuel_consumption', 'flight', 'thrust_specific_fuel_consumption', SLOW, optional=True),
+    _continuous('flight_dynamics', 'stall_fraction', 'flight', 'stall_fraction', SLOW, optional=True),
+
+    # Reference direction vectors
+    _continuous('reference_vectors', 'prograde', 'flight', 'prograde', MEDIUM),
+    _continuous('reference_vectors', 'retrograde', 'flight', 'retrograde', MEDIUM),
+    _continuous('reference_vectors', 'normal', 'flight', 'normal', MEDIUM),
+    _continuous('reference_vectors', 'anti_normal', 'flight', 'anti_normal', MEDIUM),
+    _continuous('reference_vectors', 'radial', 'flight', 'radial', MEDIUM),
+    _continuous('reference_vectors', 'anti_radial', 'flight', 'anti_radial', MEDIUM),
+
+    # Orbital elements
+    _continuous('orbital', 'semi_major_axis', 'orbit', 'semi_major_axis', MEDIUM),
+    _continuous('orbital', 'semi_minor_axis', 'orbit', 'semi_minor_axis', MEDIUM),
+    _continuous('orbital', 'eccentricity', 'orbit', 'eccentricity', MEDIUM),
+    _continuous('orbital', 'inclination', 'orbit', 'inclination', MEDIUM),
+    _continuous('orbital', 'longitude_of_ascending_node', 'orbit', 'longitude_of_ascending_node', SLOW),
+    _continuous('orbital', 'argument_of_periapsis', 'orbit', 'argument_of_periapsis', SLOW),
+    _continuous('orbital', 'mean_anomaly', 'orbit', 'mean_anomaly', MEDIUM),
+    _continuous('orbital', 'eccentric_anomaly', 'orbit', 'eccentric_anomaly', MEDIUM),
+    _continuous('orbital', 'true_anomaly', 'orbit', 'true_anomaly', MEDIUM),
+
+    # Orbital characteristics
+    _continuous('orbital', 'apoapsis', 'orbit', 'apoapsis', FAST),
+    _continuous('orbital', 'periapsis', 'orbit', 'periapsis', FAST),
+    _continuous('orbital', 'apoapsis_altitude', 'orbit', 'apoapsis_altitude', FAST),
+    _continuous('orbital', 'periapsis_altitude', 'orbit', 'periapsis_altitude', FAST),
+    _continuous('orbital', 'period', 'orbit', 'period', MEDIUM),
+    _continuous('orbital', 'orbital_speed', 'orbit', 'orbital_speed', FAST),
+    _continuous('orbital', 'speed', 'orbit', 'speed', FAST),
+    _continuous('orbital', 'radius', 'orbit', 'radius', FAST),
+
+    # Orbital timing
+    _continuous('orbital', 'time_to_apoapsis', 'orbit', 'time_to_apoapsis', MEDIUM),
+    _continuous('orbital', 'time_to_periapsis', 'orbit', 'time_to_periapsis', MEDIUM),
+    _continuous('orbital', 'time_to_soi_change', 'orbit', 'time_to_soi_change', SLOW),
+    _continuous('orbital', 'epoch', 'orbit', 'epoch', SLOW),
+    _continuous('orbital', 'mean_anomaly_at_epoch', 'orbit', 'mean_anomaly_at_epoch', SLOW),
+
+    # Flight controls
+    _continuous('control', 'pitch', 'control', 'pitch', FAST),
+    _continuous('control', 'yaw', 'control', 'yaw', FAST),
+    _continuous('control', 'roll', 'control', 'roll', FAST),
+    _continuous('control', 'throttle', 'control', 'throttle', FAST),
+    _continuous('control', 'forward', 'control', 'forward', MEDIUM),
+    _continuous('control', 'up', 'control', 'up', MEDIUM),
+    _continuous('control', 'right', 'control', 'right', MEDIUM),
+
+    # System controls
+    _continuous('control', 'sas', 'control', 'sas', MEDIUM),
+    _continuous('control', 'rcs', 'control', 'rcs', MEDIUM),
+    _continuous('control', 'brakes', 'control', 'brakes', MEDIUM),
+    _continuous('control', 'gear', 'control', 'gear', MEDIUM),
+    _continuous('control', 'lights', 'control', 'lights', SLOW),
+    _continuous('control', 'abort', 'control', 'abort', MEDIUM),
+
+    # Advanced controls
+    _continuous('control', 'custom_axis01', 'control', 'custom_axis01', SLOW),
+    _continuous('control', 'custom_axis02', 'control', 'custom_axis02', SLOW),
+    _continuous('control', 'custom_axis03', 'control', 'custom_axis03', SLOW),
+    _continuous('control', 'custom_axis04', 'control', 'custom_axis04', SLOW),
+    _continuous('control', 'wheel_steering', 'control', 'wheel_steering', MEDIUM),
+    _continuous('control', 'wheel_throttle', 'control', 'wheel_throttle', MEDIUM),
+
+    # System status
+    _continuous('control', 'state', 'control', 'state', SLOW, transform=str),
+    _continuous('control', 'source', 'control', 'source', SLOW, transform=str),
+    _continuous('control', 'current_stage', 'control', 'current_stage', MEDIUM),
+    _continuous('control', 'stage_lock', 'control', 'stage_lock', SLOW),
+    _continuous('control', 'sas_mode', 'control', 'sas_mode', MEDIUM, transform=str),
+    _continuous('control', 'input_mode', 'control', 'input_mode', SLOW, transform=str),
+)
+
+
+def _by_category(fields) -> Dict[str, Tuple[TelemetryField, ...]]:
+    categories: Dict[str, list] = {}
+    for field in fields:
+        categories.setdefault(field.category, []).append(field)
+    return {category: tuple(entries) for category, entries in categories.items()}
+
+
+FIELDS_BY_CATEGORY: Dict[str, Tuple[TelemetryField, ...]] = _by_category(TELEMETRY_FIELDS)
+
+
+FIELDS_BY_NAME: Dict[Tuple[str, str], TelemetryField] = {
+    (field.category, field.key): field for field in TELEMETRY_FIELDS
+}
+
+
+def field_named(category: str, key: str) -> TelemetryField:
+    """Look up a registered field by category and key."""
+    try:
+        return FIELDS_BY_NAME[(category, key)]
+    except KeyError:
+        raise ValueError(f"Unknown telemetry field '{category}.{key}'") from None
+
+
+def fields_for(category: str) -> Tuple[TelemetryField, ...]:
+    """Registered fields of a category, in report order."""
+    return FIELDS_BY_CATEGORY.get(category, ())
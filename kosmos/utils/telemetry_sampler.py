@@ -0,0 +1,288 @@
+"""
+Background high-rate telemetry sampler.
+
+While generated flight code runs, a sampler thread copies the latest values
+of a few hot fields from kRPC streams into a preallocated NumPy ring buffer.
+Reading a stream value costs no RPC, so sampling at 10-50 Hz does not load
+the server, and the buffer keeps memory bounded no matter how long the code
+runs: once full, the oldest samples are overwritten.
+"""
+
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from krpc.error import StreamError
+
+
+# Hot fields: (column, remote object the field is read from, attribute)
+SAMPLED_FIELDS: Tuple[Tuple[str, str, str], ...] = (
+    ('ut', 'space_center', 'ut'),
+    ('altitude', 'flight', 'mean_altitude'),
+    ('surface_altitude', 'flight', 'surface_altitude'),
+    ('speed', 'flight', 'speed'),
+    ('vertical_speed', 'flight', 'vertical_speed'),
+    ('horizontal_speed', 'flight', 'horizontal_speed'),
+    ('apoapsis_altitude', 'orbit', 'apoapsis_altitude'),
+    ('periapsis_altitude', 'orbit', 'periapsis_altitude'),
+    ('throttle', 'control', 'throttle'),
+    ('thrust', 'vessel', 'thrust'),
+    ('mass', 'vessel', 'mass'),
+)
+
+# Resources sampled when the vessel carries them
+SAMPLED_RESOURCES = ('LiquidFuel', 'Oxidizer', 'SolidFuel', 'MonoPropellant', 'ElectricCharge')
+
+
+class RingBuffer:
+    """Fixed-capacity table of float64 samples, allocated once."""
+
+    def __init__(self, capacity: int, columns: Sequence[str]):
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        self.capacity = capacity
+        self.columns = tuple(columns)
+        self._data = np.full((capacity, len(self.columns)), np.nan)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def dropped(self) -> int:
+        """Number of samples overwritten since the last clear."""
+        return max(self._count - self.capacity, 0)
+
+    def append(self, row: Sequence[float]):
+        self._data[self._next] = row
+        self._next = (self._next + 1) % self.capacity
+        self._count += 1
+
+    def clear(self):
+        self._data.fill(np.nan)
+        self._next = 0
+        self._count = 0
+
+    def array(self) -> np.ndarray:
+        """Copy of the stored samples, oldest first, one column per field."""
+        if self._count <= self.capacity:
+            return self._data[:self._count].copy()
+        return np.concatenate((self._data[self._next:], self._data[:self._next]))
+
+
+class TelemetrySampler:
+    """
+    Samples hot telemetry fields of a vessel in a background thread.
+
+    Streams are registered on the first start() and reused by later ones, so
+    starting and stopping the sampler around every executed step is cheap.
+
+    Example:
+        sampler = TelemetrySampler(conn, vessel, rate=20.0)
+        sampler.start()
+        ...  # run flight code
+        trajectory = sampler.stop()
+    """
+
+    def __init__(
+        self,
+        conn,
+        vessel,
+        rate: float = 10.0,
+        capacity: int = 2048,
+        resources: Iterable[str] = SAMPLED_RESOURCES,
+        streams=None,
+    ):
+        """
+        Args:
+            conn: kRPC connection the vessel belongs to
+            vessel: Vessel to sample
+            rate: Sampling rate in Hz
+            capacity: Maximum number of samples kept per run
+            resources: Resource names to sample, if present on the vessel
+            streams: Optional StreamRegistry the streams are shared through
+        """
+        if rate <= 0:
+            raise ValueError("Sampling rate must be positive")
+        self.conn = conn
+        self.vessel = vessel
+        self.rate = rate
+        self.capacity = capacity
+        self.resources = tuple(resources)
+        self.streams = streams
+
+        self._streams: List[Tuple[str, Any]] = []
+        self._buffer: Optional[RingBuffer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def _add_stream(self, func, *args):
+        if self.streams is not None:
+            stream = self.streams.acquire(self.conn, func, *args, owner="sampler")
+        else:
+            stream = self.conn.add_stream(func, *args)
+        stream.rate = self.rate
+        stream.start(wait=False)
+        return stream
+
+    def _register_streams(self):
+        """Register one stream per sampled column, skipping fields the server cannot stream."""
+        sources = {
+            'space_center': self.conn.space_center,
+            'vessel': self.vessel,
+            'flight': self.vessel.flight(),
+            'orbit': self.vessel.orbit,
+            'control': self.vessel.control,
+        }
+        for column, source, attribute in SAMPLED_FIELDS:
+            try:
+                self._streams.append((column, self._add_stream(getattr, sources[source], attribute)))
+            except Exception as e:
+                print(f"⚠️ WARNING: Could not sample {column}: {e}")
+
+        resources = self.vessel.resources
+        try:
+            available = set(resources.names)
+        except Exception:
+            available = set()
+        for name in self.resources:
+            if name in available:
+                try:
+                    self._streams.append((name, self._add_stream(resources.amount, name)))
+                except Exception as e:
+                    print(f"⚠️ WARNING: Could not sample {name}: {e}")
+
+        self._buffer = RingBuffer(self.capacity, ['elapsed'] + [column for column, _ in self._streams])
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Clear the buffer and start sampling."""
+        if self.running:
+            return
+        if self._buffer is None:
+            self._register_streams()
+        self._buffer.clear()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="TelemetrySampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop sampling and return the recorded trajectory (see trajectory())."""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        return self.trajectory()
+
+    def _sample(self, stream) -> float:
+        try:
+            value = stream()
+        except StreamError:
+            # No update received yet
+            return math.nan
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return math.nan
+
+    def _run(self):
+        period = 1.0 / self.rate
+        started = time.monotonic()
+        next_sample = started
+        while True:
+            now = time.monotonic()
+            self._buffer.append([now - started] + [self._sample(stream) for _, stream in self._streams])
+            next_sample += period
+            # Skip missed slots instead of bursting to catch up
+            if next_sample < now:
+                next_sample = now + period
+            if self._stop_event.wait(next_sample - now):
+                break
+
+    def array(self) -> np.ndarray:
+        """Samples recorded by the last run as a (samples, columns) array."""
+        if self._buffer is None:
+            return np.empty((0, 0))
+        return self._buffer.array()
+
+    def trajectory(self) -> Dict[str, Any]:
+        """
+        Samples recorded by the last run in a JSON-serializable form.
+
+        Returns:
+            Dictionary with the sampling rate, the number of samples kept and
+            dropped, and one list per column ("elapsed" seconds since start,
+            then the sampled fields). Missing values are None.
+        """
+        if self._buffer is None:
+            return {"rate": self.rate, "samples": 0, "dropped": 0, "columns": {}}
+        data = self._buffer.array()
+        columns = {}
+        for index, column in enumerate(self._buffer.columns):
+            values = data[:, index]
+            columns[column] = [None if math.isnan(v) else v for v in values.tolist()]
+        return {
+            "rate": self.rate,
+            "samples": len(data),
+            "dropped": self._buffer.dropped,
+            "columns": columns,
+        }
+
+    def close(self):
+        """Stop sampling and remove the sampler's streams."""
+        self.stop()
+        for _, stream in self._streams:
+            try:
+                stream.remove()
+            except Exception:
+                pass
+        self._streams = []
+        self._buffer = None
+
+
+# Columns shown by summarize_trajectory, with their display units
+SUMMARY_COLUMNS = (
+    ('altitude', 'm'),
+    ('speed', 'm/s'),
+    ('vertical_speed', 'm/s'),
+    ('apoapsis_altitude', 'm'),
+    ('periapsis_altitude', 'm'),
+    ('throttle', ''),
+    ('thrust', 'N'),
+    ('mass', 'kg'),
+) + tuple((name, 'units') for name in SAMPLED_RESOURCES)
+
+
+def summarize_trajectory(trajectory: Dict[str, Any]) -> List[str]:
+    """
+    Summarize a sampled trajectory as short text lines for agent prompts.
+
+    Each line shows how a field moved during execution: start and end value
+    plus the extremes reached in between.
+    """
+    columns = trajectory.get("columns", {}) if trajectory else {}
+    if not trajectory or not trajectory.get("samples"):
+        return []
+
+    elapsed = [v for v in columns.get("elapsed", []) if v is not None]
+    duration = elapsed[-1] - elapsed[0] if elapsed else 0.0
+    header = f"{trajectory['samples']} samples over {duration:.1f}s at {trajectory.get('rate', 0):.0f} Hz"
+    if trajectory.get("dropped"):
+        header += f" (oldest {trajectory['dropped']} samples dropped)"
+    lines = [header]
+    for column, unit in SUMMARY_COLUMNS:
+        values = np.array([v for v in columns.get(column, []) if v is not None], dtype=float)
+        if not len(values):
+            continue
+        unit = f" {unit}" if unit else ""
+        lines.append(
+            f"{column}: {values[0]:.1f} -> {values[-1]:.1f}{unit} "
+            f"(min {values.min():.1f}, max {values.max():.1f})"
+        )
+    return lines
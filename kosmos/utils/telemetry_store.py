@@ -0,0 +1,270 @@
+"""
+Columnar telemetry time-series store.
+
+Telemetry events are nested dicts; analysing a mission from the EventRecorder
+JSON files means reparsing every event. The store keeps one float64 NumPy
+array per flattened field (e.g. "orbit_parameters.apoapsis_altitude") plus a
+shared time index (KSP universal time), so range queries, aggregates and
+downsampling over thousands of samples are vectorized array operations.
+"""
+
+import math
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Name of the time index column in queries and saved files
+TIME_COLUMN = "t"
+
+
+def flatten_telemetry(event: Mapping[str, Any], prefix: str = "", skip: Iterable[str] = ("trajectory",)) -> Dict[str, float]:
+    """
+    Flatten a telemetry event into numeric columns.
+
+    Nested dict keys are joined with ".", vectors become one column per
+    component ("velocity_orbital.0", ...), booleans become 0/1 and
+    non-numeric values (names, enum strings) are dropped.
+    """
+    skip = set(skip)
+    columns: Dict[str, float] = {}
+
+    def walk(value, name):
+        if isinstance(value, bool):
+            columns[name] = float(value)
+        elif isinstance(value, (int, float)):
+            columns[name] = float(value)
+        elif isinstance(value, Mapping):
+            for key, item in value.items():
+                if not prefix and not name and key in skip:
+                    continue
+                walk(item, f"{name}.{key}" if name else str(key))
+        elif isinstance(value, (tuple, list)) and value and all(
+            isinstance(item, (int, float)) and not isinstance(item, bool) for item in value
+        ):
+            for index, item in enumerate(value):
+                columns[f"{name}.{index}"] = float(item)
+
+    walk(event, prefix)
+    return columns
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last point and, from each of n - 2 equal buckets in
+    between, the point forming the largest triangle with the previously kept
+    point and the average of the next bucket. Peaks and troughs survive,
+    which plain striding would drop.
+    """
+    size = len(x)
+    if n >= size or size <= 2:
+        return x, y
+    if n < 3:
+        return x[[0, -1]], y[[0, -1]]
+
+    every = (size - 2) / (n - 2)
+    kept = np.empty(n, dtype=np.int64)
+    kept[0], kept[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        start = int(math.floor(i * every)) + 1
+        end = int(math.floor((i + 1) * every)) + 1
+        next_end = min(int(math.floor((i + 2) * every)) + 1, size)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return x[kept], y[kept]
+
+
+class TelemetryStore:
+    """
+    One growable float64 column per telemetry field plus a time index.
+
+    Columns are allocated with spare capacity and doubled when full, so
+    appending is amortized O(1). Fields that appear later are backfilled with
+    NaN, and fields missing from a sample are stored as NaN.
+
+    Example:
+        store = TelemetryStore()
+        store.append(ut, flatten_telemetry(event))
+        store.aggregate("altitude", start=ut0)
+        t, alt = store.downsample("altitude", 200)
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._capacity = max(int(capacity), 1)
+        self._size = 0
+        self._times = np.empty(self._capacity)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._sorted = True
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return tuple(self._columns)
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times[:self._size]
+
+    def column(self, field: str) -> np.ndarray:
+        """Values of a field, aligned with times."""
+        if field not in self._columns:
+            raise KeyError(f"Unknown telemetry field '{field}'")
+        return self._columns[field][:self._size]
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        if needed <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        self._times = np.resize(self._times, capacity)
+        for field, values in self._columns.items():
+            grown = np.full(capacity, np.nan)
+            grown[:self._size] = values[:self._size]
+            self._columns[field] = grown
+        self._capacity = capacity
+
+    def _column_for(self, field: str) -> np.ndarray:
+        values = self._columns.get(field)
+        if values is None:
+            values = np.full(self._capacity, np.nan)
+            self._columns[field] = values
+        return values
+
+    def _track_order(self, first_time: float, times: np.ndarray):
+        # UT goes backwards after a revert or quickload; queries then fall back to masks
+        if self._size and first_time < self._times[self._size - 1]:
+            self._sorted = False
+        if len(times) > 1 and np.any(np.diff(times) < 0):
+            self._sorted = False
+
+    def append(self, t: float, values: Mapping[str, float]):
+        """Add one sample at time t."""
+        self._reserve(1)
+        self._track_order(t, np.empty(0))
+        self._times[self._size] = t
+        for field, value in values.items():
+            self._column_for(field)[self._size] = value
+        self._size += 1
+
+    def extend(self, times: Sequence[float], columns: Mapping[str, Sequence[Optional[float]]]):
+        """Add many samples at once, e.g. a sampled trajectory. None values are stored as NaN."""
+        times = np.asarray(times, dtype=float)
+        valid = ~np.isnan(times)
+        times = times[valid]
+        count = len(times)
+        if not count:
+            return
+        self._reserve(count)
+        self._track_order(times[0], times)
+        end = self._size + count
+        self._times[self._size:end] = times
+        for field, values in columns.items():
+            values = np.asarray(values, dtype=float)[valid]
+            self._column_for(field)[self._size:end] = values
+        self._size = end
+
+    def _window(self, start: Optional[float], end: Optional[float]):
+        """Index (slice or boolean mask) of the samples with start <= t <= end."""
+        times = self.times
+        if self._sorted:
+            lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+            hi = self._size if end is None else int(np.searchsorted(times, end, side="right"))
+            return slice(lo, hi)
+        mask = np.ones(self._size, dtype=bool)
+        if start is not None:
+            mask &= times >= start
+        if end is not None:
+            mask &= times <= end
+        return mask
+
+    def range(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Samples with start <= t <= end.
+
+        Returns:
+            Dictionary with the time index under TIME_COLUMN and one array per
+            requested field (all fields by default)
+        """
+        window = self._window(start, end)
+        fields = self.fields if fields is None else tuple(fields)
+        result = {TIME_COLUMN: self.times[window].copy()}
+        for field in fields:
+            result[field] = self.column(field)[window].copy()
+        return result
+
+    def aggregate(self, field: str, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, float]:
+        """Min, max and mean of a field over a time range, ignoring missing values."""
+        values = self.column(field)[self._window(start, end)]
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return {"count": 0, "min": None, "max": None, "mean": None}
+        return {
+            "count": int(len(values)),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "mean": float(values.mean()),
+        }
+
+    def downsample(
+        self,
+        field: str,
+        n: int,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reduce a field to at most n points with LTTB, keeping its visual shape.
+
+        Returns:
+            (times, values) arrays in time order
+        """
+        window = self._window(start, end)
+        times = self.times[window]
+        values = self.column(field)[window]
+        present = ~np.isnan(values)
+        times, values = times[present], values[present]
+        if not self._sorted:
+            order = np.argsort(times, kind="stable")
+            times, values = times[order], values[order]
+        return lttb(times, values, n)
+
+    def save(self, path: str, start: int = 0):
+        """
+        Write the store to a compressed .npz file.
+
+        Args:
+            start: Index of the first sample to write; a store saved in chunks
+                (start = number of samples already saved) is read back with load()
+        """
+        arrays = {f"field:{field}": self.column(field)[start:] for field in self.fields}
+        np.savez_compressed(path, **{TIME_COLUMN: self.times[start:]}, **arrays)
+
+    @classmethod
+    def load(cls, *paths: str) -> "TelemetryStore":
+        """Read a store written by save(), or by several chunked saves given in order."""
+        store = cls()
+        for path in paths:
+            with np.load(path) as data:
+                store.extend(data[TIME_COLUMN], {
+                    name[len("field:"):]: data[name] for name in data.files if name.startswith("field:")
+                })
+        return store
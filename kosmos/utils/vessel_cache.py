@@ -0,0 +1,58 @@
+"""
+Per-vessel cache for properties that only change when a vessel stages,
+docks or loses parts (name, crew capacity, vacuum thrust and Isp, ...).
+"""
+
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+# (current stage, part count) of a vessel when its properties were cached
+Signature = Tuple[int, int]
+
+
+class VesselPropertyCache:
+    """
+    Cache of slow-changing vessel properties, keyed by vessel identity.
+
+    kRPC remote objects hash and compare by their server object id, so the
+    vessel object itself identifies the vessel. Each vessel's entries are
+    stored together with the signature they were read under and dropped as
+    soon as validate() sees a different one, i.e. after staging, docking,
+    undocking or losing parts.
+    """
+
+    def __init__(self):
+        self._vessels: Dict[Any, Tuple[Optional[Signature], Dict[Hashable, Any]]] = {}
+
+    def validate(self, vessel, signature: Signature) -> bool:
+        """
+        Check a vessel's current signature against the cached one.
+
+        Returns:
+            True if the cached properties are still valid, False if they were dropped
+        """
+        entry = self._vessels.get(vessel)
+        if entry is not None and entry[0] == signature:
+            return True
+        self._vessels[vessel] = (signature, {})
+        return False
+
+    def contains(self, vessel, name: Hashable) -> bool:
+        entry = self._vessels.get(vessel)
+        return entry is not None and name in entry[1]
+
+    def get(self, vessel, name: Hashable, default=None):
+        entry = self._vessels.get(vessel)
+        if entry is None:
+            return default
+        return entry[1].get(name, default)
+
+    def put(self, vessel, name: Hashable, value):
+        self._vessels.setdefault(vessel, (None, {}))[1][name] = value
+
+    def invalidate(self, vessel=None):
+        """Drop the cached properties of one vessel, or of all vessels."""
+        if vessel is None:
+            self._vessels.clear()
+        else:
+            self._vessels.pop(vessel, None)
@@ -0,0 +1,191 @@
+"""
+Event-driven waits on kRPC streams for control code.
+
+Control primitives used to wait by polling: sleep 0.1-1 s, read a value over
+RPC, compare, repeat. A StreamWatch holds one stream and wakes waiting
+coroutines from the stream's update callback instead, so a wait costs no
+RPCs and ends on the first update that satisfies it. first() races several
+waits and cancels the losers.
+
+Example:
+    remaining = StreamWatch(conn, getattr, node, 'remaining_delta_v')
+    thrust = StreamWatch(conn, getattr, vessel, 'available_thrust')
+    index, _ = await first(remaining.below(1.0), thrust.below(0.001), timeout=600)
+    remaining.close(); thrust.close()
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from krpc.error import StreamError
+
+
+class LoopWakeup:
+    """
+    Wakes coroutines waiting on an event loop from another thread.
+
+    notify() may be called from kRPC's stream thread; bursts of notifications
+    are coalesced into one wake-up. Waiters take the current event, check
+    their condition and wait on the event if it does not hold yet.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event: Optional[asyncio.Event] = None
+        self._pending = False
+
+    @property
+    def event(self) -> asyncio.Event:
+        return self._event
+
+    def bind(self):
+        """Deliver wake-ups to the running event loop, e.g. after a new asyncio.run()."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._event = asyncio.Event()
+            self._pending = False
+
+    def notify(self):
+        loop = self._loop
+        if loop is None or self._pending:
+            return
+        self._pending = True
+        try:
+            loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:
+            # Event loop closed
+            self._pending = False
+
+    def _wake(self):
+        self._pending = False
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+
+class StreamWatch:
+    """
+    One streamed value with awaitable conditions on it.
+
+    The stream is added and started on construction and removed by close();
+    any number of waits can share it meanwhile. Through the connection given
+    to executed code, the stream is a handle shared with other holders of
+    the same value.
+    """
+
+    def __init__(self, conn, func: Callable, *args, rate: Optional[float] = None):
+        """
+        Args:
+            conn: kRPC connection
+            func, args: The streamed call, as for conn.add_stream (e.g. getattr, flight, 'mean_altitude')
+            rate: Update rate in Hz, None to keep the stream's rate
+        """
+        self._stream = conn.add_stream(func, *args)
+        if rate is not None:
+            self._stream.rate = rate
+        self._wakeup = LoopWakeup()
+        self._lock = threading.Lock()
+        self.version = 0  # Number of updates received
+        self._stream.add_callback(self._on_update)
+        # Block until the first value arrives so conditions never see a missing value
+        self._stream.start()
+
+    def _on_update(self, _value):
+        with self._lock:
+            self.version += 1
+        self._wakeup.notify()
+
+    @property
+    def value(self):
+        """Latest value; costs no RPC."""
+        return self._stream()
+
+    async def until(self, predicate: Callable[[Any], bool], timeout: Optional[float] = None):
+        """
+        Wait until predicate(value) is true, checking it on every update.
+
+        Returns:
+            The value that satisfied the predicate
+
+        Raises:
+            asyncio.TimeoutError: If the predicate does not hold within timeout seconds
+        """
+        self._wakeup.bind()
+
+        async def wait():
+            while True:
+                event = self._wakeup.event
+                try:
+                    value = self.value
+                except StreamError:
+                    value = None
+                if value is not None and predicate(value):
+                    return value
+                await event.wait()
+
+        return await asyncio.wait_for(wait(), timeout)
+
+    def above(self, threshold: float, timeout: Optional[float] = None) -> Awaitable:
+        """Wait until the value is above threshold."""
+        return self.until(lambda value: value > threshold, timeout)
+
+    def below(self, threshold: float, timeout: Optional[float] = None) -> Awaitable:
+        """Wait until the value is below threshold."""
+        return self.until(lambda value: value < threshold, timeout)
+
+    def becomes(self, target, timeout: Optional[float] = None) -> Awaitable:
+        """Wait until the value equals target; enum values also match their name (e.g. 'landed')."""
+        return self.until(lambda value: value == target or getattr(value, 'name', None) == target, timeout)
+
+    async def changes(self, timeout: Optional[float] = None):
+        """Wait for the next update and return the new value."""
+        self._wakeup.bind()
+        version = self.version
+
+        async def wait():
+            while True:
+                event = self._wakeup.event
+                if self.version != version:
+                    return self.value
+                await event.wait()
+
+        return await asyncio.wait_for(wait(), timeout)
+
+    def close(self):
+        """Remove the callback and the stream."""
+        try:
+            self._stream.remove_callback(self._on_update)
+            self._stream.remove()
+        except Exception:
+            pass
+
+    def __enter__(self) -> "StreamWatch":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def first(*awaitables: Awaitable, timeout: Optional[float] = None) -> Tuple[int, Any]:
+    """
+    Wait for the first of several waits to finish and cancel the others.
+
+    Returns:
+        (index, result) of the wait that finished first; the lowest index wins ties
+
+    Raises:
+        asyncio.TimeoutError: If none finishes within timeout seconds
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            raise asyncio.TimeoutError()
+        index = next(index for index, task in enumerate(tasks) if task in done)
+        return index, tasks[index].result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)